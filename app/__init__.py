@@ -7,7 +7,9 @@ from config import db
 from scheduler_config import scheduler
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.date import DateTrigger
-from app.routes.bots.bot_scheduler import cleanup_news_bot_logs
+from apscheduler.triggers.interval import IntervalTrigger
+from app.routes.bots.bot_scheduler import cleanup_news_bot_logs, batch_analysis_job
+from app.services.slack.notifier import slack_notifier
 from app.utils.timezones import check_server_timezone, check_database_timezone, check_scheduler_timezone
 
 load_dotenv()
@@ -71,12 +73,26 @@ def create_app():
             name='Weekly News Bot Log Cleanup',
             replace_existing=True
         )
+
+        # Submit, poll and publish OpenAI batch analyses for bots with deferred_analysis
+        scheduler.add_job(
+            func=batch_analysis_job,
+            trigger=IntervalTrigger(minutes=int(os.getenv('BATCH_ANALYSIS_INTERVAL_MINUTES', 10))),
+            id='batch_analysis',
+            name='OpenAI Batch Analysis',
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True
+        )
     
     with app.app_context():
         db.create_all()  # Create tables if they don't exist
         check_server_timezone()
         check_database_timezone()
         check_scheduler_timezone()
+
+    # Send Slack notifications queued before a restart
+    slack_notifier.start()
           
 
     # Register blueprints
@@ -92,12 +108,14 @@ def create_app():
     from app.routes.unwanted_articles.unwanted_article import unwanted_articles_bp
     from app.routes.image_generation.image_generation import image_generation_bp
     from app.routes.metrics.server_health_check import health_check_bp
+    from app.routes.url_filters.url_filter_rules import url_filter_rules_bp
 
     blueprints = [
         bots_bp, categories_bp, articles_bp, blacklist_bp, keyword_bp,
         top_stories_bp, unwanted_articles_bp, deactivate_bots_bp,
         image_generation_bp,
-        activate_bots_bp, news_bots_features_bp,health_check_bp
+        activate_bots_bp, news_bots_features_bp,health_check_bp,
+        url_filter_rules_bp
     ]
 
     for blueprint in blueprints:
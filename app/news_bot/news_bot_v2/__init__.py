@@ -1,26 +1,34 @@
-from typing import Dict, Any, Optional
-from logging.handlers import RotatingFileHandler
+from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime
+import asyncio
 import psutil
+import uuid
 import os
 import logging
 
 
-from app.services.slack.actions import send_NEWS_message_to_slack_channel
+from app.services.slack.actions import queue_NEWS_message_to_slack_channel
 from .utils.resolve_redirect import GoogleNewsURLExtractor
+from .utils.log_sink import get_pipeline_logger, run_id_var, item_id_var
 from .article_extractor import ArticleExtractor
 from .analysis_generator import AnalysisGenerator
 from .webscrapper import WebScraper
 from .filters import (check_article_keywords, 
                       is_content_similar, 
-                      is_recent_date, 
+                      index_saved_article,
+                      find_similar_article_image,
                       filter_link,
                       is_url_analyzed)
+from .filter_chain import FilterChain, FilterStage
 from .image_generator import ImageGenerator
 from .data_manager import DataManager
+from .batch_analysis import BatchAnalysisManager
+from .checkpoints import CheckpointStore, stage_reached
+from .utils.domain_circuit import domain_breaker
 from .grok import GrokProcessor
-from config import Metrics, db
+from .sources import GrokSource, NewsSource, RSSSource, SourceMerger, dedupe_items
+from config import Bot, Metrics, db, split_keywords
 
 @dataclass
 class PipelineConfig:
@@ -33,12 +41,29 @@ class PipelineConfig:
         similarity_threshold (float): The minimum similarity score required for two articles to be considered similar. Defaults to 0.85.
         timeout_seconds (int): The timeout in seconds for individual processing tasks. Defaults to 30.
         debug_mode (bool): A flag to enable or disable debug mode. Defaults to False.
+        max_age_hours (int): Feed entries published longer ago than this are skipped. Defaults to 24.
+        reuse_similar_images (bool): Give an article the image of a recent article of the same category
+            it is close to, instead of generating one. Defaults to the REUSE_SIMILAR_IMAGES environment variable.
+        image_reuse_threshold (float): Minimum similarity for image reuse; below the duplicate threshold
+            so that related, non-duplicate articles qualify. Defaults to 0.8.
+        rss_timeout_seconds (float): Time budget of the RSS source. Defaults to 60.
+        grok_timeout_seconds (float): Time budget of the Grok source. Defaults to 180.
+        grok_bots (Tuple[str, ...]): Names of the bots that also read news from Grok, from the
+            comma-separated GROK_SOURCE_BOTS environment variable. Defaults to none.
     """
     max_workers: int = 15
     max_articles: int = 2
     similarity_threshold: float = 0.85
     timeout_seconds: int = 30
     debug_mode: bool = False
+    max_age_hours: int = 24
+    reuse_similar_images: bool = os.getenv('REUSE_SIMILAR_IMAGES', 'false').lower() == 'true'
+    image_reuse_threshold: float = 0.8
+    rss_timeout_seconds: float = 60
+    grok_timeout_seconds: float = 180
+    grok_bots: Tuple[str, ...] = tuple(
+        name.strip().lower() for name in os.getenv('GROK_SOURCE_BOTS', '').split(',') if name.strip()
+    )
 
 
 
@@ -84,6 +109,7 @@ class NewsProcessingPipeline:
         self.url = url
         self.bot_id = bot.id
         self.bot_name = bot.name
+        self.category_id = bot.category_id
         self.test_news_bot_channel_id = "C071142J72R"
         # self.slack_channel_id = category.slack_channel
 
@@ -97,53 +123,23 @@ class NewsProcessingPipeline:
             self.metrics = self._initialize_metrics()
             self._initialize_components()
         except Exception as e:
-            self.logger.error(f"Pipeline initialization failed: {str(e)}")
+            self.logger.error("Pipeline initialization failed: %s", e)
             raise Exception(f"Pipeline initialization failed: {str(e)}")
 
-        self.logger.info(f"Pipeline initialized for bot_id={self.bot_id}")
+        self.logger.info("Pipeline initialized for bot_id=%s", self.bot_id)
 
     def _setup_logger(self):
-        """Configure logger with both file and console handlers.
+        """Configure the bot's logger on the shared asynchronous JSON sink.
         
-        Creates a logger that:
-        - Writes to a bot-specific log file in a logs directory
-        - Outputs to console with different levels based on debug mode
-        - Uses rotation to manage log file size
-        - Includes timestamp, logger name, level, and message
+        Records are enqueued by the pipeline and formatted/written to a bot-specific
+        rotating log file (logs/<bot_name>.log) by the sink's single writer thread.
+        Each record carries the run_id and item_id of the pipeline run that emitted it.
         
         Returns:
             logging.Logger: Configured logger instance
         """
-        # Create logs directory if it doesn't exist
-        base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        log_dir = os.path.join(base_dir, 'news_bot','news_bot_v2','logs')
-        os.makedirs(log_dir, exist_ok=True)
-        
-        # Configure logger
-        logger = logging.getLogger(f"NewsScraper-{self.bot_name}")
-        logger.setLevel(logging.INFO)
-        
-        # Clear existing handlers
-        logger.handlers.clear()
-        
-        # Common formatter for both handlers
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
-        
-        # File handler with rotation
-        log_file = os.path.join(log_dir, f'{self.bot_name}.log')
-        file_handler = RotatingFileHandler(
-            filename=log_file,
-            maxBytes=5*1024*1024,  # 5MB
-            backupCount=3,
-            encoding='utf-8'
-        )
-        file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
-
-        return logger
+        level = logging.DEBUG if self.config.debug_mode else logging.INFO
+        return get_pipeline_logger(self.bot_name, level=level)
 
     def _initialize_components(self):
         """Initialize all pipeline components with proper configuration."""
@@ -162,6 +158,78 @@ class NewsProcessingPipeline:
         # Data management
         self.data_manager = DataManager()
 
+        # Read fresh on every run: the bot passed to scheduled jobs is a snapshot
+        self.deferred_analysis = bool(
+            Bot.query.with_entities(Bot.deferred_analysis).filter_by(id=self.bot_id).scalar()
+        )
+        self.batch_analysis = BatchAnalysisManager()
+
+        # Per-item stage checkpoints, to resume items that failed after resolution
+        self.checkpoints = CheckpointStore(self.bot_id)
+        self.checkpointed_items = set()
+
+        # Item producers of a run, fetched concurrently
+        self.sources = self._build_sources()
+
+        # Cheap checks on RSS metadata, run before URL resolution and extraction
+        self.prefilter = FilterChain([
+            FilterStage('checkpointed', self._check_checkpointed, cost=1),
+            FilterStage('domain_circuit', self._check_domain_circuit, cost=2),
+            FilterStage('duplicate', self._check_known_duplicate, cost=5),
+            FilterStage('title_blacklist', self._check_title_blacklist, cost=10),
+        ])
+
+    def _build_sources(self) -> List[NewsSource]:
+        """The bot's RSS feed, plus Grok for the bots listed in `grok_bots`."""
+        sources = [RSSSource(self.url, self.web_scraper, self.config.rss_timeout_seconds)]
+        if self.bot_name.lower() in self.config.grok_bots:
+            sources.append(GrokSource(self.bot_name.lower(), self.grok_processor, self.config.grok_timeout_seconds))
+        return sources
+
+    def _check_checkpointed(self, item: Dict[str, Any]) -> Optional[str]:
+        """Reject items an earlier run already resolved; active ones are resumed instead."""
+        if item['link'] in self.checkpointed_items:
+            return "Item already processed or resumed from a checkpoint"
+        return None
+
+    def _check_domain_circuit(self, item: Dict[str, Any]) -> Optional[str]:
+        """Reject items from a publisher whose extraction circuit is open, before resolving the link."""
+        if item.get('source') and domain_breaker.is_open(item['source']):
+            return f"Extraction circuit open for {item['source']}"
+        return None
+
+    def _check_known_duplicate(self, item: Dict[str, Any]) -> Optional[str]:
+        # Only links resolved on an earlier run are known here; the rest are checked after resolution
+        resolved_url = self.url_extractor.cached_original_url(item['link'])
+        if resolved_url and is_url_analyzed(resolved_url, self.bot_id):
+            return f"Duplicate URL: {resolved_url}"
+        return None
+
+    def _check_title_blacklist(self, item: Dict[str, Any]) -> Optional[str]:
+        """
+        Reject items whose title contains a blacklist term, recording them as unwanted
+        articles like blacklisted content. The link is not resolved for this, so the
+        record holds the resolved URL when it is already known and the feed link otherwise;
+        an item already recorded is not recorded again on later runs.
+        """
+        if not item.get('title', '').strip():
+            return None
+        _, matching_blacklist = check_article_keywords(content=item['title'], bot_id=self.bot_id)
+        if not matching_blacklist:
+            return None
+
+        url = self.url_extractor.cached_original_url(item['link']) or item['link']
+        if not is_url_analyzed(url, self.bot_id):
+            self.data_manager.save_unwanted_article({
+                'title': item['title'],
+                'content': item.get('content') or '',
+                'reason': f'Blacklist terms found in title: {", ".join(matching_blacklist)}',
+                'url': url,
+                'date': item.get('published'),
+                'bot_id': self.bot_id
+            })
+        return f"Title matches blacklist terms: {', '.join(matching_blacklist)}"
+
     def _initialize_metrics(self) -> Dict[str, Any]:
         """
         Initialize performance and monitoring metrics for the pipeline.
@@ -172,6 +240,7 @@ class NewsProcessingPipeline:
         - Success/failure counts
         - Article processing statistics
         - Filter effectiveness
+        - OpenAI token usage of the analysis calls
         
         Returns:
             Dict[str, Any]: Initial metrics configuration
@@ -186,6 +255,8 @@ class NewsProcessingPipeline:
         with db.session() as session:
             session.add(metrics)
             session.commit()
+            # Later updates go to this run's row, not to any row of the bot
+            self.metrics_id = metrics.id
 
         return {
             'start_time': None,
@@ -193,6 +264,8 @@ class NewsProcessingPipeline:
             'total_articles_found': 0,
             'articles_processed': 0,
             'articles_saved': 0,
+            'images_reused': 0,
+            'items_resumed': 0,
             'resource_usage': {
                 'cpu_percent': psutil.cpu_percent(),
                 'memory_percent': psutil.Process().memory_percent()
@@ -204,13 +277,29 @@ class NewsProcessingPipeline:
             'filter_stats': {
                 'total_filtered': 0,
                 'filter_reasons': {}
+            },
+            'token_usage': {
+                'calls': 0,
+                'prompt_tokens': 0,
+                'completion_tokens': 0,
+                'cached_tokens': 0,
+                'truncated_inputs': 0
             }
         }
+
+    def _record_token_usage(self, usage: Dict[str, Any]) -> None:
+        """Add the token usage of one analysis call to the run totals."""
+        totals = self.metrics['token_usage']
+        totals['calls'] += 1
+        for key in ('prompt_tokens', 'completion_tokens', 'cached_tokens'):
+            totals[key] += usage.get(key) or 0
+        if usage.get('input_truncated'):
+            totals['truncated_inputs'] += 1
     
     def _update_metrics(self):
         """Update metrics in database."""
         with db.session() as session:
-            metrics = session.query(Metrics).filter_by(bot_id=self.bot_id).first()
+            metrics = session.get(Metrics, self.metrics_id)
             metrics.end_time = datetime.now()
             metrics.total_runtime = (metrics.end_time - metrics.start_time).total_seconds()
             metrics.total_articles_found = self.metrics['total_articles_found']
@@ -222,32 +311,91 @@ class NewsProcessingPipeline:
             metrics.error_reasons = self.metrics['errors']['reasons']
             metrics.total_filtered = self.metrics['filter_stats']['total_filtered']
             metrics.filter_reasons = self.metrics['filter_stats']['filter_reasons']
+            metrics.token_usage = dict(self.metrics['token_usage'])
             
             session.commit()
 
     async def run(self) -> Dict[str, Any]:
         """Main pipeline execution."""
         self.metrics['start_time'] = datetime.now()
-        self.logger.info(f"Starting pipeline for bot_id={self.bot_id}")
+        self.run_id = uuid.uuid4().hex[:12]
+        run_token = run_id_var.set(self.run_id)
+        self.logger.info("Starting pipeline for bot_id=%s", self.bot_id)
+        
+        # Start every source now, so fetching overlaps with resuming checkpoints
+        merger = SourceMerger(self.sources)
+        merger.start()
         
         try:
-            # Extract Links
-            self.logger.info(f"Scraping RSS feed...")
-            news_items = self.web_scraper.scrape_rss(url=self.url)
-            if not news_items:
-                self._update_metrics()
-                return self._build_response(success=False, results={}, message="No news items found")
-            
-            self.logger.info(f"Found {len(news_items)} news URLs")
-            self.metrics['total_articles_found'] = len(news_items)
+            # Let the sources hand their work to their threads before the blocking item work below
+            await asyncio.sleep(0)
 
-            # Process Items
+            # Resume items of earlier runs that failed after their URL was resolved
             processed_items = []
-            for item in news_items:
-                processed_item = await self._process_item(item)
+            self.checkpoints.prune()
+            for index, checkpoint in enumerate(self.checkpoints.resumable()):
+                item_token = item_id_var.set(f"{self.run_id}-r{index}")
+                try:
+                    processed_item = await self._process_item(None, checkpoint)
+                finally:
+                    item_id_var.reset(item_token)
                 processed_items.append(processed_item)
+                self.metrics['items_resumed'] += 1
                 if not processed_item['success']:
-                    self.logger.error(f"Item processing failed: {processed_item['error']}")
+                    self.logger.error("Resumed item processing failed: %s", processed_item['error'])
+            self.checkpointed_items = self.checkpoints.known_item_keys()
+
+            # Process each source's items as soon as it returns, deduplicated across sources
+            seen_items = set()
+            source_stats = {}
+            index = 0
+            async for batch in merger.batches():
+                source_stats[batch.source] = {'items': len(batch.items), 'seconds': round(batch.seconds, 1), 'error': batch.error}
+                if batch.error:
+                    self.logger.error("Source %s failed: %s", batch.source, batch.error)
+                    self.metrics['errors']['total'] += 1
+                    self.metrics['errors']['reasons'].setdefault(f'source_{batch.source}', 0)
+                    self.metrics['errors']['reasons'][f'source_{batch.source}'] += 1
+                    continue
+                self.metrics['total_articles_found'] += len(batch.items)
+
+                # Drop stale and undated entries for the whole batch before any per-item work
+                recent_items = self.web_scraper.filter_recent(batch.items, self.config.max_age_hours)
+                stale_count = len(batch.items) - len(recent_items)
+                if stale_count:
+                    self.metrics['filter_stats']['total_filtered'] += stale_count
+                    self.metrics['filter_stats']['filter_reasons'].setdefault('date_not_recent', 0)
+                    self.metrics['filter_stats']['filter_reasons']['date_not_recent'] += stale_count
+
+                news_items = dedupe_items(recent_items, seen_items)
+                duplicate_count = len(recent_items) - len(news_items)
+                if duplicate_count:
+                    self.metrics['filter_stats']['total_filtered'] += duplicate_count
+                    self.metrics['filter_stats']['filter_reasons'].setdefault('duplicate_across_sources', 0)
+                    self.metrics['filter_stats']['filter_reasons']['duplicate_across_sources'] += duplicate_count
+
+                self.logger.info("Source %s: %s recent items (%s stale, %s duplicates skipped) in %.1fs",
+                                 batch.source, len(news_items), stale_count, duplicate_count, batch.seconds)
+
+                # Process Items
+                for item in news_items:
+                    item_token = item_id_var.set(f"{self.run_id}-{index}")
+                    index += 1
+                    try:
+                        processed_item = await self._process_item(item)
+                    finally:
+                        item_id_var.reset(item_token)
+                    processed_items.append(processed_item)
+                    if not processed_item['success']:
+                        self.logger.error("Item processing failed: %s", processed_item['error'])
+
+            self.logger.info("Sources: %s", source_stats)
+
+            if not processed_items:
+                self._update_metrics()
+                return self._build_response(success=False, results={'sources': source_stats}, message="No recent news items found")
+
+            self.logger.info("Pre-filter stages: %s", self.prefilter.stats())
 
             self.metrics['end_time'] = datetime.now()
             self.metrics['total_runtime'] = (self.metrics['end_time'] - self.metrics['start_time']).total_seconds()
@@ -256,129 +404,206 @@ class NewsProcessingPipeline:
 
             return self._build_response(
                 success=True,
-                results={'processed_items': processed_items},
+                results={'processed_items': processed_items, 'sources': source_stats},
                 message="Pipeline completed successfully"
             )
         except Exception as e:
-            self.logger.error(f"Pipeline execution failed: {str(e)}")
+            self.logger.error("Pipeline execution failed: %s", e)
             self.metrics['errors']['total'] += 1
             self.metrics['errors']['reasons'].setdefault('pipeline_execution', 0)
             self.metrics['errors']['reasons']['pipeline_execution'] += 1
             return self._build_response(success=False, results={}, message=str(e))
+        finally:
+            merger.cancel()
+            run_id_var.reset(run_token)
 
-    async def _process_item(self, item: Dict[str, Any]) -> Dict[str, Any]:
+    async def _process_item(self, item: Optional[Dict[str, Any]], checkpoint: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Process a single news item through all pipeline stages.
-        References processing logic from __init__.py (lines 213-331)
+
+        Once the URL is resolved, each completed stage is checkpointed. When `checkpoint`
+        is given (an item resumed from an earlier run, `item` is then None), completed
+        stages are skipped and their results read from it.
         """
         try:
-            self.logger.info(f"Processing New Item...")
-
-            # 1. URL Resolution
-            self.logger.debug(f"Resolving URL: {item['link']}")
-            link_result = self._process_url(item['link'])
-            if not link_result['success']:
-                self.logger.warning(f"URL processing failed: {link_result['error']}")
-                return {'success': False, 'error': link_result['error']}
-            
-            self.logger.info(f"URL resolved: {link_result['url']}")
+            if checkpoint:
+                self.logger.info("Resuming item from stage '%s': %s", checkpoint['stage'], checkpoint['url'])
+                link_result = {'success': True, 'url': checkpoint['url']}
+            else:
+                self.logger.info("Processing New Item...")
+
+                # 1. Pre-filter on RSS metadata (known duplicate, title blacklist)
+                rejection = self.prefilter.run(item)
+                if rejection:
+                    self.metrics['filter_stats']['total_filtered'] += 1
+                    self.metrics['filter_stats']['filter_reasons'].setdefault(rejection.stage, 0)
+                    self.metrics['filter_stats']['filter_reasons'][rejection.stage] += 1
+                    self.logger.warning("Item rejected by %s: %s", rejection.stage, rejection.error)
+                    return {'success': False, 'error': rejection.error}
+
+                # 2. URL Resolution (items that carry their content, e.g. from Grok, have no page to resolve)
+                if item.get('content'):
+                    link_result = self._check_content_item(item)
+                else:
+                    self.logger.debug("Resolving URL: %s", item['link'])
+                    link_result = self._process_url(item['link'])
+                if not link_result['success']:
+                    self.logger.warning("URL processing failed: %s", link_result['error'])
+                    return {'success': False, 'error': link_result['error']}
+                
+                self.logger.info("URL resolved: %s", link_result['url'])
+                checkpoint = self.checkpoints.start(item['link'], link_result['url'], item.get('title'), item['published'])
+                if checkpoint is None:
+                    return {'success': False, 'error': 'Item already tracked by a checkpoint'}
+                if item.get('content'):
+                    self.checkpoints.advance(checkpoint, 'extracted', title=item['title'], content=item['content'])
             
-            # 2. Date Validation
-            self.logger.info(f"Validating date: {item['published']}")
-            if not is_recent_date(item['published']):
-                self.metrics['filter_stats']['filter_reasons'].setdefault('date_not_recent', 0)
-                self.metrics['filter_stats']['filter_reasons']['date_not_recent'] += 1
-                self.logger.warning(f"Date is not recent: {item['published']}")
-                return {'success': False, 'error': 'Date is not recent'}
-
             # 3. Content Extraction
-            try:
-                self.logger.info(f"Extracting article content...")
-                article_content = self.article_extractor.extract_article_content(link_result['url'])
-            except Exception as e:
-                self.metrics['errors']['total'] += 1
-                self.metrics['errors']['reasons'].setdefault('content_extraction', 0)
-                self.metrics['errors']['reasons']['content_extraction'] += 1
-                return {'success': False, 'error': f'Content extraction failed: {str(e)}'}
+            if stage_reached(checkpoint, 'extracted'):
+                article_content = {'title': checkpoint['title'], 'content': checkpoint['content'], 'url': checkpoint['url']}
+            else:
+                try:
+                    self.logger.info("Extracting article content...")
+                    article_content = self.article_extractor.extract_article_content(link_result['url'])
+                except Exception as e:
+                    self.metrics['errors']['total'] += 1
+                    self.metrics['errors']['reasons'].setdefault('content_extraction', 0)
+                    self.metrics['errors']['reasons']['content_extraction'] += 1
+                    return self._fail_item(checkpoint, f'Content extraction failed: {str(e)}')
 
-            # Add date to article metadata
-            article_content['date'] = item['published']
+                self.logger.info("Article extracted", extra={'payload': {
+                    'title': article_content['title'],
+                    'content': article_content['content']
+                }})
+                self.checkpoints.advance(checkpoint, 'extracted',
+                                         title=article_content['title'], content=article_content['content'])
 
-            self.logger.info(f"Raw title: {article_content['title']}")
-            self.logger.info(f"Raw content: {article_content['content'][:100]}...")
+            # Add date to article metadata
+            article_content['date'] = checkpoint['date']
             
             # 4. Content Processing
-            self.logger.info(f"Processing content...")
-            processed_content = await self._process_content(article_content)
-            if not processed_content['success']:
-                self.metrics['filter_stats']['filter_reasons'].setdefault('content_processing_failed', 0)
-                self.metrics['filter_stats']['filter_reasons']['content_processing_failed'] += 1
-                self.logger.warning(f"Content processing failed: {processed_content['error']}")
-                return {'success': False, 'error': processed_content['error']}
-            
-            self.logger.info(f"New title: {processed_content['title']}")
-            self.logger.info(f"New content: {processed_content['content']}")
+            if stage_reached(checkpoint, 'analyzed'):
+                processed_content = {
+                    'success': True,
+                    'title': checkpoint['new_title'],
+                    'content': checkpoint['new_content'],
+                    'keywords': split_keywords(checkpoint['used_keywords']),
+                }
+            else:
+                self.logger.info("Processing content...")
+                processed_content = await self._process_content(article_content)
+                if not processed_content['success']:
+                    self.metrics['filter_stats']['filter_reasons'].setdefault('content_processing_failed', 0)
+                    self.metrics['filter_stats']['filter_reasons']['content_processing_failed'] += 1
+                    self.logger.warning("Content processing failed: %s", processed_content['error'])
+                    if processed_content.get('filtered'):
+                        self.checkpoints.close(checkpoint, 'rejected', processed_content['error'])
+                        return {'success': False, 'error': processed_content['error']}
+                    return self._fail_item(checkpoint, processed_content['error'])
+                
+                if processed_content.get('deferred'):
+                    self.logger.info("Analysis deferred to batch, pending_analysis_id=%s", processed_content['pending_analysis_id'])
+                    self.checkpoints.close(checkpoint, 'deferred')
+                    return {
+                        'success': True,
+                        'deferred': True,
+                        'pending_analysis_id': processed_content['pending_analysis_id'],
+                    }
 
-            # Types
-            self.logger.info(f"Title type: {type(processed_content.get('title', None))}")
-            self.logger.info(f"Content type: {type(processed_content.get('content', None))}")
+                self.checkpoints.advance(checkpoint, 'analyzed',
+                                         new_title=processed_content['title'],
+                                         new_content=processed_content['content'],
+                                         used_keywords=', '.join(processed_content.get('keywords', [])))
+
+            self.logger.info("Content processed: %s", processed_content['title'])
+
+            # 5. Image Generation (or reuse of a related article's image)
+            image_url = checkpoint['image_url'] if stage_reached(checkpoint, 'imaged') else None
+            if image_url is None and self.config.reuse_similar_images:
+                try:
+                    similar_image = find_similar_article_image(
+                        article_content['content'], self.category_id, self.config.image_reuse_threshold
+                    )
+                except Exception as e:
+                    self.logger.warning("Similar image lookup failed: %s", e)
+                    similar_image = None
+                if similar_image:
+                    similar_article_id, image_url = similar_image
+                    self.metrics['images_reused'] += 1
+                    self.logger.info("Reusing image of article %s: %s", similar_article_id, image_url)
+                    self.checkpoints.advance(checkpoint, 'uploaded', image_url=image_url)
+
+            if image_url is None:
+                try:
+                    self.logger.info("Generating image...")
+                    image_url = self.image_generator.generate_image(
+                        article_text=processed_content['content'],
+                        bot_id=self.bot_id,
+                        fingerprint_text=article_content['content']
+                    )
+                    self.logger.info("Image generated URL: %s", image_url)
+                except Exception as e:
+                    self.metrics['errors']['total'] += 1
+                    self.metrics['errors']['reasons'].setdefault('image_generation', 0)
+                    self.metrics['errors']['reasons']['image_generation'] += 1
+                    return self._fail_item(checkpoint, f'Image generation failed: {str(e)}')
+                self.checkpoints.advance(checkpoint, 'imaged', image_url=image_url)
 
-            # 5. Image Generation
-            try:
-                self.logger.info(f"Generating image...")
-                image_url = self.image_generator.generate_image(
-                    article_text=processed_content['content'],
-                    bot_id=self.bot_id
-                )
-                self.logger.info(f"Image generated URL: {image_url}")
-            except Exception as e:
-                self.metrics['errors']['total'] += 1
-                self.metrics['errors']['reasons'].setdefault('image_generation', 0)
-                self.metrics['errors']['reasons']['image_generation'] += 1
-                return {'success': False, 'error': f'Image generation failed: {str(e)}'}
-            
             # 5.1 Upload images to S3
-            try:
-                self.logger.info(f"Uploading image to S3...")
-                image_url = self.image_generator.upload_image(
-                    image_url=image_url,
-                    title=processed_content['title']
-                )
-                self.logger.info(f"Image uploaded to S3: {image_url}")
-            except Exception as e:
-                self.metrics['errors']['total'] += 1
-                self.metrics['errors']['reasons'].setdefault('image_upload', 0)
-                self.metrics['errors']['reasons']['image_upload'] += 1
-                return {'success': False, 'error': f'Image upload failed: {str(e)}'}
+            if not stage_reached(checkpoint, 'uploaded'):
+                try:
+                    self.logger.info("Uploading image to S3...")
+                    image_url = self.image_generator.upload_image(
+                        image_url=image_url,
+                        title=processed_content['title']
+                    )
+                    self.logger.info("Image uploaded to S3: %s", image_url)
+                except Exception as e:
+                    self.metrics['errors']['total'] += 1
+                    self.metrics['errors']['reasons'].setdefault('image_upload', 0)
+                    self.metrics['errors']['reasons']['image_upload'] += 1
+                    return self._fail_item(checkpoint, f'Image upload failed: {str(e)}')
+                self.checkpoints.advance(checkpoint, 'uploaded', image_url=image_url)
 
             # 6. Save to Database
-            self.logger.info(f"Saving article to database...")
+            if stage_reached(checkpoint, 'saved'):
+                new_article_id = checkpoint['article_id']
+            else:
+                self.logger.info("Saving article to database...")
+                try:
+                    new_article_id = self.data_manager.save_article({
+                        'title': processed_content['title'],
+                        'content': processed_content['content'],
+                        'image': image_url,
+                        'analysis': '',
+                        'link': link_result['url'],
+                        'date': article_content['date'],
+                        'used_keywords': processed_content.get('keywords', []),
+                        'is_efficient': '',
+                        'is_top_story': False,
+                        'bot_id': self.bot_id,
+                        'source_content': article_content['content']
+                    })
+                    self.logger.info("Article saved to database with ID: %s", new_article_id)
+                except Exception as e:
+                    self.metrics['errors']['total'] += 1
+                    self.metrics['errors']['reasons'].setdefault('database_save', 0)
+                    self.metrics['errors']['reasons']['database_save'] += 1
+                    return self._fail_item(checkpoint, f'Database save failed: {str(e)}')
+                self.checkpoints.advance(checkpoint, 'saved', article_id=new_article_id)
+
+                self.metrics['articles_processed'] += 1
+                self.metrics['articles_saved'] += 1
+
+            # Make the article visible to the cross-bot dedup check of later items
             try:
-                new_article_id = self.data_manager.save_article({
-                    'title': processed_content['title'],
-                    'content': processed_content['content'],
-                    'image': image_url,
-                    'analysis': '',
-                    'link': link_result['url'],
-                    'date': item['published'],
-                    'used_keywords': processed_content.get('keywords', []),
-                    'is_efficient': '',
-                    'is_top_story': False,
-                    'bot_id': self.bot_id
-                })
-                self.logger.info(f"Article saved to database with ID: {new_article_id}")
+                index_saved_article(new_article_id, article_content['content'], self.category_id)
             except Exception as e:
-                self.metrics['errors']['total'] += 1
-                self.metrics['errors']['reasons'].setdefault('database_save', 0)
-                self.metrics['errors']['reasons']['database_save'] += 1
-                return {'success': False, 'error': f'Database save failed: {str(e)}'}
-
-            self.metrics['articles_processed'] += 1
-            self.metrics['articles_saved'] += 1
+                self.logger.warning("Could not index article %s for deduplication: %s", new_article_id, e)
 
-            # 7. Send Notification to Slack Channel
-            self.logger.info(f"Sending notification to Slack channel...")
-            send_NEWS_message_to_slack_channel(
+            # 7. Queue Notification to Slack Channel (sent by the background notifier)
+            self.logger.info("Queueing notification to Slack channel...")
+            notification = queue_NEWS_message_to_slack_channel(
                 channel_id=self.test_news_bot_channel_id,
                 title=processed_content['title'],
                 article_url=link_result['url'],
@@ -387,6 +612,12 @@ class NewsProcessingPipeline:
                 image=image_url,
                 # audio_file=processed_content.get('audio', None)
             )
+            if not notification['success']:
+                self.metrics['errors']['total'] += 1
+                self.metrics['errors']['reasons'].setdefault('notification', 0)
+                self.metrics['errors']['reasons']['notification'] += 1
+                return self._fail_item(checkpoint, notification['error'])
+            self.checkpoints.advance(checkpoint, 'notified')
 
             return {
                 'success': True,
@@ -394,12 +625,40 @@ class NewsProcessingPipeline:
             }
 
         except Exception as e:
-            self.logger.error(f"Item processing failed: {str(e)}")
+            self.logger.error("Item processing failed: %s", e)
             self.metrics['errors']['total'] += 1
             self.metrics['errors']['reasons'].setdefault('unexpected', 0)
             self.metrics['errors']['reasons']['unexpected'] += 1
+            if checkpoint:
+                try:
+                    self.checkpoints.fail(checkpoint, str(e))
+                except Exception as checkpoint_error:
+                    self.logger.warning("Could not record failure in checkpoint: %s", checkpoint_error)
             return {'success': False, 'error': str(e)}
 
+    def _fail_item(self, checkpoint: Dict[str, Any], error: str) -> Dict[str, Any]:
+        """Record a failed stage in the item's checkpoint, to be resumed by a later run."""
+        self.checkpoints.fail(checkpoint, error)
+        if checkpoint['status'] == 'abandoned':
+            self.logger.warning("Giving up on %s after %s attempts", checkpoint['url'], checkpoint['attempts'])
+        return {'success': False, 'error': error}
+
+    def _check_content_item(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Duplicate check of an item that carries its content; its link is a stable ID, not a page."""
+        try:
+            if is_url_analyzed(item['link'], self.bot_id):
+                self.metrics['filter_stats']['total_filtered'] += 1
+                self.metrics['filter_stats']['filter_reasons'].setdefault('duplicate', 0)
+                self.metrics['filter_stats']['filter_reasons']['duplicate'] += 1
+                return {'success': False, 'error': 'Duplicate URL'}
+        except Exception as e:
+            self.logger.error("Error checking for duplicates: %s", e)
+            self.metrics['errors']['total'] += 1
+            self.metrics['errors']['reasons'].setdefault('url_processing', 0)
+            self.metrics['errors']['reasons']['url_processing'] += 1
+            return {'success': False, 'error': f"URL duplicate check failed: {str(e)}"}
+        return {'success': True, 'url': item['link']}
+
     def _process_url(self, url: str) -> Dict[str, Any]:
         """
         Process and validate URL.
@@ -416,7 +675,7 @@ class NewsProcessingPipeline:
         
         try:
             # Extract final URL
-            self.logger.info(f"Extracting Final URL: {url}")
+            self.logger.info("Extracting Final URL: %s", url)
             final_url = self.url_extractor.extract_original_url(url)
             if not final_url:
                 self.metrics['filter_stats']['total_filtered'] += 1
@@ -424,7 +683,7 @@ class NewsProcessingPipeline:
                 self.metrics['filter_stats']['filter_reasons']['invalid_url'] += 1
                 return {'success': False, 'error': 'Invalid URL'}
         except Exception as e:
-            self.logger.error(f"Error extracting Final URL: {str(e)}")
+            self.logger.error("Error extracting Final URL: %s", e)
             self.metrics['errors']['total'] += 1
             self.metrics['errors']['reasons'].setdefault('url_processing', 0)
             self.metrics['errors']['reasons']['url_processing'] += 1
@@ -432,15 +691,15 @@ class NewsProcessingPipeline:
         
         try:
             # Apply filters
-            self.logger.info(f"Applying filters to URL: {final_url}")
-            filtered_url = filter_link(final_url)
+            self.logger.info("Applying filters to URL: %s", final_url)
+            filtered_url = filter_link(final_url, bot_id=self.bot_id, category_id=self.category_id)
             if not filtered_url:    
                 self.metrics['filter_stats']['total_filtered'] += 1
                 self.metrics['filter_stats']['filter_reasons'].setdefault('filtered_out', 0)
                 self.metrics['filter_stats']['filter_reasons']['filtered_out'] += 1
                 return {'success': False, 'error': 'URL filtered out'}
         except Exception as e:
-            self.logger.error(f"Error applying filters to URL: {str(e)}")
+            self.logger.error("Error applying filters to URL: %s", e)
             self.metrics['errors']['total'] += 1
             self.metrics['errors']['reasons'].setdefault('url_processing', 0)
             self.metrics['errors']['reasons']['url_processing'] += 1
@@ -448,14 +707,14 @@ class NewsProcessingPipeline:
         
         try:    
             # Check for duplicates
-            self.logger.info(f"Checking for duplicates: {filtered_url}")
+            self.logger.info("Checking for duplicates: %s", filtered_url)
             if is_url_analyzed(filtered_url, self.bot_id):
                 self.metrics['filter_stats']['total_filtered'] += 1
                 self.metrics['filter_stats']['filter_reasons'].setdefault('duplicate', 0)
                 self.metrics['filter_stats']['filter_reasons']['duplicate'] += 1
                 return {'success': False, 'error': 'Duplicate URL'}
         except Exception as e:
-            self.logger.error(f"Error checking for duplicates: {str(e)}")
+            self.logger.error("Error checking for duplicates: %s", e)
             self.metrics['errors']['total'] += 1
             self.metrics['errors']['reasons'].setdefault('url_processing', 0)
             self.metrics['errors']['reasons']['url_processing'] += 1
@@ -492,17 +751,19 @@ class NewsProcessingPipeline:
                     self.metrics['filter_stats']['filter_reasons']['blacklist'] += 1
                     return {
                         'success': False, 
-                        'error': f'Content matches blacklist terms: {", ".join(matching_blacklist)}'
+                        'error': f'Content matches blacklist terms: {", ".join(matching_blacklist)}',
+                        'filtered': True
                     }
             except Exception as e:
-                self.logger.error(f"Error checking keywords: {str(e)}")
+                self.logger.error("Error checking keywords: %s", e)
                 return {'success': False, 'error': f"Keyword check failed: {str(e)}"}
 
             # 2. Check for similar content
             try:
                 is_similar, similarity_score = is_content_similar(
                     content=_article_content,
-                    bot_id=self.bot_id
+                    bot_id=self.bot_id,
+                    category_id=self.category_id
                 )
                 if is_similar:
                     # Save to unwanted articles
@@ -517,9 +778,9 @@ class NewsProcessingPipeline:
                     self.metrics['filter_stats']['total_filtered'] += 1
                     self.metrics['filter_stats']['filter_reasons'].setdefault('similar_content', 0)
                     self.metrics['filter_stats']['filter_reasons']['similar_content'] += 1
-                    return {'success': False, 'error': 'Similar content already exists'}
+                    return {'success': False, 'error': 'Similar content already exists', 'filtered': True}
             except Exception as e:
-                self.logger.error(f"Error checking content similarity: {str(e)}")
+                self.logger.error("Error checking content similarity: %s", e)
                 return {'success': False, 'error': f"Similarity check failed: {str(e)}"}
 
             # 3. Check if content has required keywords, otherwise save to unwanted articles
@@ -535,18 +796,36 @@ class NewsProcessingPipeline:
                 self.metrics['filter_stats']['total_filtered'] += 1
                 self.metrics['filter_stats']['filter_reasons'].setdefault('no_keywords', 0)
                 self.metrics['filter_stats']['filter_reasons']['no_keywords'] += 1
-                return {'success': False, 'error': 'Content does not contain any keywords'}
+                return {'success': False, 'error': 'Content does not contain any keywords', 'filtered': True}
+
+            # 4. Process with Analysis Generator (or queue it for the next batch)
+            if self.deferred_analysis:
+                try:
+                    pending_analysis_id = self.batch_analysis.queue(
+                        bot_id=self.bot_id,
+                        title=_article_title,
+                        content=_article_content,
+                        url=_article_url,
+                        date=_article_date,
+                        keywords=matching_keywords
+                    )
+                except Exception as e:
+                    self.logger.error("Error queuing analysis: %s", e)
+                    return {'success': False, 'error': f"Queuing analysis failed: {str(e)}"}
+                self.metrics['articles_processed'] += 1
+                return {'success': True, 'deferred': True, 'pending_analysis_id': pending_analysis_id}
 
-            # 4. Process with Analysis Generator
             try:
-                self.logger.info(f"Generating analysis...")
+                self.logger.info("Generating analysis...")
                 analysis_result = await self.analysis_generator.generate_analysis(
                     content=_article_content,
                     title=_article_title,
                     bot_id=self.bot_id
                 )
 
-                self.logger.info(f"Analysis result: {analysis_result}")
+                self.logger.info("Analysis generated", extra={'payload': {'analysis_result': analysis_result}})
+                if analysis_result.get('usage'):
+                    self._record_token_usage(analysis_result['usage'])
 
                 if not analysis_result['success']:
                     self.metrics['errors']['total'] += 1
@@ -562,17 +841,16 @@ class NewsProcessingPipeline:
                     new_content = ' '.join(new_content)
                     
 
-                self.logger.info(f"New title: {analysis_result['new_title']}")
-                self.logger.info(f"New content: {analysis_result['new_content'][:100]}...")
+                self.logger.info("New title: %s", analysis_result['new_title'])
                 
                 # Generate audio for the new content
-                # self.logger.info(f"Generating audio...")
+                # self.logger.info("Generating audio...")
                 # audio_result = await self.analysis_generator.generate_audio(
                 #     content=analysis_result['new_content'],
                 #     title=analysis_result['new_title']
                 # )
 
-                # self.logger.info(f"Audio generated: {audio_result['file_path']}, size: {audio_result['metadata']['file_size_mb']} MB")
+                # self.logger.info("Audio generated: %s, size: %s MB", audio_result['file_path'], audio_result['metadata']['file_size_mb'])
 
                 self.metrics['articles_processed'] += 1
                 return {
@@ -584,11 +862,11 @@ class NewsProcessingPipeline:
                 }
 
             except Exception as e:
-                self.logger.error(f"Error in analysis generation: {str(e)}")
+                self.logger.error("Error in analysis generation: %s", e)
                 return {'success': False, 'error': f"Analysis generation failed: {str(e)}"}
 
         except Exception as e:
-            self.logger.error(f"Unexpected error in content processing: {str(e)}")
+            self.logger.error("Unexpected error in content processing: %s", e)
             self.metrics['errors']['total'] += 1
             self.metrics['errors']['reasons'].setdefault('unexpected', 0)
             self.metrics['errors']['reasons']['unexpected'] += 1
@@ -599,6 +877,7 @@ class NewsProcessingPipeline:
         return {
             'success': success,
             'message': message,
+            'run_id': getattr(self, 'run_id', None),
             'metrics': self.metrics,
             'data': results,
         }
\ No newline at end of file
@@ -2,7 +2,9 @@ from typing import Dict, Any, Optional, Tuple, Literal
 from dataclasses import dataclass
 from openai import OpenAI
 from config import Bot
+from .utils.tokens import truncate_to_tokens
 import requests
+import time
 import base64
 import dotenv
 import json
@@ -10,6 +12,14 @@ import os
 
 dotenv.load_dotenv()
 
+class AnalysisTruncatedError(ValueError):
+    """The model stopped at max_tokens (finish_reason 'length'); the request can be retried."""
+    MESSAGE = "Analysis cut off at max_tokens"
+
+    def __init__(self, message: str = MESSAGE):
+        super().__init__(message)
+
+
 @dataclass
 class AnalysisConfig:
     """
@@ -18,8 +28,14 @@ class AnalysisConfig:
     Attributes:
         model (str): OpenAI model identifier. Default is 'gpt-4-turbo-preview' for
             optimal performance and cost balance.
-        max_tokens (int): Maximum tokens in generated response. Default 4000
-            ensures comprehensive analysis while managing costs.
+        max_tokens (int): Hard cap on tokens in the generated response. Default 2000,
+            well above target_tokens so the JSON answer is never cut off mid-object.
+        target_tokens (int): Length the prompt asks the rewrite to stay within.
+            Default 1200 (the output respects the brevity of the source).
+        length_retries (int): Retries of an answer cut off at max_tokens
+            (finish_reason 'length'), each with twice the previous cap. Default 1.
+        max_input_tokens (int): Token budget for the article body sent to the model.
+            Longer articles are trimmed at a sentence boundary. Default 3000.
         temperature (float): Controls randomness in generation (0.0-1.0).
             Lower values (0.3) for more focused, deterministic outputs.
         top_p (float): Nucleus sampling parameter. Default 0.9 provides good
@@ -34,7 +50,10 @@ class AnalysisConfig:
         response_schema (Dict): JSON schema defining expected response structure.
     """
     model: str = "gpt-4o"
-    max_tokens: int = 4000
+    max_tokens: int = 2000
+    target_tokens: int = 1200
+    length_retries: int = 1
+    max_input_tokens: int = 3000
     temperature: float = 0.3
     frequency_penalty: float = 1.0
     presence_penalty: float = 0.0
@@ -66,6 +85,10 @@ class AnalysisGenerator:
         - Configurable model parameters for output control
         - Robust error handling and validation
         - Optimized prompts for financial content analysis
+        - Prompt layout friendly to provider prompt caching: everything that does not
+          depend on the article (bot prompt, rules, requirements) is in the system
+          message, and only the title and trimmed body follow it
+        - Token usage reported per call
     """
     
     DEFAULT_SYSTEM_PROMPT = (
@@ -80,16 +103,23 @@ class AnalysisGenerator:
         "4) Always return your response as a JSON object with 'new_title' and 'new_content' fields"
     )
     
-    USER_PROMPT_TEMPLATE = (
-        "Rewrite this financial analysis in {max_tokens} tokens or less:\n"
-        "Title: {title}\n"
-        "Content: {content}\n\n"
+    # Article-independent instructions, kept in the cacheable system prefix
+    REQUIREMENTS_TEMPLATE = (
+        "\n\nRewrite the financial analysis given by the user in {target_tokens} tokens or less.\n"
         "Requirements:\n"
         "1. Make it engaging and accessible\n"
         "2. Maintain analytical depth\n"
         "3. Keep the core insights\n"
     )
 
+    USER_PROMPT_TEMPLATE = (
+        "Title: {title}\n"
+        "Content: {content}"
+    )
+
+    # Bot prompts are re-read at most this often
+    PROMPT_CACHE_SECONDS = 300
+
     def __init__(self, config: Optional[AnalysisConfig] = None, audio_config: Optional[AudioConfig] = None):
         """
         Initialize the generator with configuration settings.
@@ -107,6 +137,7 @@ class AnalysisGenerator:
         self.openai_client = OpenAI(api_key=self.api_key)
         self.config = config or AnalysisConfig()
         self.audio_config = audio_config or AudioConfig()
+        self._prompt_cache: Dict[int, Tuple[str, float]] = {}
     
     async def generate_analysis(
         self, 
@@ -123,46 +154,135 @@ class AnalysisGenerator:
             bot_id: Identifier for bot-specific customization
         
         Returns:
-            Dict containing new_title, new_content, and success status
+            Dict containing new_title, new_content, usage (token counts of the call)
+            and success status
         """
         try:
             if not content or not bot_id:
                 raise ValueError("Content and bot_id are required")
 
-            system_prompt = await self._get_bot_prompt(bot_id)
-            if not system_prompt:
-                system_prompt = f"{self.DEFAULT_SYSTEM_PROMPT}{self.PROMPT_SUFFIX}"
+            system_prompt = self.get_system_prompt(bot_id)
 
-            new_title, new_content = await self._process_with_openai(
+            new_title, new_content, usage = await self._process_with_openai(
                 content, title, system_prompt
             )
             
             return {
                 'new_title': new_title,
                 'new_content': new_content,
+                'usage': usage,
                 'success': True
             }
 
         except Exception as e:
             return {'success': False, 'error': str(e)}
 
-    async def _get_bot_prompt(self, bot_id: int) -> str:
-        """Get bot-specific prompt or default."""
+    def get_system_prompt(self, bot_id: int) -> str:
+        """
+        Get the bot-specific system prompt, or the default one.
+
+        The result is byte-for-byte identical between calls for the same bot (and cached
+        for PROMPT_CACHE_SECONDS), so it forms a stable prefix for prompt caching.
+        """
+        cached = self._prompt_cache.get(bot_id)
+        if cached and time.monotonic() - cached[1] < self.PROMPT_CACHE_SECONDS:
+            return cached[0]
         try:
             bot = Bot.query.get(bot_id)
-            if bot and bot.prompt:
-                return f"{bot.prompt}{self.PROMPT_SUFFIX}"
-            return None
-            
+            base_prompt = bot.prompt if bot and bot.prompt else self.DEFAULT_SYSTEM_PROMPT
         except Exception as e:
             raise Exception(f"Failed to get bot prompt: {str(e)}")
 
+        system_prompt = (
+            f"{base_prompt.strip()}{self.PROMPT_SUFFIX}"
+            f"{self.REQUIREMENTS_TEMPLATE.format(target_tokens=self.config.target_tokens)}"
+        )
+        self._prompt_cache[bot_id] = (system_prompt, time.monotonic())
+        return system_prompt
+
+    def fit_content(self, content: str) -> Tuple[str, bool]:
+        """
+        Trim an article body to the input token budget.
+
+        Returns:
+            Tuple[str, bool]: The content to send and whether it was trimmed
+        """
+        return truncate_to_tokens(content.strip(), self.config.max_input_tokens, self.config.model)
+
+    def build_request_body(self, content: str, title: str, prompt: str) -> Dict[str, Any]:
+        """
+        Build the chat completion request for an article.
+
+        Used as-is for the synchronous request and as the `body` of a Batch API request,
+        so both modes generate the same analysis. `content` should already be trimmed
+        with `fit_content`.
+        """
+        messages = [
+            {"role": "system", "content": prompt},
+            {
+                "role": "user", 
+                "content": self.USER_PROMPT_TEMPLATE.format(
+                    content=content.strip(),
+                    title=title.strip()
+                )
+            }
+        ]
+        return {
+            'model': self.config.model,
+            'messages': messages,
+            'temperature': self.config.temperature,
+            'response_format': {"type": "json_object"},
+            'seed': self.config.seed,
+            'max_tokens': self.config.max_tokens,
+            'frequency_penalty': self.config.frequency_penalty,
+            'presence_penalty': self.config.presence_penalty
+        }
+
+    @staticmethod
+    def parse_analysis(completion: str, finish_reason: Optional[str] = None) -> Tuple[str, str]:
+        """
+        Parse the model's JSON answer into (new_title, new_content).
+
+        Raises:
+            AnalysisTruncatedError: If the answer was cut off at max_tokens
+            ValueError: If the answer is not the expected JSON object
+        """
+        if finish_reason == 'length':
+            raise AnalysisTruncatedError()
+        content_dict = json.loads(completion)
+       
+        # Validate against schema
+        if not all(k in content_dict for k in ['new_title', 'new_content']):
+            raise ValueError("Invalid response structure")
+        
+        return content_dict['new_title'], content_dict['new_content']
+
+    @staticmethod
+    def usage_from_response(usage: Any) -> Dict[str, int]:
+        """
+        Normalize the token usage of a chat completion (SDK object or batch output dict).
+
+        Returns:
+            Dict[str, int]: prompt_tokens, completion_tokens and cached_tokens (prompt
+                tokens served from the provider's prompt cache)
+        """
+        if usage is None:
+            return {'prompt_tokens': 0, 'completion_tokens': 0, 'cached_tokens': 0}
+        if not isinstance(usage, dict):
+            usage = usage.model_dump()
+        details = usage.get('prompt_tokens_details') or {}
+        return {
+            'prompt_tokens': usage.get('prompt_tokens') or 0,
+            'completion_tokens': usage.get('completion_tokens') or 0,
+            'cached_tokens': details.get('cached_tokens') or 0,
+        }
+
     async def _process_with_openai(
         self, 
         content: str,
         title: str,
         prompt: str
-    ) -> Tuple[str, str]:
+    ) -> Tuple[str, str, Dict[str, Any]]:
         """
         Process content using OpenAI's API with structured output.
         
@@ -172,44 +292,35 @@ class AnalysisGenerator:
             prompt: System prompt for generation
         
         Returns:
-            Tuple of (new_title, new_content)
+            Tuple of (new_title, new_content, usage)
             
         Raises:
             Exception: For API or processing failures
         """
         try:
-            messages = [
-                {"role": "system", "content": prompt},
-                {
-                    "role": "user", 
-                    "content": self.USER_PROMPT_TEMPLATE.format(
-                        max_tokens=self.config.max_tokens,
-                        content=content.strip(),
-                        title=title.strip()
-                    )
-                }
-            ]
-            
+            content, truncated = self.fit_content(content)
+            request_body = self.build_request_body(content, title, prompt)
+            usage = self.usage_from_response(None)
+            for attempt in range(self.config.length_retries + 1):
+                response = self.openai_client.chat.completions.create(
+                    timeout=self.config.timeout_seconds,
+                    **request_body
+                )
+                for key, value in self.usage_from_response(response.usage).items():
+                    usage[key] += value
+                try:
+                    choice = response.choices[0]
+                    new_title, new_content = self.parse_analysis(choice.message.content, choice.finish_reason)
+                    break
+                except AnalysisTruncatedError:
+                    if attempt == self.config.length_retries:
+                        raise
+                    # Cut off mid-answer: ask again with room to finish
+                    request_body['max_tokens'] *= 2
 
-            response = self.openai_client.chat.completions.create(
-                model=self.config.model,
-                messages=messages,
-                temperature=self.config.temperature,
-                response_format={"type": "json_object"},
-                timeout=self.config.timeout_seconds,
-                seed=self.config.seed,
-                max_tokens=self.config.max_tokens,
-                frequency_penalty=self.config.frequency_penalty,
-                presence_penalty=self.config.presence_penalty
-            )
-            completion = response.choices[0].message.content
-            content_dict = json.loads(completion)
-           
-            # Validate against schema
-            if not all(k in content_dict for k in ['new_title', 'new_content']):
-                raise ValueError("Invalid response structure")
-            
-            return content_dict['new_title'], content_dict['new_content']
+            usage['input_truncated'] = truncated
+            usage['model'] = self.config.model
+            return new_title, new_content, usage
 
         except requests.RequestException as e:
             raise Exception(f"API request failed: {str(e)}")
@@ -2,6 +2,8 @@ import requests
 from bs4 import BeautifulSoup
 from typing import Dict, Any, Optional
 from requests.exceptions import RequestException
+from .utils.domain_throttle import domain_throttle, THROTTLE_STATUS_CODES
+from .utils.domain_circuit import domain_breaker
 
 
 class ArticleExtractor:
@@ -13,6 +15,11 @@ class ArticleExtractor:
     3. Extracts the article title and content based on common HTML structures found in news articles. This includes identifying and extracting the title from HTML tags such as `<title>` or `<h1>`, and the content from tags like `<p>` or `<div>`.
 
     The extracted content is then returned as a dictionary, providing a structured representation of the article's metadata and content. 
+
+    Fetches go through the process-wide `domain_throttle`, which spaces out and limits concurrent requests
+    to each publisher and backs off when it answers 429/503 or slows down. Outcomes feed `domain_breaker`:
+    failures that tend to affect a whole domain (timeouts, 4xx/5xx, non-HTML, no extractable content) open
+    its circuit, and `filter_link` then skips the domain until the cooldown ends.
     """
     
     HEADERS = {
@@ -44,17 +51,28 @@ class ArticleExtractor:
             if not url or not isinstance(url, str):
                 raise ValueError("Invalid URL provided")
 
-            # Fetch content
-            response = requests.get(
-                url,
-                headers=ArticleExtractor.HEADERS,
-                timeout=ArticleExtractor.TIMEOUT
-            )
+            # Fetch content, within the publisher's request budget
+            with domain_throttle.slot(url) as slot:
+                try:
+                    response = requests.get(
+                        url,
+                        headers=ArticleExtractor.HEADERS,
+                        timeout=ArticleExtractor.TIMEOUT
+                    )
+                except RequestException as e:
+                    domain_breaker.record_failure(url, type(e).__name__)
+                    raise
+                slot.observe(response.status_code, response.headers.get('Retry-After'))
+
+            # Rate limiting is handled by the throttle, not counted against the domain
+            if response.status_code >= 400 and response.status_code not in THROTTLE_STATUS_CODES:
+                domain_breaker.record_failure(url, f"HTTP {response.status_code}")
             response.raise_for_status()
 
             # Validate content type
             content_type = response.headers.get('Content-Type', '').lower()
             if 'text/html' not in content_type:
+                domain_breaker.record_failure(url, f"content type {content_type or 'missing'}")
                 raise Exception(f"Invalid content type: {content_type}")
 
             # Parse HTML
@@ -67,7 +85,9 @@ class ArticleExtractor:
             content = ArticleExtractor._extract_article_text(soup)
             
             if not content:
+                domain_breaker.record_failure(url, "no content")
                 raise Exception("No content found in article")
+            domain_breaker.record_success(url)
 
             return {
                 'title': title,
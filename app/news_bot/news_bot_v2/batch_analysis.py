@@ -0,0 +1,298 @@
+"""
+Deferred article analysis through the OpenAI Batch API.
+
+Bots with `deferred_analysis` enabled do not call the chat completions endpoint per
+article. The pipeline queues accepted articles in `pending_analysis`, and a scheduled
+job (`run_cycle`) then:
+
+1. submits queued articles as one JSONL batch (same request body as the synchronous
+   path, see `AnalysisGenerator.build_request_body`);
+2. polls submitted batches and stores the generated title/content, re-queuing
+   requests that failed until MAX_ATTEMPTS (answers cut off at max_tokens are retried
+   with a larger cap);
+3. publishes completed analyses: image generation and upload, `DataManager.save_article`,
+   the semantic dedup index and the Slack notification, as the pipeline does. A row
+   whose publishing fails stays completed and is retried on later cycles (the image
+   cache makes a retry cheap) until MAX_PUBLISH_ATTEMPTS.
+
+Batch requests are billed at a discount and do not count against per-minute rate
+limits, at the cost of completing within the batch window instead of immediately.
+Set OPENAI_BATCH_BASE_URL to point the client at the local mock server
+(`mock_batch_server.py`) to exercise the whole flow without OpenAI.
+"""
+import os
+import json
+import logging
+from typing import Any, Dict, List, Optional
+from openai import OpenAI
+from config import Bot, PendingAnalysis, Session, split_keywords
+from app.services.slack.actions import queue_NEWS_message_to_slack_channel
+from .analysis_generator import AnalysisGenerator, AnalysisTruncatedError
+from .image_generator import ImageGenerator
+from .data_manager import DataManager, as_utc_naive
+from .filters import index_saved_article
+
+BATCH_ENDPOINT = '/v1/chat/completions'
+BATCH_COMPLETION_WINDOW = '24h'
+OPENAI_BATCH_BASE_URL = os.getenv('OPENAI_BATCH_BASE_URL')
+MAX_REQUESTS_PER_BATCH = int(os.getenv('BATCH_ANALYSIS_MAX_REQUESTS', 500))
+# Images are generated one by one, so publishing is capped per cycle
+MAX_PUBLISH_PER_CYCLE = int(os.getenv('BATCH_ANALYSIS_MAX_PUBLISH', 20))
+MAX_ATTEMPTS = 3
+MAX_PUBLISH_ATTEMPTS = 5
+# Batch states after which no more output will be produced
+FINAL_BATCH_STATES = {'completed', 'failed', 'expired', 'cancelled'}
+# Channel the pipeline notifies for new articles
+SLACK_CHANNEL_ID = "C071142J72R"
+
+logger = logging.getLogger(__name__)
+
+
+class BatchAnalysisManager:
+    """
+    Queues, submits, polls and publishes deferred analyses.
+
+    Components are created on first use, so queuing an article from the pipeline
+    needs neither an OpenAI client nor S3 credentials.
+    """
+
+    def __init__(self, client: Optional[OpenAI] = None):
+        self._client = client
+        self._analysis_generator = None
+        self._image_generator = None
+        self._data_manager = None
+
+    @property
+    def client(self) -> OpenAI:
+        if self._client is None:
+            self._client = OpenAI(api_key=os.getenv('NEWS_BOT_OPENAI_API_KEY'), base_url=OPENAI_BATCH_BASE_URL)
+        return self._client
+
+    @property
+    def analysis_generator(self) -> AnalysisGenerator:
+        if self._analysis_generator is None:
+            self._analysis_generator = AnalysisGenerator()
+        return self._analysis_generator
+
+    @property
+    def image_generator(self) -> ImageGenerator:
+        if self._image_generator is None:
+            self._image_generator = ImageGenerator()
+        return self._image_generator
+
+    @property
+    def data_manager(self) -> DataManager:
+        if self._data_manager is None:
+            self._data_manager = DataManager()
+        return self._data_manager
+
+    def queue(self, bot_id: int, title: str, content: str, url: str, date: Any, keywords: List[str]) -> int:
+        """
+        Queue an accepted article for the next batch.
+
+        Returns:
+            int: ID of the pending analysis
+        """
+        with Session() as session:
+            pending = PendingAnalysis(
+                bot_id=bot_id,
+                title=title,
+                content=content,
+                url=url,
+                date=as_utc_naive(date),
+                used_keywords=', '.join(keywords or []),
+                status='queued'
+            )
+            session.add(pending)
+            session.commit()
+            return pending.id
+
+    def submit_queued(self) -> Optional[str]:
+        """
+        Submit queued articles as one batch.
+
+        Returns:
+            Optional[str]: The batch ID, or None if nothing was queued
+        """
+        with Session() as session:
+            rows = session.query(PendingAnalysis)\
+                          .filter_by(status='queued')\
+                          .order_by(PendingAnalysis.id)\
+                          .limit(MAX_REQUESTS_PER_BATCH)\
+                          .with_for_update(skip_locked=True)\
+                          .all()
+            if not rows:
+                return None
+
+            prompts = {}
+            lines = []
+            for row in rows:
+                if row.bot_id not in prompts:
+                    prompts[row.bot_id] = self.analysis_generator.get_system_prompt(row.bot_id)
+                content, _ = self.analysis_generator.fit_content(row.content)
+                body = self.analysis_generator.build_request_body(content, row.title or '', prompts[row.bot_id])
+                if row.error == AnalysisTruncatedError.MESSAGE:
+                    # The last answer was cut off: give the retry room to finish
+                    body['max_tokens'] *= 2 ** row.attempts
+                lines.append(json.dumps({
+                    'custom_id': str(row.id),
+                    'method': 'POST',
+                    'url': BATCH_ENDPOINT,
+                    'body': body
+                }))
+
+            batch_file = self.client.files.create(
+                file=('pending_analysis.jsonl', '\n'.join(lines).encode('utf-8')),
+                purpose='batch'
+            )
+            batch = self.client.batches.create(
+                input_file_id=batch_file.id,
+                endpoint=BATCH_ENDPOINT,
+                completion_window=BATCH_COMPLETION_WINDOW
+            )
+            for row in rows:
+                row.status = 'submitted'
+                row.batch_id = batch.id
+                row.attempts += 1
+                row.error = None
+            session.commit()
+            logger.info("Submitted batch %s with %s analyses", batch.id, len(rows))
+            return batch.id
+
+    def _read_results(self, file_id: Optional[str]) -> Dict[str, Dict[str, Any]]:
+        """Parse a batch output or error file into {custom_id: result line}."""
+        if not file_id:
+            return {}
+        results = {}
+        for line in self.client.files.content(file_id).text.splitlines():
+            if line.strip():
+                record = json.loads(line)
+                results[record['custom_id']] = record
+        return results
+
+    def _apply_result(self, row: PendingAnalysis, record: Optional[Dict[str, Any]], batch_status: str) -> None:
+        response = (record or {}).get('response') or {}
+        if response.get('status_code') == 200:
+            try:
+                choice = response['body']['choices'][0]
+                new_title, new_content = AnalysisGenerator.parse_analysis(choice['message']['content'],
+                                                                          choice.get('finish_reason'))
+                row.new_title = new_title
+                row.new_content = ' '.join(new_content) if isinstance(new_content, list) else new_content
+                row.token_usage = AnalysisGenerator.usage_from_response(response['body'].get('usage'))
+                row.status = 'completed'
+                row.error = None
+                return
+            except AnalysisTruncatedError as e:
+                # Re-queued like any failed request, until MAX_ATTEMPTS
+                error = str(e)
+            except (KeyError, IndexError, ValueError) as e:
+                error = f"Invalid analysis in batch output: {str(e)}"
+        elif record is not None:
+            error = json.dumps(record.get('error') or response.get('body', {}).get('error') or response)[:1000]
+        else:
+            error = f"No result for request in {batch_status} batch"
+        row.error = error
+        row.status = 'failed' if row.attempts >= MAX_ATTEMPTS else 'queued'
+
+    def poll_submitted(self) -> Dict[str, int]:
+        """
+        Collect the results of finished batches.
+
+        Returns:
+            Dict[str, int]: Number of analyses completed and re-queued or failed
+        """
+        counts = {'completed': 0, 'retried': 0, 'failed': 0}
+        with Session() as session:
+            batch_ids = [batch_id for (batch_id,) in session.query(PendingAnalysis.batch_id)
+                                                             .filter_by(status='submitted')
+                                                             .distinct()]
+        for batch_id in batch_ids:
+            batch = self.client.batches.retrieve(batch_id)
+            if batch.status not in FINAL_BATCH_STATES:
+                continue
+            results = self._read_results(batch.output_file_id)
+            results.update(self._read_results(batch.error_file_id))
+
+            with Session() as session:
+                rows = session.query(PendingAnalysis).filter_by(status='submitted', batch_id=batch_id).all()
+                for row in rows:
+                    self._apply_result(row, results.get(str(row.id)), batch.status)
+                    counts['retried' if row.status == 'queued' else row.status] += 1
+                session.commit()
+            logger.info("Collected batch %s (%s)", batch_id, batch.status)
+        return counts
+
+    def publish_completed(self) -> int:
+        """
+        Turn completed analyses into articles: image, save, dedup index and Slack.
+
+        Returns:
+            int: Number of articles published
+        """
+        published = 0
+        with Session() as session:
+            rows = session.query(PendingAnalysis)\
+                          .filter_by(status='completed')\
+                          .order_by(PendingAnalysis.publish_attempts, PendingAnalysis.id)\
+                          .limit(MAX_PUBLISH_PER_CYCLE)\
+                          .all()
+            category_ids = dict(session.query(Bot.id, Bot.category_id)
+                                       .filter(Bot.id.in_({row.bot_id for row in rows})))
+
+            for row in rows:
+                try:
+                    image_url = self.image_generator.generate_image(
+                        article_text=row.new_content, bot_id=row.bot_id, fingerprint_text=row.content
+                    )
+                    image_url = self.image_generator.upload_image(image_url=image_url, title=row.new_title)
+                    keywords = split_keywords(row.used_keywords)
+                    row.article_id = self.data_manager.save_article({
+                        'title': row.new_title,
+                        'content': row.new_content,
+                        'image': image_url,
+                        'analysis': '',
+                        'link': row.url,
+                        'date': row.date,
+                        'used_keywords': keywords,
+                        'is_efficient': '',
+                        'is_top_story': False,
+                        'bot_id': row.bot_id,
+                        'source_content': row.content
+                    })
+                except Exception as e:
+                    # Keep the paid-for analysis: retry on a later cycle unless out of attempts
+                    session.rollback()
+                    row.publish_attempts += 1
+                    row.error = f"Publishing failed: {str(e)}"[:1000]
+                    if row.publish_attempts >= MAX_PUBLISH_ATTEMPTS:
+                        row.status = 'failed'
+                    session.commit()
+                    logger.error("Publishing pending analysis %s failed (attempt %s): %s", row.id, row.publish_attempts, e)
+                    continue
+
+                row.status = 'published'
+                row.error = None
+                session.commit()
+                published += 1
+
+                try:
+                    index_saved_article(row.article_id, row.content, category_ids.get(row.bot_id))
+                except Exception as e:
+                    logger.warning("Could not index article %s for deduplication: %s", row.article_id, e)
+                queue_NEWS_message_to_slack_channel(
+                    channel_id=SLACK_CHANNEL_ID,
+                    title=row.new_title,
+                    article_url=row.url,
+                    content=row.new_content,
+                    used_keywords=keywords,
+                    image=image_url,
+                )
+        return published
+
+    def run_cycle(self) -> Dict[str, Any]:
+        """Poll finished batches, publish their articles and submit the queued ones."""
+        counts = self.poll_submitted()
+        counts['published'] = self.publish_completed()
+        counts['submitted_batch'] = self.submit_queued()
+        return counts
@@ -0,0 +1,125 @@
+"""
+Per-item checkpoints of the news pipeline.
+
+Once a feed item's URL is resolved, every completed stage of `_process_item` is
+recorded in `pipeline_checkpoint` together with what the following stages need
+(content, analysis, image URL, article ID). When a later stage fails (image
+generation, S3 upload, database save), the item stays 'active' and the next run of
+the bot resumes it from its last completed stage instead of dropping it or paying
+for the analysis and image again. Items failing MAX_ATTEMPTS times are abandoned.
+"""
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set
+from sqlalchemy.exc import IntegrityError
+from config import PipelineCheckpoint, Session
+from .data_manager import as_utc_naive
+
+STAGES = ('resolved', 'extracted', 'analyzed', 'imaged', 'uploaded', 'saved', 'notified')
+MAX_ATTEMPTS = 3
+# Active items not updated for this long are no longer resumed
+CHECKPOINT_RESUME_HOURS = int(os.getenv('CHECKPOINT_RESUME_HOURS', 48))
+CHECKPOINT_RETENTION_DAYS = 7
+MAX_RESUMED_PER_RUN = 5
+
+
+def stage_reached(checkpoint: Optional[Dict[str, Any]], stage: str) -> bool:
+    """Whether `checkpoint` has completed `stage` (False without a checkpoint)."""
+    return checkpoint is not None and STAGES.index(checkpoint['stage']) >= STAGES.index(stage)
+
+
+class CheckpointStore:
+    """Reads and advances the checkpoints of one bot's items."""
+
+    def __init__(self, bot_id: int):
+        self.bot_id = bot_id
+
+    def start(self, item_key: str, url: str, title: Optional[str], date: Any) -> Optional[Dict[str, Any]]:
+        """
+        Create the checkpoint of an item whose URL was resolved.
+
+        Returns:
+            Optional[Dict[str, Any]]: The checkpoint, or None if the item is already tracked
+        """
+        with Session() as session:
+            checkpoint = PipelineCheckpoint(
+                bot_id=self.bot_id,
+                item_key=item_key,
+                stage='resolved',
+                status='active',
+                url=url,
+                title=title,
+                date=as_utc_naive(date)
+            )
+            session.add(checkpoint)
+            try:
+                session.commit()
+            except IntegrityError:
+                session.rollback()
+                return None
+            return checkpoint.as_dict()
+
+    def advance(self, checkpoint: Dict[str, Any], stage: str, **fields: Any) -> Dict[str, Any]:
+        """Record a completed stage and the fields it produced; 'notified' completes the item."""
+        fields['stage'] = stage
+        fields['error'] = None
+        if stage == STAGES[-1]:
+            fields['status'] = 'done'
+        with Session() as session:
+            session.query(PipelineCheckpoint).filter_by(id=checkpoint['id']).update(fields)
+            session.commit()
+        checkpoint.update(fields)
+        return checkpoint
+
+    def fail(self, checkpoint: Dict[str, Any], error: str) -> None:
+        """Record a failed attempt; the item is abandoned after MAX_ATTEMPTS."""
+        attempts = checkpoint['attempts'] + 1
+        fields = {
+            'attempts': attempts,
+            'error': error[:1000],
+            'status': 'abandoned' if attempts >= MAX_ATTEMPTS else 'active',
+            'updated_at': datetime.now()
+        }
+        with Session() as session:
+            session.query(PipelineCheckpoint).filter_by(id=checkpoint['id']).update(fields)
+            session.commit()
+        checkpoint.update(fields)
+
+    def close(self, checkpoint: Dict[str, Any], status: str, reason: Optional[str] = None) -> None:
+        """End tracking of an item that will not be resumed ('rejected' or 'deferred')."""
+        with Session() as session:
+            session.query(PipelineCheckpoint).filter_by(id=checkpoint['id'])\
+                   .update({'status': status, 'error': reason[:1000] if reason else None})
+            session.commit()
+        checkpoint['status'] = status
+
+    def resumable(self, limit: int = MAX_RESUMED_PER_RUN) -> List[Dict[str, Any]]:
+        """Active checkpoints of the bot updated recently, most advanced first."""
+        since = datetime.now() - timedelta(hours=CHECKPOINT_RESUME_HOURS)
+        with Session() as session:
+            rows = session.query(PipelineCheckpoint)\
+                          .filter(PipelineCheckpoint.bot_id == self.bot_id,
+                                  PipelineCheckpoint.status == 'active',
+                                  PipelineCheckpoint.updated_at >= since)\
+                          .order_by(PipelineCheckpoint.updated_at)\
+                          .all()
+            checkpoints = [row.as_dict() for row in rows]
+        checkpoints.sort(key=lambda checkpoint: STAGES.index(checkpoint['stage']), reverse=True)
+        return checkpoints[:limit]
+
+    def known_item_keys(self) -> Set[str]:
+        """Feed links of every item the bot already has a checkpoint for."""
+        with Session() as session:
+            return {item_key for (item_key,) in session.query(PipelineCheckpoint.item_key)
+                                                       .filter_by(bot_id=self.bot_id)}
+
+    def prune(self, retention_days: int = CHECKPOINT_RETENTION_DAYS) -> int:
+        """Delete the bot's checkpoints not updated within `retention_days`."""
+        cutoff = datetime.now() - timedelta(days=retention_days)
+        with Session() as session:
+            deleted = session.query(PipelineCheckpoint)\
+                             .filter(PipelineCheckpoint.bot_id == self.bot_id,
+                                     PipelineCheckpoint.updated_at < cutoff)\
+                             .delete(synchronize_session=False)
+            session.commit()
+            return deleted
@@ -1,7 +1,15 @@
 from typing import Dict, Any
-from datetime import datetime
+from datetime import datetime, timezone
 from sqlalchemy.exc import SQLAlchemyError
-from config import db, Session, Article, UnwantedArticle, UsedKeywords
+from app.utils.similarity import simhash
+from config import db, Session, Article, UnwantedArticle, UsedKeywords, KeywordDailyCount, split_keywords
+
+def as_utc_naive(value: Any) -> Any:
+    """Store timezone-aware dates (feed publication dates) as UTC in the naive TIMESTAMP columns."""
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
 
 class DataManager:
     """
@@ -22,6 +30,7 @@ class DataManager:
         - Article: Main article content and metadata
         - UnwantedArticle: Rejected or filtered articles
         - UsedKeywords: Keyword tracking and analytics
+        - KeywordDailyCount: Per-day keyword rollup used by trending queries
     
     Usage:
         manager = DataManager()
@@ -57,6 +66,9 @@ class DataManager:
                     - used_keywords (List[str]): Related keywords
                     - is_efficient (str): Efficiency flag
                     - is_top_story (bool): Featured article flag
+                    - source_content (str): Text of the source article, fingerprinted for the
+                      near-duplicate check (which fingerprints incoming source text); the
+                      fingerprint is left empty without it
 
         Returns:
             int: ID of created article
@@ -77,11 +89,12 @@ class DataManager:
                     image=article_data['image'],
                     analysis=article_data['analysis'],
                     url=article_data['link'],
-                    date=article_data.get('date', current_time),
+                    date=as_utc_naive(article_data.get('date', current_time)),
                     used_keywords=article_data.get('used_keywords', ''),
                     is_article_efficent=article_data.get('is_efficient', ''),
                     is_top_story=article_data.get('is_top_story', False),
                     bot_id=article_data['bot_id'],
+                    content_simhash=simhash(article_data['source_content']) if article_data.get('source_content') else None,
                     created_at=current_time,
                     updated_at=current_time
                 )
@@ -104,6 +117,14 @@ class DataManager:
                     )
                     session.add(keywords_entry)
 
+                    # Keep the trending-keywords rollup in step with the new row
+                    KeywordDailyCount.record(
+                        session,
+                        bot_id=article_data['bot_id'],
+                        keywords=split_keywords(keywords_entry.keywords),
+                        day=current_time.date()
+                    )
+
                 session.commit()
                 return new_article.id
 
@@ -156,7 +177,7 @@ class DataManager:
                     content=data['content'],
                     reason=data['reason'],
                     url=data['url'],
-                    date=data['date'],
+                    date=as_utc_naive(data['date']),
                     bot_id=data['bot_id'],
                     created_at=data.get('created_at', current_time),
                     updated_at=data.get('updated_at', current_time)
@@ -0,0 +1,98 @@
+"""
+Cost-ordered pre-filter chain for RSS items.
+
+Each RSS entry already carries its publication date, title and Google News link, so
+cheap checks can reject most items before the pipeline pays for URL resolution (two
+HTTP calls) and article extraction. Stages run in ascending cost order and the chain
+stops at the first rejection; per-stage counters show where items are dropped and how
+long each stage takes.
+"""
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+
+@dataclass
+class FilterStage:
+    """
+    One pre-filter stage.
+
+    Attributes:
+        name (str): Stage name, also used as the filter reason when it rejects an item
+        check (Callable[[Dict[str, Any]], Optional[str]]): Returns None to pass the item,
+            or a human readable rejection message
+        cost (int): Relative cost; cheaper stages run first
+    """
+    name: str
+    check: Callable[[Dict[str, Any]], Optional[str]]
+    cost: int
+    checked: int = field(default=0, init=False)
+    rejected: int = field(default=0, init=False)
+    errors: int = field(default=0, init=False)
+    total_ms: float = field(default=0.0, init=False)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'cost': self.cost,
+            'checked': self.checked,
+            'rejected': self.rejected,
+            'errors': self.errors,
+            'avg_ms': round(self.total_ms / self.checked, 3) if self.checked else None,
+        }
+
+
+@dataclass
+class FilterRejection:
+    """The stage that rejected an item and why."""
+    stage: str
+    error: str
+
+
+class FilterChain:
+    """
+    Runs pluggable `FilterStage`s over an item, cheapest first, stopping at the first rejection.
+
+    A stage that raises rejects the item, as any failing step of the pipeline does,
+    and is counted in the stage's `errors`.
+    """
+
+    def __init__(self, stages: Optional[List[FilterStage]] = None):
+        self._stages: List[FilterStage] = []
+        for stage in stages or []:
+            self.add_stage(stage)
+
+    def add_stage(self, stage: FilterStage) -> 'FilterChain':
+        """Register a stage, keeping the chain sorted by cost."""
+        self._stages.append(stage)
+        self._stages.sort(key=lambda s: s.cost)
+        return self
+
+    @property
+    def stages(self) -> List[str]:
+        return [stage.name for stage in self._stages]
+
+    def run(self, item: Dict[str, Any]) -> Optional[FilterRejection]:
+        """
+        Apply the stages to an item.
+
+        Returns:
+            Optional[FilterRejection]: None if the item passed every stage
+        """
+        for stage in self._stages:
+            started = time.perf_counter()
+            stage.checked += 1
+            try:
+                reason = stage.check(item)
+            except Exception as e:
+                stage.errors += 1
+                reason = f"{stage.name} check failed: {str(e)}"
+            finally:
+                stage.total_ms += (time.perf_counter() - started) * 1000
+            if reason:
+                stage.rejected += 1
+                return FilterRejection(stage=stage.name, error=reason)
+        return None
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-stage counters, in execution order."""
+        return {stage.name: stage.as_dict() for stage in self._stages}
@@ -1,40 +1,140 @@
-import re
 import pytz
+import hashlib
+from collections import OrderedDict
 from sqlalchemy import func
+from sqlalchemy.orm import undefer
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Tuple
-from config import Article, Blacklist, Keyword, UnwantedArticle
-from app.utils.similarity import cosine_similarity_with_openai_classification
-
-def is_recent_date(date_str: str, max_age_hours: int = 24) -> bool:
+from typing import Any, Dict, List, Optional, Tuple, Union
+from config import Article, Blacklist, Keyword, PendingAnalysis, UnwantedArticle
+from .webscrapper import parse_published_date
+from .utils.domain_circuit import domain_breaker
+from .utils.url_filter import url_filters
+from sklearn.metrics.pairwise import cosine_similarity
+from app.utils.similarity import get_embeddings, simhash, hamming_distance, SimHashIndex, SIMHASH_BITS
+from app.utils.semantic_index import semantic_indexes
+
+def is_recent_date(date_value: Union[str, datetime], max_age_hours: int = 24) -> bool:
     """
-    Validate if the given date string is recent within specified hours
+    Validate if the given date is recent within specified hours
     
     Args:
-        date_str: Date string in format like 'Tue, 12 Nov 2024 12:01:45 GMT'
+        date_value: A datetime (naive values are taken as UTC) or a date string, either
+            RFC 822 like 'Tue, 12 Nov 2024 12:01:45 GMT' or ISO 8601
         max_age_hours: Maximum age in hours for a date to be considered recent
         
     Returns:
         bool: True if date is within max_age_hours, False otherwise
     """
-    try:
-        # Parse the date string
-        article_date = datetime.strptime(date_str, '%a, %d %b %Y %H:%M:%S %Z')
-        
-        # Convert to UTC timezone
-        utc = pytz.UTC
-        article_date = utc.localize(article_date)
-        current_time = datetime.now(utc)
-        
-        # Calculate time difference
-        time_diff = current_time - article_date
-        
-        # Check if within max age
-        return abs(time_diff) <= timedelta(hours=max_age_hours)
-        
-    except Exception as e:
-        raise Exception(f"Date validation failed: {str(e)}")
+    article_date = parse_published_date(date_value)
+    if article_date is None:
+        raise Exception(f"Date validation failed: unrecognized date {date_value!r}")
+
+    # Calculate time difference
+    time_diff = datetime.now(pytz.UTC) - article_date
+
+    # Check if within max age
+    return abs(time_diff) <= timedelta(hours=max_age_hours)
+
 
+# SimHash Hamming distances (out of 64 bits) for the lexical pre-filter: at or below
+# NEAR_DUPLICATE_DISTANCE an article is rejected outright; above AMBIGUOUS_DISTANCE the
+# texts share too little wording to be worth an embedding call.
+NEAR_DUPLICATE_DISTANCE = 3
+AMBIGUOUS_DISTANCE = 22
+# How far back the per-bot LSH index looks for near duplicates
+SIMHASH_WINDOW_DAYS = 7
+
+# Articles from other categories must be closer than this to count as the same story
+GLOBAL_SIMILARITY_THRESHOLD = 0.95
+EMBEDDING_CACHE_SIZE = 256
+
+_simhash_indexes: Dict[int, Tuple[datetime, SimHashIndex]] = {}
+_embedding_cache: 'OrderedDict[bytes, List[float]]' = OrderedDict()
+
+
+def _get_simhash_index(bot_id: int) -> SimHashIndex:
+    """
+    Return the bot's LSH index of recent article fingerprints, brought up to date.
+
+    The index is kept per process and topped up incrementally with articles saved
+    since the last call (an indexed bot_id/id range scan), and rebuilt once a day so
+    articles older than the window drop out.
+    """
+    now = datetime.now()
+    built_at, index = _simhash_indexes.get(bot_id, (None, None))
+    if index is None or now - built_at > timedelta(days=1):
+        built_at, index = now, SimHashIndex()
+        _simhash_indexes[bot_id] = (built_at, index)
+
+    rows = Article.query.with_entities(Article.id, Article.content_simhash)\
+                        .filter(Article.bot_id == bot_id,
+                                Article.id > index.last_id,
+                                Article.content_simhash.isnot(None),
+                                Article.created_at >= built_at - timedelta(days=SIMHASH_WINDOW_DAYS))\
+                        .all()
+    for article_id, fingerprint in rows:
+        index.add(article_id, fingerprint)
+    return index
+
+
+def _embed(content: str) -> List[float]:
+    """Embed content, reusing the embedding computed for the same text earlier in the run."""
+    key = hashlib.blake2b(content.encode('utf-8'), digest_size=16).digest()
+    embedding = _embedding_cache.get(key)
+    if embedding is None:
+        embedding = get_embeddings([content])[0]
+        _embedding_cache[key] = embedding
+        if len(_embedding_cache) > EMBEDDING_CACHE_SIZE:
+            _embedding_cache.popitem(last=False)
+    else:
+        _embedding_cache.move_to_end(key)
+    return embedding
+
+
+def index_saved_article(article_id: int, content: str, category_id: Optional[int]) -> None:
+    """
+    Add a newly saved article to the category and global semantic dedup indexes.
+
+    `content` is the source text the article was checked with, so its embedding is
+    normally already cached by `is_content_similar` and no extra API call is made.
+
+    Args:
+        article_id (int): ID of the saved article
+        content (str): Source content the article was generated from
+        category_id (Optional[int]): Category of the bot that saved the article
+    """
+    semantic_indexes.add(article_id, category_id, _embed(content))
+
+
+def find_similar_article_image(content: str, category_id: Optional[int], threshold: float) -> Optional[Tuple[int, str]]:
+    """
+    Find the image of a recently saved article of the category close to `content`.
+
+    Used to give an article that is related to, but not a duplicate of, a recent one the
+    same image instead of generating a new one. The content embedding is normally
+    cached by `is_content_similar`, so no OpenAI call is made.
+
+    Args:
+        content (str): Source content of the new article
+        category_id (Optional[int]): Category of the bot
+        threshold (float): Minimum cosine similarity for reuse
+
+    Returns:
+        Optional[Tuple[int, str]]: (article_id, image URL) of the closest match, or None
+    """
+    if category_id is None or not content.strip():
+        return None
+    matches = semantic_indexes.category(category_id).query(_embed(content), k=3)
+    candidate_ids = [article_id for article_id, score in matches if score >= threshold]
+    if not candidate_ids:
+        return None
+    images = dict(Article.query.with_entities(Article.id, Article.image)
+                               .filter(Article.id.in_(candidate_ids))
+                               .all())
+    for article_id in candidate_ids:
+        if images.get(article_id):
+            return article_id, images[article_id]
+    return None
 
 
 def is_content_similar(
@@ -42,21 +142,31 @@ def is_content_similar(
     bot_id: int,
     limit: int = 10,
     threshold: float = 0.9,
+    category_id: Optional[int] = None,
+    global_threshold: float = GLOBAL_SIMILARITY_THRESHOLD,
 ) -> Tuple[bool, Optional[float]]:
     """
     Check if article content is similar to recently saved articles.
 
-    Compares the given content against the most recent articles for a specific bot
-    using OpenAI's cosine similarity. If similarity exceeds the threshold, the article
-    is saved as unwanted.
+    A SimHash fingerprint of the content is first looked up in the bot's LSH index:
+    exact and near-exact duplicates from the last SIMHASH_WINDOW_DAYS are rejected
+    without any OpenAI call. Otherwise the content is embedded once and looked up in
+    the ANN indexes of recently saved articles: the bot's category (against
+    `threshold`) and all categories (against the stricter `global_threshold`), so a
+    story syndicated across many outlets is caught whichever bot saved it first.
+    Recent articles of the bot that are not in the indexes yet (e.g. saved before a
+    restart without a persisted index) are still compared directly, but only those
+    whose fingerprint is close enough to be ambiguous. If similarity exceeds the
+    threshold, the article is saved as unwanted.
 
     Args:
         content (str): The article content to check
         bot_id (int): ID of the bot performing the check
-        title (str): Title of the article being checked
-        url (str): URL of the article being checked
         limit (int, optional): Number of recent articles to check against. Defaults to 10
         threshold (float, optional): Similarity threshold (0.0 to 1.0). Defaults to 0.9
+        category_id (int, optional): Category of the bot, for the category-wide check
+        global_threshold (float, optional): Similarity threshold for articles of other
+            categories. Defaults to GLOBAL_SIMILARITY_THRESHOLD
 
     Returns:
         Tuple[bool, Optional[float]]: A tuple containing:
@@ -78,27 +188,50 @@ def is_content_similar(
         if isinstance(content, list):
             content = " ".join(content)
 
-        # Get recent articles
-        recent_articles = Article.query.filter_by(bot_id=bot_id)\
+        # Lexical pre-filter: near duplicates need no embedding call
+        fingerprint = simhash(content)
+        near_duplicates = _get_simhash_index(bot_id).query(fingerprint, NEAR_DUPLICATE_DISTANCE)
+        if near_duplicates:
+            _, distance = near_duplicates[0]
+            return True, 1 - distance / SIMHASH_BITS
+
+        # Category-wide and global ANN lookup over the recent window
+        embedding = _embed(content)
+        duplicate = semantic_indexes.find_duplicate(embedding, category_id, threshold, global_threshold)
+        if duplicate:
+            _, similarity_score = duplicate
+            return True, similarity_score
+
+        # Recent articles of this bot missing from the indexes, if lexically ambiguous
+        recent_articles = Article.query.with_entities(Article.id, Article.content_simhash)\
+                                    .filter_by(bot_id=bot_id)\
                                     .order_by(Article.date.desc())\
                                     .limit(limit)\
                                     .all()
+        ambiguous_ids = [
+            article_id for article_id, article_hash in recent_articles
+            if article_id not in semantic_indexes.global_index
+            and (article_hash is None or hamming_distance(fingerprint, article_hash) <= AMBIGUOUS_DISTANCE)
+        ]
+        if not ambiguous_ids:
+            return False, None
+
+        ambiguous_articles = Article.query.options(undefer(Article.content))\
+                                    .filter(Article.id.in_(ambiguous_ids))\
+                                    .all()
+
+        try:
+            article_embeddings = get_embeddings([article.content for article in ambiguous_articles])
+        except Exception as e:
+            raise Exception(
+                f"Error calculating similarity: {str(e)}"
+            )
 
         # Check similarity against each article
-        for article in recent_articles:
-            try:
-                similarity_score = cosine_similarity_with_openai_classification(
-                    article.content, 
-                    content
-                )
-                
-                if similarity_score and similarity_score >= threshold:
-                    return True, similarity_score
-                    
-            except Exception as e:
-                raise Exception(
-                    f"Error calculating similarity: {str(e)}"
-                )
+        scores = cosine_similarity([embedding], article_embeddings)[0]
+        best = int(scores.argmax())
+        if scores[best] >= threshold:
+            return True, float(scores[best])
 
         return False, None
 
@@ -110,8 +243,8 @@ def is_url_analyzed(url: str, bot_id: int) -> bool:
     """
     Check if a URL has been previously processed by a specific bot.
 
-    Verifies if the given URL exists in either the Article or UnwantedArticle tables
-    for the specified bot. This prevents duplicate processing of articles and ensures
+    Verifies if the given URL exists in the Article or UnwantedArticle tables, or is
+    waiting for a batch analysis (PendingAnalysis), for the specified bot. This prevents duplicate processing of articles and ensures
     each URL is only analyzed once per bot. The check is case-insensitive.
 
     Args:
@@ -140,47 +273,46 @@ def is_url_analyzed(url: str, bot_id: int) -> bool:
         Article.url.ilike(url_lower)
     ).first()
     
-    return bool(existing_unwanted_article or existing_article)
+    if existing_unwanted_article or existing_article:
+        return True
+
+    # Queued for a deferred (batch) analysis; failed requests may be picked up again
+    pending_analysis = PendingAnalysis.query.filter(
+        PendingAnalysis.bot_id == bot_id,
+        PendingAnalysis.url.ilike(url_lower),
+        PendingAnalysis.status != 'failed'
+    ).first()
+
+    return bool(pending_analysis)
 
 
-def filter_link(url: str, exclude_terms: List[str] = [
-    'privacy-policy', 'glossary', 'careers', 'about', 'newsletter', 'events',
-    'discord.com', 'tiktok.com', 'b1.com', 'youtube.com', 'yahoo.com', 'uk.movies.yahoo.com',
-    'advertise', 'contact-us', 'cookie-policy', 'terms-of-service', 'sirwin', 'bs3', 'tag', 'learn'
-]) -> str:
+def filter_link(url: str, bot_id: Optional[int] = None, category_id: Optional[int] = None) -> Optional[str]:
     """
-    Filter a URL based on exclude terms and social media patterns.
+    Filter a URL with the bot's URL filter rules (built-in defaults plus `url_filter_rule`
+    rows for all bots, its category and itself), and skip domains whose extraction
+    circuit is open (see `domain_breaker`), before any request is made.
 
     Args:
         url (str): The URL to filter.
-        exclude_terms (List[str]): A list of terms to exclude from the URL.
+        bot_id (Optional[int]): Bot whose rules apply.
+        category_id (Optional[int]): Category of the bot.
 
     Returns:
-        str: The original URL if it passes the filter, None otherwise.
+        Optional[str]: The original URL if it passes the filter, None otherwise.
 
     Raises:
-        ValueError: If the input URL is invalid or if the exclude_terms list is empty.
+        ValueError: If the input URL is invalid.
         Exception: For any unexpected errors during processing.
     """
     if not isinstance(url, str) or not url.strip():
         raise ValueError("Invalid input. Please provide a non-empty URL string.")
-    
-    if not isinstance(exclude_terms, list) or not exclude_terms:
-        raise ValueError("Invalid input. Please provide a non-empty list of exclude terms.")
 
     try:
-        # Normalize URL
-        normalized_url = url.lower().strip()
-
-        # Compile regex patterns
-        exclude_pattern = re.compile(r'|'.join(map(re.escape, exclude_terms)))
-        social_media_pattern = re.compile(r'(facebook\.com|twitter\.com|linkedin\.com|instagram\.com|sponsored|t\.me)')
-
-        # Check if URL passes all filters
-        if not exclude_pattern.search(normalized_url) and not social_media_pattern.search(normalized_url):
-            return url
-        else:
+        if url_filters.engine_for(bot_id, category_id).is_blocked(url):
+            return None
+        if not domain_breaker.allow(url):
             return None
+        return url
 
     except Exception as e:
         raise Exception(f"Error processing URL: {str(e)}") from e
@@ -1,9 +1,9 @@
-import os
 import asyncio
 import datetime
 from typing import Dict, List, Optional
-from playwright.async_api import async_playwright, Page, Browser
+from playwright.async_api import Page
 from werkzeug.exceptions import HTTPException
+from .utils.browser_pool import BrowserPool, browser_pool
 import logging
 
 logger = logging.getLogger(__name__)
@@ -15,24 +15,33 @@ class GrokProcessingError(HTTPException):
 class GrokProcessor:
     """Handles news extraction using Grok AI on X.com."""
     
-    # Browser Configuration
-    BROWSER_CONFIG = {
-        'headless': False,
-        'slow_mo': 2000
-    }
-    
     # Grok URL and Selectors
     GROK_URL = "https://x.com/i/grok"
     INPUT_SELECTOR = "textarea[placeholder='Ask anything']"
     RESPONSE_SELECTOR = "li"
     
     # Time Configuration
-    RESPONSE_WAIT_TIME = 125  # seconds
+    RESPONSE_TIMEOUT = 125  # seconds, upper bound for Grok to finish its answer
+    RESPONSE_QUIET_MS = 3000  # the answer is complete once its text stops changing for this long
     MAX_NEWS_ITEMS = 10
+
+    # True once the text of RESPONSE_SELECTOR elements is non-empty and unchanged for quietMs
+    RESPONSE_DONE_JS = """
+        ([selector, quietMs]) => {
+            const text = Array.from(document.querySelectorAll(selector)).map(e => e.innerText).join('\\n');
+            const now = Date.now();
+            if (window.__grokText !== text) {
+                window.__grokText = text;
+                window.__grokChangedAt = now;
+                return false;
+            }
+            return text.length > 0 && now - window.__grokChangedAt >= quietMs;
+        }
+    """
     
-    def __init__(self):
-        """Initialize GrokProcessor with necessary configurations."""
-        self.user_data_dir = self._setup_user_data_dir()
+    def __init__(self, pool: Optional[BrowserPool] = None):
+        """Initialize GrokProcessor with the shared browser pool."""
+        self.pool = pool or browser_pool
 
     async def fetch_crypto_news(self, coin_name: str) -> List[Dict[str, str]]:
         """
@@ -48,36 +57,16 @@ class GrokProcessor:
             GrokProcessingError: If news fetching fails
         """
         try:
-            async with async_playwright() as playwright:
-                # Launch browser and process news
-                browser = await self._launch_browser(playwright)
-                page = await browser.new_page()
-                
-                # Get news items
-                news_items = await self._process_news_query(page, coin_name)
-                
-                # Cleanup
-                await browser.close()
-                
-                return news_items
+            return await self.pool.run(lambda pool: self._fetch_with_pool(pool, coin_name))
 
         except Exception as e:
             logger.error(f"Failed to fetch news for {coin_name}: {str(e)}")
             raise GrokProcessingError(f"News fetching failed: {str(e)}")
 
-    def _setup_user_data_dir(self) -> str:
-        """Setup and return the user data directory path."""
-        root_dir = os.path.abspath(os.path.dirname(__file__))
-        user_data_dir = os.path.join(root_dir, 'tmp', 'playwright')
-        os.makedirs(user_data_dir, exist_ok=True)
-        return user_data_dir
-
-    async def _launch_browser(self, playwright) -> Browser:
-        """Launch and configure the browser."""
-        return await playwright.chromium.launch_persistent_context(
-            self.user_data_dir,
-            **self.BROWSER_CONFIG
-        )
+    async def _fetch_with_pool(self, pool: BrowserPool, coin_name: str) -> List[Dict[str, str]]:
+        """Run the news query on a page of the pool (on the pool's event loop)."""
+        async with pool.page() as page:
+            return await self._process_news_query(page, coin_name)
 
     async def _process_news_query(self, page: Page, coin_name: str) -> List[Dict[str, str]]:
         """Process the news query and extract results."""
@@ -118,11 +107,21 @@ class GrokProcessor:
         textarea = await page.wait_for_selector(self.INPUT_SELECTOR)
         await textarea.fill(prompt)
         await textarea.press("Enter")
-        await asyncio.sleep(self.RESPONSE_WAIT_TIME)
+        await self._wait_for_response(page)
+
+    async def _wait_for_response(self, page: Page) -> None:
+        """Wait until Grok's answer appears and stops streaming, up to RESPONSE_TIMEOUT."""
+        timeout_ms = self.RESPONSE_TIMEOUT * 1000
+        await page.wait_for_selector(self.RESPONSE_SELECTOR, timeout=timeout_ms)
+        await page.wait_for_function(
+            self.RESPONSE_DONE_JS,
+            arg=[self.RESPONSE_SELECTOR, self.RESPONSE_QUIET_MS],
+            polling=500,
+            timeout=timeout_ms
+        )
 
     async def _extract_news_items(self, page: Page) -> List[Dict[str, str]]:
         """Extract and process news items from Grok's response."""
-        await page.wait_for_selector(self.RESPONSE_SELECTOR)
         response_items = await page.query_selector_all(self.RESPONSE_SELECTOR)
         
         news_items = []
@@ -0,0 +1,136 @@
+"""
+Disk cache of image artifacts keyed by article fingerprint.
+
+Generating an article image costs a GPT-4o call (the DALL·E prompt) and a DALL·E call,
+and DALL·E URLs expire after an hour. When a run fails after the image was generated
+(S3 upload, database save) the article is retried on a later run, which used to pay for
+both calls again. Each stage's output is recorded here as soon as it exists:
+
+- `prompt`: the final DALL·E prompt
+- `<fingerprint>.png`: the generated image bytes
+- `site_url` / `app_url`: the S3 objects the image was uploaded to
+
+so a retry resumes from the last completed stage. Entries expire after
+IMAGE_CACHE_TTL_DAYS and files are written atomically (temporary file, then rename).
+"""
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Any, Dict, Optional
+
+IMAGE_CACHE_DIR = os.getenv(
+    'IMAGE_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'image_cache')
+)
+IMAGE_CACHE_TTL_DAYS = int(os.getenv('IMAGE_CACHE_TTL_DAYS', 7))
+# Image URLs with this scheme point at cached bytes instead of a remote file
+CACHE_URL_SCHEME = 'image-cache://'
+PRUNE_INTERVAL_SECONDS = 3600
+
+
+def image_fingerprint(text: str, bot_id: int, prompt_template: Optional[str] = None) -> str:
+    """
+    Fingerprint of the inputs that determine an article's image.
+
+    Whitespace and case are normalized, since the prompt is built from the lowercased text.
+    """
+    normalized = ' '.join(text.lower().split())
+    digest = hashlib.sha256()
+    for part in (str(bot_id), prompt_template or '', normalized):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+
+class ImageArtifactCache:
+    """
+    Prompt, image bytes and S3 URLs of generated images, by fingerprint.
+
+    Args:
+        directory (str): Where entries are stored
+        ttl_days (int): Entries older than this are ignored and pruned
+    """
+
+    def __init__(self, directory: str = IMAGE_CACHE_DIR, ttl_days: int = IMAGE_CACHE_TTL_DAYS):
+        self.directory = directory
+        self.ttl_seconds = ttl_days * 86400
+        self._lock = threading.Lock()
+        self._last_pruned = 0.0
+
+    def _path(self, fingerprint: str, suffix: str) -> str:
+        return os.path.join(self.directory, fingerprint + suffix)
+
+    def _write(self, path: str, data: bytes) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _is_fresh(self, path: str) -> bool:
+        try:
+            return time.time() - os.path.getmtime(path) < self.ttl_seconds
+        except OSError:
+            return False
+
+    def get(self, fingerprint: str) -> Dict[str, Any]:
+        """Recorded artifacts for a fingerprint (empty if none or expired)."""
+        path = self._path(fingerprint, '.json')
+        if not self._is_fresh(path):
+            return {}
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def update(self, fingerprint: str, **artifacts: Any) -> None:
+        """Record artifacts for a fingerprint, keeping those recorded earlier."""
+        with self._lock:
+            entry = self.get(fingerprint)
+            entry.update(artifacts)
+            entry['updated_at'] = time.time()
+            self._write(self._path(fingerprint, '.json'), json.dumps(entry).encode('utf-8'))
+        self._maybe_prune()
+
+    def get_image(self, fingerprint: str) -> Optional[bytes]:
+        path = self._path(fingerprint, '.png')
+        if not self._is_fresh(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def has_image(self, fingerprint: str) -> bool:
+        return self._is_fresh(self._path(fingerprint, '.png'))
+
+    def put_image(self, fingerprint: str, data: bytes) -> str:
+        """
+        Store generated image bytes.
+
+        Returns:
+            str: A CACHE_URL_SCHEME URL that `ImageGenerator.upload_image` accepts
+        """
+        self._write(self._path(fingerprint, '.png'), data)
+        return f"{CACHE_URL_SCHEME}{fingerprint}"
+
+    def _maybe_prune(self) -> None:
+        now = time.time()
+        if now - self._last_pruned < PRUNE_INTERVAL_SECONDS:
+            return
+        self._last_pruned = now
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        for name in names:
+            path = os.path.join(self.directory, name)
+            try:
+                if now - os.path.getmtime(path) >= self.ttl_seconds:
+                    os.remove(path)
+            except OSError:
+                pass
@@ -5,6 +5,7 @@ from io import BytesIO
 from openai import OpenAI
 from config import Bot
 from PIL import Image
+from .image_cache import CACHE_URL_SCHEME, ImageArtifactCache, image_fingerprint
 import requests
 import dotenv
 import boto3
@@ -26,6 +27,7 @@ class ImageConfig:
     image_style: str = "natural"
     image_quality: str = "hd"
     timeout_seconds: int = 30
+    use_cache: bool = True
 
 class ImageGenerator:
     # Default prompt for generating DALL-E prompts when none exists in database
@@ -41,7 +43,8 @@ class ImageGenerator:
     def __init__(
         self,
         openai_key: Optional[str] = None,
-        config: Optional[ImageConfig] = None
+        config: Optional[ImageConfig] = None,
+        cache: Optional[ImageArtifactCache] = None
     ):
         """Initialize the ImageGenerator with API keys and configuration."""
         self.openai_key = openai_key or os.getenv('NEWS_BOT_OPENAI_API_KEY')
@@ -50,6 +53,7 @@ class ImageGenerator:
             
         self.config = config or ImageConfig()
         self.openai_client = OpenAI(api_key=self.openai_key)
+        self.cache = (cache or ImageArtifactCache()) if self.config.use_cache else None
         self._init_s3_client()
 
     def _init_s3_client(self):
@@ -64,17 +68,26 @@ class ImageGenerator:
     def generate_image(
         self, 
         article_text: str, 
-        bot_id: int
-    ) -> Dict[str, Any]:
+        bot_id: int,
+        fingerprint_text: Optional[str] = None
+    ) -> str:
         """
         Generate an AI image based on article content using bot-specific settings.
 
+        With the artifact cache enabled, a retry of the same article resumes from the
+        last completed stage: an image already uploaded to S3 is returned as is, a
+        generated image is reused without calling DALL-E, and a written prompt is reused
+        without calling GPT.
+
         Args:
             article_text (str): Article text to base image on
             bot_id (int): Database ID of the bot requesting the image
+            fingerprint_text (Optional[str]): Text identifying the article in the cache.
+                Defaults to article_text; pass the source article so a re-generated
+                analysis still hits the cache.
 
         Returns:
-            Dict[str, Any]: Result containing generated image URL
+            str: URL of the image, to be passed to `upload_image`
         """
         try:
             if not article_text or not bot_id:
@@ -82,30 +95,53 @@ class ImageGenerator:
 
             # Get the bot's DALL-E prompt from database or generate one
             dalle_prompt = self._get_bot_prompt(bot_id)
-            
-            # If we got a stored DALL-E prompt, use it directly
-            if dalle_prompt and dalle_prompt != "" and dalle_prompt != 'test':
-                if '@article' in dalle_prompt:
-                    prompt = dalle_prompt.replace('@article', article_text.strip().lower())
-                else:
-                    prompt = dalle_prompt
-            else:
-                # Generate a new prompt using GPT
-                initial_prompt = self.DEFAULT_IMAGE_GENERATION_PROMPT.format(
-                    article=article_text.strip().lower()
-                )
-                prompt = self.generate_prompt(initial_prompt)
-                prompt = f"{prompt} {self.DEFAULT_IMAGE_PROMPT}"
-                
-            if len(prompt) > self.config.max_prompt_length:
-                prompt = prompt[:self.config.max_prompt_length].strip()
+
+            fingerprint = None
+            cached = {}
+            if self.cache is not None:
+                fingerprint = image_fingerprint(fingerprint_text or article_text, bot_id, dalle_prompt)
+                cached = self.cache.get(fingerprint)
+                if cached.get('app_url'):
+                    return cached['app_url']
+                if self.cache.has_image(fingerprint):
+                    return f"{CACHE_URL_SCHEME}{fingerprint}"
+
+            prompt = cached.get('prompt')
+            if not prompt:
+                prompt = self._build_prompt(article_text, dalle_prompt)
+                if fingerprint:
+                    self.cache.update(fingerprint, prompt=prompt)
            
             image_url = self._generate_dalle_image(prompt)
-            return image_url
+            if not fingerprint:
+                return image_url
+
+            # DALL-E URLs expire, so keep the bytes for a retry of the upload
+            return self.cache.put_image(fingerprint, self._download_image(image_url).content)
             
         except Exception as e:
             raise Exception(f"{str(e)}")
 
+    def _build_prompt(self, article_text: str, dalle_prompt: Optional[str]) -> str:
+        """Build the final DALL-E prompt from the bot's prompt or a GPT-written one."""
+        # If we got a stored DALL-E prompt, use it directly
+        if dalle_prompt and dalle_prompt != "" and dalle_prompt != 'test':
+            if '@article' in dalle_prompt:
+                prompt = dalle_prompt.replace('@article', article_text.strip().lower())
+            else:
+                prompt = dalle_prompt
+        else:
+            # Generate a new prompt using GPT
+            initial_prompt = self.DEFAULT_IMAGE_GENERATION_PROMPT.format(
+                article=article_text.strip().lower()
+            )
+            prompt = self.generate_prompt(initial_prompt)
+            prompt = f"{prompt} {self.DEFAULT_IMAGE_PROMPT}"
+
+        if len(prompt) > self.config.max_prompt_length:
+            prompt = prompt[:self.config.max_prompt_length].strip()
+        return prompt
+
     def _get_bot_prompt(self, bot_id: int) -> Optional[str]:
         """
         Retrieve bot-specific DALL-E prompt from database.
@@ -175,22 +211,32 @@ class ImageGenerator:
         Download, resize and upload image to S3 buckets.
 
         Args:
-            image_url (str): URL of the generated image
+            image_url (str): URL returned by `generate_image`
             title (str): Title to use for filename
 
         Returns:
             str: Public URL of the uploaded image
         """
         try:
+            # Already uploaded on an earlier attempt
+            if image_url.startswith(f"https://{self.config.s3_app_bucket}.s3.amazonaws.com/"):
+                return image_url
+
             # Sanitize filename
             filename = self._sanitize_filename(title) + ".jpg"
             
-            # Download image
-            response = self._download_image(image_url)
-            image = Image.open(BytesIO(response.content))
+            fingerprint = None
+            if image_url.startswith(CACHE_URL_SCHEME):
+                fingerprint = image_url[len(CACHE_URL_SCHEME):]
+                image_bytes = self.cache.get_image(fingerprint) if self.cache is not None else None
+                if image_bytes is None:
+                    raise Exception("Cached image is no longer available")
+            else:
+                image_bytes = self._download_image(image_url).content
+            image = Image.open(BytesIO(image_bytes))
             
             # Upload original to sites bucket
-            self._upload_to_s3(
+            site_url = self._upload_to_s3(
                 image, 
                 self.config.s3_site_bucket, 
                 filename
@@ -203,6 +249,9 @@ class ImageGenerator:
                 self.config.s3_app_bucket, 
                 filename
             )
+
+            if fingerprint:
+                self.cache.update(fingerprint, site_url=site_url, app_url=url)
             
             return url
             
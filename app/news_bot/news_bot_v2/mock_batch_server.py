@@ -0,0 +1,174 @@
+"""
+Local mock of the OpenAI Files and Batch endpoints used by deferred analysis.
+
+Lets the whole deferred-analysis flow (queue, submit, poll, publish) run without
+OpenAI. Batches complete MOCK_BATCH_DELAY_SECONDS after creation; each request gets a
+chat completion whose JSON answer echoes the article title and the start of its
+content. Requests whose title contains MOCK_BATCH_FAIL_MARKER are answered with an
+error to exercise the retry path. State is kept in memory.
+
+Usage:
+    python app/news_bot/news_bot_v2/mock_batch_server.py --port 8089
+    OPENAI_BATCH_BASE_URL=http://localhost:8089/v1 python run.py
+"""
+import os
+import re
+import json
+import time
+import uuid
+import argparse
+from flask import Flask, Response, jsonify, request
+
+MOCK_BATCH_DELAY_SECONDS = float(os.getenv('MOCK_BATCH_DELAY_SECONDS', 5))
+MOCK_BATCH_FAIL_MARKER = os.getenv('MOCK_BATCH_FAIL_MARKER', '[mock-fail]')
+
+app = Flask(__name__)
+files = {}
+batches = {}
+
+
+def _new_id(prefix):
+    return f"{prefix}-{uuid.uuid4().hex[:24]}"
+
+
+def _store_file(filename, purpose, content):
+    file_id = _new_id('file')
+    files[file_id] = {
+        'id': file_id,
+        'object': 'file',
+        'bytes': len(content),
+        'created_at': int(time.time()),
+        'filename': filename,
+        'purpose': purpose,
+        'status': 'processed',
+        'content': content,
+    }
+    return file_id
+
+
+def _file_object(file_id):
+    return {key: value for key, value in files[file_id].items() if key != 'content'}
+
+
+def _mock_completion(body):
+    user_message = body['messages'][-1]['content']
+    title = re.search(r'^Title: (.*)$', user_message, re.MULTILINE)
+    content = re.search(r'^Content: (.*?)(?:\n\nRequirements:|\Z)', user_message, re.MULTILINE | re.DOTALL)
+    title = title.group(1) if title else ''
+    if MOCK_BATCH_FAIL_MARKER in title:
+        return None, {'message': 'Mock failure requested by title marker', 'code': 'mock_failure'}
+    answer = {
+        'new_title': f"[mock] {title}",
+        'new_content': (content.group(1) if content else '')[:500],
+    }
+    return {
+        'id': _new_id('chatcmpl'),
+        'object': 'chat.completion',
+        'created': int(time.time()),
+        'model': body.get('model'),
+        'choices': [{
+            'index': 0,
+            'message': {'role': 'assistant', 'content': json.dumps(answer)},
+            'finish_reason': 'stop',
+        }],
+        'usage': {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0},
+    }, None
+
+
+def _complete(batch):
+    """Produce the output and error files of a batch whose delay has elapsed."""
+    output_lines, error_lines = [], []
+    for line in files[batch['input_file_id']]['content'].decode('utf-8').splitlines():
+        if not line.strip():
+            continue
+        request_line = json.loads(line)
+        completion, error = _mock_completion(request_line['body'])
+        if error:
+            error_lines.append(json.dumps({
+                'id': _new_id('batch_req'),
+                'custom_id': request_line['custom_id'],
+                'response': {'status_code': 400, 'request_id': _new_id('req'), 'body': {'error': error}},
+                'error': None,
+            }))
+        else:
+            output_lines.append(json.dumps({
+                'id': _new_id('batch_req'),
+                'custom_id': request_line['custom_id'],
+                'response': {'status_code': 200, 'request_id': _new_id('req'), 'body': completion},
+                'error': None,
+            }))
+    now = int(time.time())
+    batch.update({
+        'status': 'completed',
+        'in_progress_at': batch['created_at'],
+        'finalizing_at': now,
+        'completed_at': now,
+        'output_file_id': _store_file('batch_output.jsonl', 'batch_output', '\n'.join(output_lines).encode('utf-8')) if output_lines else None,
+        'error_file_id': _store_file('batch_errors.jsonl', 'batch_output', '\n'.join(error_lines).encode('utf-8')) if error_lines else None,
+        'request_counts': {
+            'total': len(output_lines) + len(error_lines),
+            'completed': len(output_lines),
+            'failed': len(error_lines),
+        },
+    })
+
+
+@app.route('/v1/files', methods=['POST'])
+def create_file():
+    upload = request.files['file']
+    file_id = _store_file(upload.filename, request.form.get('purpose', 'batch'), upload.read())
+    return jsonify(_file_object(file_id))
+
+
+@app.route('/v1/files/<file_id>', methods=['GET'])
+def retrieve_file(file_id):
+    if file_id not in files:
+        return jsonify({'error': {'message': f'No such file: {file_id}'}}), 404
+    return jsonify(_file_object(file_id))
+
+
+@app.route('/v1/files/<file_id>/content', methods=['GET'])
+def file_content(file_id):
+    if file_id not in files:
+        return jsonify({'error': {'message': f'No such file: {file_id}'}}), 404
+    return Response(files[file_id]['content'], mimetype='application/jsonl')
+
+
+@app.route('/v1/batches', methods=['POST'])
+def create_batch():
+    data = request.get_json()
+    if data.get('input_file_id') not in files:
+        return jsonify({'error': {'message': 'input_file_id not found'}}), 400
+    batch_id = _new_id('batch')
+    batches[batch_id] = {
+        'id': batch_id,
+        'object': 'batch',
+        'endpoint': data['endpoint'],
+        'input_file_id': data['input_file_id'],
+        'completion_window': data.get('completion_window', '24h'),
+        'status': 'in_progress',
+        'created_at': int(time.time()),
+        'output_file_id': None,
+        'error_file_id': None,
+        'metadata': data.get('metadata'),
+        'request_counts': {'total': 0, 'completed': 0, 'failed': 0},
+    }
+    return jsonify(batches[batch_id])
+
+
+@app.route('/v1/batches/<batch_id>', methods=['GET'])
+def retrieve_batch(batch_id):
+    batch = batches.get(batch_id)
+    if batch is None:
+        return jsonify({'error': {'message': f'No such batch: {batch_id}'}}), 404
+    if batch['status'] == 'in_progress' and time.time() - batch['created_at'] >= MOCK_BATCH_DELAY_SECONDS:
+        _complete(batch)
+    return jsonify(batch)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    args = parser.parse_args()
+    app.run(host=args.host, port=args.port)
@@ -0,0 +1,181 @@
+"""
+Shared, warm headless browser for Playwright work.
+
+`GrokProcessor` and `resolve_redirects_playwright` used to launch a persistent Chromium
+for every call (with `slow_mo=2000`), then sleep a fixed time (125 s for a Grok answer,
+7 s for a redirect). `BrowserPool` keeps a single Playwright instance and persistent
+browser context alive on a dedicated event-loop thread, so:
+
+- the browser is launched once per process, and relaunched if it crashes or is closed;
+- at most MAX_PAGES pages are open at once; callers beyond that wait for a free page;
+- callers wait for events (a selector, a URL change, network idle) instead of sleeping.
+
+The context uses one user data directory, so the X.com session of the Grok account is
+kept between calls. Set BROWSER_HEADLESS=false to log in by hand once.
+
+Async callers (any event loop) await `run`; sync callers use `run_sync`.
+"""
+import os
+import time
+import atexit
+import asyncio
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+from urllib.parse import urlparse
+from playwright.async_api import async_playwright, BrowserContext, Page
+
+MAX_PAGES = int(os.getenv('BROWSER_MAX_PAGES', 4))
+HEADLESS = os.getenv('BROWSER_HEADLESS', 'true').lower() != 'false'
+USER_DATA_DIR = os.getenv(
+    'BROWSER_USER_DATA_DIR',
+    os.path.join(os.path.abspath(os.path.dirname(os.path.dirname(__file__))), 'tmp', 'playwright')
+)
+# Longest a redirecting page may take to land on its final URL
+REDIRECT_TIMEOUT_MS = 10000
+# Resources not needed to follow redirects
+BLOCKED_RESOURCE_TYPES = {'image', 'media', 'font', 'stylesheet'}
+
+
+class BrowserPool:
+    """One warm browser context with a bounded number of pages, driven from its own loop."""
+
+    def __init__(self, max_pages: int = MAX_PAGES, headless: bool = HEADLESS,
+                 user_data_dir: str = USER_DATA_DIR):
+        self.max_pages = max_pages
+        self.headless = headless
+        self.user_data_dir = user_data_dir
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+        self._playwright = None
+        self._context: Optional[BrowserContext] = None
+        self._launch_lock: Optional[asyncio.Lock] = None
+        self._pages: Optional[asyncio.Semaphore] = None
+        self.launches = 0
+        self.pages_opened = 0
+        self.in_use = 0
+        self.busy_seconds = 0.0
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._thread_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=loop.run_forever, name='browser-pool', daemon=True)
+                self._thread.start()
+                self._loop = loop
+            return self._loop
+
+    def submit(self, coro_factory: Callable[['BrowserPool'], Awaitable[Any]]) -> Future:
+        """Schedule `coro_factory(self)` on the pool's loop."""
+        return asyncio.run_coroutine_threadsafe(coro_factory(self), self._ensure_loop())
+
+    async def run(self, coro_factory: Callable[['BrowserPool'], Awaitable[Any]]) -> Any:
+        """Await `coro_factory(self)`, run on the pool's loop, from any event loop."""
+        return await asyncio.wrap_future(self.submit(coro_factory))
+
+    def run_sync(self, coro_factory: Callable[['BrowserPool'], Awaitable[Any]],
+                 timeout: Optional[float] = None) -> Any:
+        """Run `coro_factory(self)` on the pool's loop and block for its result; cancelled on timeout."""
+        future = self.submit(coro_factory)
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise
+
+    async def _get_context(self) -> BrowserContext:
+        if self._launch_lock is None:
+            self._launch_lock = asyncio.Lock()
+            self._pages = asyncio.Semaphore(self.max_pages)
+        async with self._launch_lock:
+            if self._context is None:
+                os.makedirs(self.user_data_dir, exist_ok=True)
+                if self._playwright is None:
+                    self._playwright = await async_playwright().start()
+                self._context = await self._playwright.chromium.launch_persistent_context(
+                    self.user_data_dir,
+                    headless=self.headless
+                )
+                # Relaunch on next use if the browser dies or is closed
+                self._context.on('close', lambda _: setattr(self, '_context', None))
+                self.launches += 1
+            return self._context
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[Page]:
+        """A new page of the shared context, closed on exit. Must run on the pool's loop."""
+        context = await self._get_context()
+        async with self._pages:
+            page = await context.new_page()
+            self.pages_opened += 1
+            self.in_use += 1
+            started = time.monotonic()
+            try:
+                yield page
+            finally:
+                self.in_use -= 1
+                self.busy_seconds += time.monotonic() - started
+                if not page.is_closed():
+                    await page.close()
+
+    async def resolve_redirects(self, url: str, timeout_ms: int = REDIRECT_TIMEOUT_MS) -> str:
+        """
+        Final URL of a page after HTTP and JavaScript redirects.
+
+        Returns as soon as the page leaves its original host, or once the network is
+        idle without a redirect, instead of after a fixed delay.
+        """
+        host = urlparse(url).hostname
+        async with self.page() as page:
+            await page.route('**/*', lambda route: route.abort()
+                             if route.request.resource_type in BLOCKED_RESOURCE_TYPES else route.continue_())
+            await page.goto(url, wait_until='domcontentloaded', timeout=timeout_ms)
+            if urlparse(page.url).hostname != host:
+                return page.url
+
+            waits = {
+                asyncio.ensure_future(page.wait_for_url(lambda u: urlparse(u).hostname != host, timeout=timeout_ms)),
+                asyncio.ensure_future(page.wait_for_load_state('networkidle', timeout=timeout_ms)),
+            }
+            done, pending = await asyncio.wait(waits, return_when=asyncio.FIRST_COMPLETED)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*waits, return_exceptions=True)
+            return page.url
+
+    async def _close(self) -> None:
+        if self._context is not None:
+            await self._context.close()
+            self._context = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    def close(self) -> None:
+        """Close the browser and stop the loop thread."""
+        with self._thread_lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._close(), loop).result(10)
+        except Exception:
+            pass
+        loop.call_soon_threadsafe(loop.stop)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'running': self._context is not None,
+            'headless': self.headless,
+            'max_pages': self.max_pages,
+            'pages_in_use': self.in_use,
+            'pages_opened': self.pages_opened,
+            'launches': self.launches,
+            'avg_page_seconds': round(self.busy_seconds / self.pages_opened, 2) if self.pages_opened else None,
+        }
+
+
+browser_pool = BrowserPool()
+atexit.register(browser_pool.close)
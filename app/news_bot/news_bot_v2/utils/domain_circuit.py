@@ -0,0 +1,126 @@
+"""
+Per-domain circuit breaker fed by article extraction outcomes.
+
+Some publishers fail every extraction (paywalls, 403s, non-HTML responses, timeouts),
+and each of their articles used to cost a Google News resolution plus a full fetch
+timeout on every run. After FAILURE_THRESHOLD consecutive failures a domain's circuit
+opens and its articles are skipped for a cooldown (BASE_COOLDOWN_SECONDS, doubling each
+time the domain fails again, up to MAX_COOLDOWN_SECONDS). Once the cooldown is over the
+circuit is half-open: one article is let through as a probe, and its extraction closes
+the circuit or reopens it.
+
+State is kept per process, like the fetch throttle, and shared by all bots.
+"""
+import os
+import time
+import threading
+from typing import Any, Dict, Optional
+from .domain_throttle import DomainThrottle
+
+FAILURE_THRESHOLD = int(os.getenv('DOMAIN_BREAKER_FAILURES', 3))
+BASE_COOLDOWN_SECONDS = float(os.getenv('DOMAIN_BREAKER_COOLDOWN_SECONDS', 1800))
+MAX_COOLDOWN_SECONDS = 24 * 3600
+# A probe that never reports back (the item was filtered before extraction) is replaced
+PROBE_TIMEOUT_SECONDS = 300
+
+
+class _DomainCircuit:
+    def __init__(self):
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self.cooldown = BASE_COOLDOWN_SECONDS
+        self.probe_started: Optional[float] = None
+        self.times_opened = 0
+        self.skipped = 0
+        self.last_failure: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        remaining = self.opened_at + self.cooldown - time.monotonic() if self.state == 'open' else 0
+        return {
+            'state': self.state,
+            'consecutive_failures': self.failures,
+            'times_opened': self.times_opened,
+            'cooldown_remaining_seconds': round(max(0.0, remaining), 1),
+            'skipped': self.skipped,
+            'last_failure': self.last_failure,
+        }
+
+
+class DomainCircuitBreaker:
+    """Closed/open/half-open circuit per publisher domain."""
+
+    def __init__(self, failure_threshold: int = FAILURE_THRESHOLD):
+        self.failure_threshold = failure_threshold
+        self._circuits: Dict[str, _DomainCircuit] = {}
+        self._lock = threading.Lock()
+
+    def _circuit(self, url: str) -> _DomainCircuit:
+        host = DomainThrottle.host_of(url)
+        circuit = self._circuits.get(host)
+        if circuit is None:
+            circuit = self._circuits[host] = _DomainCircuit()
+        return circuit
+
+    def _blocked(self, circuit: _DomainCircuit, now: float) -> bool:
+        if circuit.state == 'open':
+            return now - circuit.opened_at < circuit.cooldown
+        if circuit.state == 'half_open':
+            return circuit.probe_started is not None and now - circuit.probe_started < PROBE_TIMEOUT_SECONDS
+        return False
+
+    def is_open(self, url: str) -> bool:
+        """Whether the URL's domain is currently skipped. Does not start a probe."""
+        with self._lock:
+            return self._blocked(self._circuit(url), time.monotonic())
+
+    def allow(self, url: str) -> bool:
+        """
+        Whether an article of the URL's domain may be fetched.
+
+        When the cooldown of an open circuit is over, the first caller gets True and its
+        fetch is the half-open probe; other callers are refused until it reports back.
+        """
+        now = time.monotonic()
+        with self._lock:
+            circuit = self._circuit(url)
+            if self._blocked(circuit, now):
+                circuit.skipped += 1
+                return False
+            if circuit.state != 'closed':
+                circuit.state = 'half_open'
+                circuit.probe_started = now
+            return True
+
+    def record_success(self, url: str) -> None:
+        with self._lock:
+            circuit = self._circuit(url)
+            circuit.state = 'closed'
+            circuit.failures = 0
+            circuit.cooldown = BASE_COOLDOWN_SECONDS
+            circuit.probe_started = None
+
+    def record_failure(self, url: str, reason: str) -> None:
+        """Count an extraction failure that is likely to repeat for the whole domain."""
+        with self._lock:
+            circuit = self._circuit(url)
+            circuit.failures += 1
+            circuit.last_failure = reason
+            if circuit.state == 'half_open':
+                # The probe failed: back off for longer
+                circuit.cooldown = min(circuit.cooldown * 2, MAX_COOLDOWN_SECONDS)
+            elif circuit.state == 'open' or circuit.failures < self.failure_threshold:
+                return
+            circuit.state = 'open'
+            circuit.opened_at = time.monotonic()
+            circuit.probe_started = None
+            circuit.times_opened += 1
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Circuits that recorded a failure, by host."""
+        with self._lock:
+            return {host: circuit.as_dict() for host, circuit in sorted(self._circuits.items())
+                    if circuit.times_opened or circuit.failures}
+
+
+domain_breaker = DomainCircuitBreaker()
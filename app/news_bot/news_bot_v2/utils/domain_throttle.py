@@ -0,0 +1,281 @@
+"""
+Adaptive per-domain politeness for article fetches.
+
+Every bot runs in its own scheduler thread and fetches publisher pages directly, so
+several bots picking up the same story used to hit one publisher at once and get
+throttled or blocked. `DomainThrottle` is shared by all bots of the process and gives
+each host:
+
+- a token bucket (`rate` requests per second, `burst` tokens) spacing out requests;
+- a concurrency limit on requests in flight;
+- AIMD adaptation: every success below the latency target adds RATE_INCREASE to the
+  rate (and a slot every CONCURRENCY_INCREASE_EVERY successes); a 429/503, a timeout
+  or a slow response multiplies the rate by DECREASE_FACTOR and halves the
+  concurrency. Retry-After is honoured by pausing the host.
+
+Limits per domain can be pinned with the DOMAIN_THROTTLE_OVERRIDES environment
+variable, a JSON object such as {"reuters.com": {"rate": 0.5, "max_concurrency": 1}}
+(subdomains inherit their parent domain's override), or with `set_override`.
+"""
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict, replace
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Iterator, Optional
+from urllib.parse import urlparse
+
+THROTTLE_STATUS_CODES = {429, 503}
+RATE_INCREASE = 0.1
+DECREASE_FACTOR = 0.5
+CONCURRENCY_INCREASE_EVERY = 5
+# Responses slower than this count as a sign of an overloaded host
+LATENCY_TARGET_SECONDS = float(os.getenv('DOMAIN_LATENCY_TARGET_SECONDS', 4))
+LATENCY_EWMA_ALPHA = 0.3
+MAX_RETRY_AFTER_SECONDS = 300
+# Longest a fetch waits for its host before giving up
+MAX_WAIT_SECONDS = 60
+
+
+@dataclass
+class DomainLimits:
+    """
+    Bounds of a host's adaptive limits.
+
+    Attributes:
+        rate (float): Initial requests per second
+        burst (int): Token bucket size
+        max_concurrency (int): Upper bound of requests in flight
+        min_rate (float): Floor the rate never decreases below
+        max_rate (float): Ceiling the rate never increases above
+        adaptive (bool): Whether responses adjust the limits; False pins rate and concurrency
+    """
+    rate: float = 1.0
+    burst: int = 2
+    max_concurrency: int = 2
+    min_rate: float = 0.05
+    max_rate: float = 4.0
+    adaptive: bool = True
+
+
+class DomainThrottleTimeout(Exception):
+    """Raised when a host does not free up a slot within the wait limit."""
+
+
+class _HostState:
+    def __init__(self, limits: DomainLimits):
+        self.limits = limits
+        self.rate = limits.rate
+        self.concurrency = 1 if limits.adaptive else limits.max_concurrency
+        self.tokens = float(limits.burst)
+        self.refilled_at = time.monotonic()
+        self.paused_until = 0.0
+        self.in_flight = 0
+        self.successes_since_increase = 0
+        self.latency_ewma: Optional[float] = None
+        self.requests = 0
+        self.throttled = 0
+        self.failures = 0
+        self.wait_seconds = 0.0
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.limits.burst, self.tokens + (now - self.refilled_at) * self.rate)
+        self.refilled_at = now
+
+    def seconds_until_ready(self, now: float) -> float:
+        """0 if a request may start now, otherwise how long to wait before checking again."""
+        if now < self.paused_until:
+            return self.paused_until - now
+        if self.in_flight >= self.concurrency:
+            return 0.05
+        self.refill(now)
+        if self.tokens < 1:
+            return (1 - self.tokens) / self.rate
+        return 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'rate': round(self.rate, 3),
+            'concurrency': self.concurrency,
+            'in_flight': self.in_flight,
+            'latency_ewma_ms': round(self.latency_ewma * 1000, 1) if self.latency_ewma is not None else None,
+            'paused_for_seconds': round(max(0.0, self.paused_until - time.monotonic()), 1),
+            'requests': self.requests,
+            'throttled': self.throttled,
+            'failures': self.failures,
+            'avg_wait_ms': round(self.wait_seconds / self.requests * 1000, 1) if self.requests else None,
+            'limits': asdict(self.limits),
+        }
+
+
+class FetchSlot:
+    """A granted request slot; report the response with `observe`."""
+
+    def __init__(self, throttle: 'DomainThrottle', host: str):
+        self.throttle = throttle
+        self.host = host
+        self.started = time.monotonic()
+        self.observed = False
+
+    def observe(self, status_code: int, retry_after: Optional[str] = None) -> None:
+        """Report the HTTP status (and Retry-After header, if any) of the request."""
+        self.observed = True
+        self.throttle._observe(self.host, status_code, time.monotonic() - self.started, retry_after)
+
+
+def _retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER_SECONDS)
+
+
+class DomainThrottle:
+    """Process-wide token buckets and concurrency limits per host, adapted with AIMD."""
+
+    def __init__(self, default_limits: Optional[DomainLimits] = None,
+                 overrides: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.default_limits = default_limits or DomainLimits()
+        self._overrides: Dict[str, DomainLimits] = {}
+        self._hosts: Dict[str, _HostState] = {}
+        self._condition = threading.Condition()
+        for domain, limits in (overrides or {}).items():
+            self.set_override(domain, **limits)
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        host = (urlparse(url).hostname or '').lower()
+        return host[4:] if host.startswith('www.') else host
+
+    def set_override(self, domain: str, **limits: Any) -> None:
+        """Pin limits for a domain and its subdomains (fields of `DomainLimits`)."""
+        domain = domain.lower()
+        with self._condition:
+            self._overrides[domain] = replace(self.default_limits, **limits)
+            for host in list(self._hosts):
+                if host == domain or host.endswith('.' + domain):
+                    del self._hosts[host]
+
+    def _limits_for(self, host: str) -> DomainLimits:
+        parts = host.split('.')
+        for i in range(len(parts) - 1):
+            limits = self._overrides.get('.'.join(parts[i:]))
+            if limits is not None:
+                return limits
+        return self.default_limits
+
+    def _state(self, host: str) -> _HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _HostState(self._limits_for(host))
+        return state
+
+    @contextmanager
+    def slot(self, url: str, max_wait: float = MAX_WAIT_SECONDS) -> Iterator[FetchSlot]:
+        """
+        Wait for the host's token bucket and concurrency limit, then hold a slot.
+
+        A request that raises inside the block (timeout, connection error) counts as a
+        failure for the host; otherwise call `FetchSlot.observe` with the response status.
+
+        Raises:
+            DomainThrottleTimeout: If no slot frees up within `max_wait` seconds
+        """
+        host = self.host_of(url)
+        waited_from = time.monotonic()
+        deadline = waited_from + max_wait
+        with self._condition:
+            state = self._state(host)
+            while True:
+                now = time.monotonic()
+                delay = state.seconds_until_ready(now)
+                if delay <= 0:
+                    break
+                if now + delay > deadline:
+                    raise DomainThrottleTimeout(f"No request slot for {host} within {max_wait:.0f}s")
+                self._condition.wait(delay)
+            state.tokens -= 1
+            state.in_flight += 1
+            state.requests += 1
+            state.wait_seconds += time.monotonic() - waited_from
+
+        fetch_slot = FetchSlot(self, host)
+        try:
+            yield fetch_slot
+        except Exception:
+            if not fetch_slot.observed:
+                self._observe(host, None, time.monotonic() - fetch_slot.started, None)
+            raise
+        finally:
+            with self._condition:
+                state.in_flight -= 1
+                self._condition.notify_all()
+
+    def _observe(self, host: str, status_code: Optional[int], latency: float, retry_after: Optional[str]) -> None:
+        with self._condition:
+            state = self._state(host)
+            limits = state.limits
+            throttled = status_code in THROTTLE_STATUS_CODES
+            failed = status_code is None
+            if throttled:
+                state.throttled += 1
+            elif failed:
+                state.failures += 1
+            else:
+                state.latency_ewma = latency if state.latency_ewma is None else \
+                    LATENCY_EWMA_ALPHA * latency + (1 - LATENCY_EWMA_ALPHA) * state.latency_ewma
+
+            pause = _retry_after_seconds(retry_after) if throttled else None
+            if pause:
+                state.paused_until = max(state.paused_until, time.monotonic() + pause)
+
+            if not limits.adaptive:
+                return
+            if throttled or failed or latency > LATENCY_TARGET_SECONDS:
+                # Multiplicative decrease
+                state.rate = max(limits.min_rate, state.rate * DECREASE_FACTOR)
+                state.concurrency = max(1, state.concurrency // 2)
+                state.tokens = min(state.tokens, 0.0)
+                state.successes_since_increase = 0
+            else:
+                # Additive increase
+                state.rate = min(limits.max_rate, state.rate + RATE_INCREASE)
+                state.successes_since_increase += 1
+                if state.successes_since_increase >= CONCURRENCY_INCREASE_EVERY:
+                    state.concurrency = min(limits.max_concurrency, state.concurrency + 1)
+                    state.successes_since_increase = 0
+            self._condition.notify_all()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Current limits and counters per host."""
+        with self._condition:
+            return {host: state.as_dict() for host, state in sorted(self._hosts.items())}
+
+
+def _load_overrides() -> Dict[str, Dict[str, Any]]:
+    """Overrides from DOMAIN_THROTTLE_OVERRIDES; malformed entries and unknown fields are ignored."""
+    raw = os.getenv('DOMAIN_THROTTLE_OVERRIDES')
+    if not raw:
+        return {}
+    try:
+        overrides = json.loads(raw)
+    except ValueError:
+        return {}
+    if not isinstance(overrides, dict):
+        return {}
+    fields = set(DomainLimits.__dataclass_fields__)
+    return {
+        domain: {key: value for key, value in limits.items() if key in fields}
+        for domain, limits in overrides.items() if isinstance(limits, dict)
+    }
+
+
+domain_throttle = DomainThrottle(overrides=_load_overrides())
@@ -7,7 +7,7 @@ import aiofiles
 from functools import wraps
 from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
-from playwright.sync_api import sync_playwright
+from .browser_pool import browser_pool
 
 def transform_string(input_string):
     """
@@ -22,14 +22,15 @@ def transform_string(input_string):
     return doubled_words
 
 
-def resolve_redirects_playwright(url: str) -> str:
+def resolve_redirects_playwright(url: str, timeout: float = 30) -> str:
     """
     Resolves redirects for a given URL using Playwright.
 
-    This function launches a Playwright browser instance, navigates to the provided URL, waits for any redirects to complete, and returns the final URL.
+    This function opens a page of the shared headless browser (see `browser_pool`), navigates to the provided URL, waits until it leaves the original host or the network is idle, and returns the final URL.
 
     Args:
         url (str): The URL to resolve redirects for.
+        timeout (float): Seconds to wait for a free page and the navigation.
 
     Returns:
         str: The final URL after resolving redirects.
@@ -37,24 +38,8 @@ def resolve_redirects_playwright(url: str) -> str:
     Raises:
         Exception: If an error occurs while using Playwright.
     """
-    root_dir = os.path.abspath(os.path.dirname(__file__))
-    user_data_dir = os.path.join(root_dir, 'tmp/playwright')
-
-    if not os.path.exists(user_data_dir):
-        os.makedirs(user_data_dir, exist_ok=True)
-
     try:
-        with sync_playwright() as p:
-            # Launch Chromium in non-headless mode
-            browser = p.chromium.launch_persistent_context(user_data_dir, headless=True, slow_mo=2000)
-            page = browser.new_page()
-            page.goto(url)
-            time.sleep(7)
-
-            # Get the final URL
-            final_url = page.url
-            browser.close()
-            return final_url
+        return browser_pool.run_sync(lambda pool: pool.resolve_redirects(url), timeout=timeout)
 
     except Exception as e:
         raise Exception(f"Error using Playwright: {e}")
@@ -0,0 +1,181 @@
+"""
+Non-blocking JSON logging sink for the news processing pipeline.
+
+Pipeline loggers only get a `QueueHandler`: the calling thread stamps the record with
+the current run/item correlation IDs and enqueues it. A single `QueueListener` thread
+formats every record as one JSON line and writes it to the bot's rotating log file, so
+formatting and disk I/O never run on the pipeline's critical path.
+
+Large payloads (article bodies, model responses) are passed as `extra={'payload': {...}}`
+and sampled: one record in PAYLOAD_SAMPLE_RATE keeps them in full, the rest keep a short
+preview plus their length.
+"""
+import os
+import json
+import queue
+import atexit
+import logging
+import threading
+import contextvars
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+LOG_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'logs')
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 3
+
+PAYLOAD_PREVIEW_CHARS = 200
+PAYLOAD_SAMPLE_RATE = 20
+
+run_id_var = contextvars.ContextVar('run_id', default=None)
+item_id_var = contextvars.ContextVar('item_id', default=None)
+
+# LogRecord attributes that are not user supplied `extra` fields
+_RESERVED_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime', 'bot_name', '_json_line'}
+
+
+class _ContextFilter(logging.Filter):
+    """Stamps correlation IDs from the current context onto each record (runs in the caller)."""
+
+    def __init__(self, bot_name):
+        super().__init__()
+        self.bot_name = bot_name
+
+    def filter(self, record):
+        record.bot_name = self.bot_name
+        record.run_id = run_id_var.get()
+        record.item_id = item_id_var.get()
+        return True
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler that leaves formatting to the writer thread.
+
+    The default `prepare` formats the message and traceback in the calling thread; the
+    queue is in-process, so the record can be enqueued as is.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats a record as a single JSON line, sampling large payloads."""
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._payload_count = 0
+
+    def _sample_payload(self, payload):
+        with self._lock:
+            self._payload_count += 1
+            keep_full = self._payload_count % PAYLOAD_SAMPLE_RATE == 1
+        sampled = {}
+        for key, value in payload.items():
+            text = value if isinstance(value, str) else json.dumps(value, default=str)
+            if keep_full or len(text) <= PAYLOAD_PREVIEW_CHARS:
+                sampled[key] = value
+            else:
+                sampled[key] = {'preview': text[:PAYLOAD_PREVIEW_CHARS], 'chars': len(text)}
+        return sampled
+
+    def format(self, record):
+        # RotatingFileHandler formats once for its rollover check and again to write
+        cached = getattr(record, '_json_line', None)
+        if cached is not None:
+            return cached
+        entry = {
+            'time': datetime.fromtimestamp(record.created).strftime('%Y-%m-%d %H:%M:%S'),
+            'level': record.levelname,
+            'logger': record.name,
+            'run_id': getattr(record, 'run_id', None),
+            'item_id': getattr(record, 'item_id', None),
+            'message': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key in _RESERVED_ATTRS or key in entry:
+                continue
+            entry[key] = self._sample_payload(value) if key == 'payload' and isinstance(value, dict) else value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        record._json_line = json.dumps(entry, default=str, ensure_ascii=False)
+        return record._json_line
+
+
+class _BotFileRouter(logging.Handler):
+    """Writer-thread handler that routes records to one rotating file per bot."""
+
+    def __init__(self):
+        super().__init__()
+        self.formatter = JsonFormatter()
+        self._handlers = {}
+
+    def emit(self, record):
+        bot_name = getattr(record, 'bot_name', None) or 'pipeline'
+        handler = self._handlers.get(bot_name)
+        if handler is None:
+            os.makedirs(LOG_DIR, exist_ok=True)
+            handler = RotatingFileHandler(
+                filename=os.path.join(LOG_DIR, f'{bot_name}.log'),
+                maxBytes=LOG_MAX_BYTES,
+                backupCount=LOG_BACKUP_COUNT,
+                encoding='utf-8'
+            )
+            handler.setFormatter(self.formatter)
+            self._handlers[bot_name] = handler
+        handler.handle(record)
+
+    def close(self):
+        for handler in self._handlers.values():
+            handler.close()
+        super().close()
+
+
+_queue = queue.SimpleQueue()
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def _ensure_listener():
+    global _listener
+    with _listener_lock:
+        if _listener is None:
+            router = _BotFileRouter()
+            _listener = QueueListener(_queue, router, respect_handler_level=False)
+            _listener.start()
+            atexit.register(shutdown)
+
+
+def shutdown():
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+            _listener = None
+
+
+def get_pipeline_logger(bot_name, level=logging.INFO):
+    """
+    Return the logger for a bot's pipeline, attached to the shared queue sink.
+
+    Args:
+        bot_name (str): Bot name; records are written to logs/<bot_name>.log
+        level (int): Minimum level to enqueue
+
+    Returns:
+        logging.Logger: Logger whose records are written by the sink's writer thread
+    """
+    _ensure_listener()
+    logger = logging.getLogger(f"NewsScraper-{bot_name}")
+    logger.setLevel(level)
+    logger.handlers.clear()
+    logger.filters.clear()
+    handler = _DeferredQueueHandler(_queue)
+    handler.addFilter(_ContextFilter(bot_name))
+    logger.addHandler(handler)
+    return logger
@@ -1,13 +1,20 @@
 import json
+import time
+import hashlib
+import threading
 import requests
+from collections import OrderedDict
 from lxml import etree
-from urllib.parse import quote
+from urllib.parse import quote, urlparse
 from typing import Tuple, Optional
 
 class GoogleNewsURLExtractor:
     """Handles extraction of original URLs from Google News links."""
     
     GOOGLE_NEWS_API = "https://news.google.com/_/DotsSplashUi/data/batchexecute"
+    GOOGLE_NEWS_HOST = "news.google.com"
+    # Longest a plain HTTP redirect chain may take to follow for non-Google News links
+    REDIRECT_TIMEOUT = 10
     
     HEADERS = {
         'Host': 'news.google.com',
@@ -24,6 +31,72 @@ class GoogleNewsURLExtractor:
         'Accept-Encoding': 'gzip, deflate, br',
     }
 
+    # Resolved URLs keyed by a hash of the Google News link. Feeds repeat most of their
+    # entries on every run, so this spares the two HTTP calls for links seen before.
+    RESOLVED_CACHE_SIZE = 5000
+    RESOLVED_CACHE_TTL = 48 * 3600
+    _resolved = OrderedDict()
+    _resolved_lock = threading.Lock()
+
+    @staticmethod
+    def url_hash(google_url: str) -> str:
+        """Stable short hash of a Google News link, used as the resolution cache key."""
+        return hashlib.blake2b(google_url.encode('utf-8'), digest_size=12).hexdigest()
+
+    @classmethod
+    def cached_original_url(cls, google_url: str) -> Optional[str]:
+        """
+        Return the previously resolved URL for a Google News link without any HTTP call.
+
+        Args:
+            google_url (str): The Google News URL
+
+        Returns:
+            Optional[str]: The original article URL, or None if it was not resolved recently
+        """
+        key = cls.url_hash(google_url)
+        with cls._resolved_lock:
+            entry = cls._resolved.get(key)
+            if entry is None:
+                return None
+            original_url, resolved_at = entry
+            if time.monotonic() - resolved_at > cls.RESOLVED_CACHE_TTL:
+                del cls._resolved[key]
+                return None
+            cls._resolved.move_to_end(key)
+            return original_url
+
+    @classmethod
+    def _remember(cls, google_url: str, original_url: str) -> None:
+        key = cls.url_hash(google_url)
+        with cls._resolved_lock:
+            cls._resolved[key] = (original_url, time.monotonic())
+            cls._resolved.move_to_end(key)
+            while len(cls._resolved) > cls.RESOLVED_CACHE_SIZE:
+                cls._resolved.popitem(last=False)
+
+    @classmethod
+    def is_google_news_url(cls, url: str) -> bool:
+        """Whether the link points to news.google.com and needs the batchexecute resolution."""
+        return (urlparse(url).hostname or '').lower() == cls.GOOGLE_NEWS_HOST
+
+    @staticmethod
+    def _follow_redirects(url: str) -> str:
+        """
+        Final URL after plain HTTP redirects, or the link itself if it cannot be reached.
+
+        Args:
+            url (str): Any non-Google News link
+
+        Returns:
+            str: The URL the redirect chain lands on
+        """
+        try:
+            response = requests.head(url, allow_redirects=True, timeout=GoogleNewsURLExtractor.REDIRECT_TIMEOUT)
+            return response.url or url
+        except requests.RequestException:
+            return url
+
     @staticmethod
     def extract_original_url(google_url: str) -> Optional[str]:
         """
@@ -33,6 +106,10 @@ class GoogleNewsURLExtractor:
         1. Extracts required parameters from the Google News page
         2. Makes an API request to Google News to get the original URL
 
+        Links from any other host are returned as they are, after following plain HTTP
+        redirects. Links resolved in the last RESOLVED_CACHE_TTL seconds are answered
+        from memory.
+
         Args:
             google_url (str): The Google News URL to process
 
@@ -42,6 +119,15 @@ class GoogleNewsURLExtractor:
         Raises:
             URLExtractionError: If URL extraction fails
         """
+        cached_url = GoogleNewsURLExtractor.cached_original_url(google_url)
+        if cached_url:
+            return cached_url
+
+        if not GoogleNewsURLExtractor.is_google_news_url(google_url):
+            original_url = GoogleNewsURLExtractor._follow_redirects(google_url)
+            GoogleNewsURLExtractor._remember(google_url, original_url)
+            return original_url
+
         try:
             # Step 1: Get required parameters
             params = GoogleNewsURLExtractor._extract_params(google_url)
@@ -49,7 +135,10 @@ class GoogleNewsURLExtractor:
                 return None
 
             # Step 2: Get original URL using parameters
-            return GoogleNewsURLExtractor._fetch_original_url(*params)
+            original_url = GoogleNewsURLExtractor._fetch_original_url(*params)
+            if original_url:
+                GoogleNewsURLExtractor._remember(google_url, original_url)
+            return original_url
 
         except Exception as e:
             raise Exception(f"Failed to extract URL: {str(e)}")
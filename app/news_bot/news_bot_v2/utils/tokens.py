@@ -0,0 +1,70 @@
+"""
+Token counting and trimming for LLM prompts.
+
+Uses the model's tiktoken encoding when tiktoken is installed and its encoding files
+are available; otherwise falls back to an estimate of CHARS_PER_TOKEN characters per
+token, which is close enough for English news text to keep prompts inside a budget.
+"""
+from functools import lru_cache
+from typing import Tuple
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - optional dependency
+    tiktoken = None
+
+CHARS_PER_TOKEN = 4
+FALLBACK_ENCODING = 'o200k_base'
+# When trimming, prefer ending on a sentence boundary within this share of the budget
+SENTENCE_BOUNDARY_WINDOW = 0.2
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: str):
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        pass
+    except Exception:
+        # The encoding files are downloaded on first use and may be unreachable
+        return None
+    try:
+        return tiktoken.get_encoding(FALLBACK_ENCODING)
+    except Exception:
+        return None
+
+
+def count_tokens(text: str, model: str) -> int:
+    """Number of tokens `text` takes for `model` (estimated without tiktoken)."""
+    encoding = _encoding(model)
+    if encoding is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: str) -> Tuple[str, bool]:
+    """
+    Trim `text` to at most `max_tokens` tokens, ending on a sentence boundary when one
+    is close to the cut.
+
+    Returns:
+        Tuple[str, bool]: The (possibly) trimmed text and whether it was trimmed
+    """
+    encoding = _encoding(model)
+    if encoding is None:
+        max_chars = max_tokens * CHARS_PER_TOKEN
+        if len(text) <= max_chars:
+            return text, False
+        trimmed = text[:max_chars]
+    else:
+        tokens = encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text, False
+        trimmed = encoding.decode(tokens[:max_tokens])
+
+    boundary = max(trimmed.rfind('. '), trimmed.rfind('.\n'))
+    if boundary >= len(trimmed) * (1 - SENTENCE_BOUNDARY_WINDOW):
+        trimmed = trimmed[:boundary + 1]
+    return trimmed.rstrip(), True
@@ -0,0 +1,188 @@
+"""
+Trie-based URL filter engine.
+
+`filter_link` used to recompile two regexes from a hard-coded term list on every call
+and matched the terms as substrings anywhere in the URL, so `tag`, `about` or `learn`
+also rejected articles such as `/news/learning-from-the-etf-launch`. URLs are now parsed
+into host labels and path segments and matched against precompiled tries:
+
+- `host` rules match a domain and its subdomains (`yahoo.com` blocks `uk.movies.yahoo.com`);
+- `path` rules match whole path segments, or a run of consecutive segments
+  (`tag` blocks `/tag/bitcoin` but not `/news/tag-team`; `news/sponsored` blocks
+  `/en/news/sponsored/x`).
+
+Rules are the built-in DEFAULT_RULES plus the `url_filter_rule` rows that apply to a
+bot: global rows, rows of its category and rows of the bot itself. `allow` rules win
+over `block` rules, so a bot can re-enable a domain blocked by default. Engines are
+cached per (bot, category) and rebuilt when the table changes, which is checked at most
+every RELOAD_INTERVAL_SECONDS.
+"""
+import time
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+from sqlalchemy import func, or_
+from config import Session, UrlFilterRule
+
+RULE_TYPES = ('host', 'path')
+RULE_ACTIONS = ('block', 'allow')
+RELOAD_INTERVAL_SECONDS = 30
+
+DEFAULT_RULES = [
+    *(('host', host) for host in (
+        'facebook.com', 'twitter.com', 'linkedin.com', 'instagram.com', 't.me',
+        'discord.com', 'tiktok.com', 'youtube.com', 'yahoo.com', 'b1.com',
+    )),
+    *(('path', segment) for segment in (
+        'privacy-policy', 'cookie-policy', 'terms-of-service', 'glossary', 'careers',
+        'about', 'about-us', 'contact-us', 'newsletter', 'newsletters', 'events', 'advertise',
+        'tag', 'tags', 'learn', 'sponsored', 'sirwin', 'bs3',
+    )),
+]
+
+
+@dataclass(frozen=True)
+class UrlFilterMatch:
+    """The rule that decided a URL."""
+    action: str
+    rule_type: str
+    value: str
+
+    def __str__(self) -> str:
+        return f"{self.action} {self.rule_type}:{self.value}"
+
+
+class _Trie:
+    """Trie over token sequences; a terminal node holds the rule's value."""
+
+    def __init__(self):
+        self.root: Dict = {}
+
+    def add(self, tokens: List[str], value: str) -> None:
+        node = self.root
+        for token in tokens:
+            node = node.setdefault(token, {})
+        node[None] = value
+
+    def match_prefix(self, tokens: List[str], start: int = 0) -> Optional[str]:
+        """Value of the shortest rule that is a prefix of tokens[start:]."""
+        node = self.root
+        for token in tokens[start:]:
+            node = node.get(token)
+            if node is None:
+                return None
+            if None in node:
+                return node[None]
+        return None
+
+
+def split_host(host: str) -> List[str]:
+    """Host labels from the top-level domain down: `uk.movies.yahoo.com` -> com, yahoo, movies, uk."""
+    host = host.lower().strip('.')
+    return [label for label in reversed(host.split('.')) if label]
+
+
+def split_path(path: str) -> List[str]:
+    return [segment for segment in unquote(path).lower().split('/') if segment]
+
+
+class UrlFilterEngine:
+    """Compiled block/allow rules for host suffixes and path segments."""
+
+    def __init__(self, rules: Iterable[Tuple[str, str, str]]):
+        """
+        Args:
+            rules (Iterable[Tuple[str, str, str]]): (action, rule_type, value) triples
+        """
+        self._tries = {(action, rule_type): _Trie() for action in RULE_ACTIONS for rule_type in RULE_TYPES}
+        self.rule_count = 0
+        for action, rule_type, value in rules:
+            tokens = split_host(value) if rule_type == 'host' else split_path(value)
+            if tokens:
+                self._tries[(action, rule_type)].add(tokens, value)
+                self.rule_count += 1
+
+    def _match(self, action: str, host_labels: List[str], segments: List[str]) -> Optional[UrlFilterMatch]:
+        value = self._tries[(action, 'host')].match_prefix(host_labels)
+        if value is not None:
+            return UrlFilterMatch(action, 'host', value)
+        path_trie = self._tries[(action, 'path')]
+        for start in range(len(segments)):
+            value = path_trie.match_prefix(segments, start)
+            if value is not None:
+                return UrlFilterMatch(action, 'path', value)
+        return None
+
+    def check(self, url: str) -> Optional[UrlFilterMatch]:
+        """
+        Decide a URL.
+
+        Returns:
+            Optional[UrlFilterMatch]: The matching allow rule, or the matching block rule,
+                or None when no rule applies (the URL is accepted)
+        """
+        parsed = urlparse(url.strip())
+        host_labels = split_host(parsed.hostname or '')
+        segments = split_path(parsed.path)
+        return self._match('allow', host_labels, segments) or self._match('block', host_labels, segments)
+
+    def is_blocked(self, url: str) -> bool:
+        match = self.check(url)
+        return match is not None and match.action == 'block'
+
+
+class UrlFilterRegistry:
+    """Per-(bot, category) engines built from DEFAULT_RULES and `url_filter_rule`, hot-reloaded."""
+
+    def __init__(self, reload_interval: float = RELOAD_INTERVAL_SECONDS):
+        self.reload_interval = reload_interval
+        self._engines: Dict[Tuple[Optional[int], Optional[int]], UrlFilterEngine] = {}
+        self._version = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _table_version(self, session) -> Tuple[int, Optional[object]]:
+        return tuple(session.query(func.count(UrlFilterRule.id), func.max(UrlFilterRule.updated_at)).one())
+
+    def _refresh(self) -> None:
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_interval:
+            return
+        with Session() as session:
+            version = self._table_version(session)
+        self._checked_at = now
+        if version != self._version:
+            self._version = version
+            self._engines.clear()
+
+    def _load(self, bot_id: Optional[int], category_id: Optional[int]) -> UrlFilterEngine:
+        scopes = [(UrlFilterRule.bot_id.is_(None) & UrlFilterRule.category_id.is_(None))]
+        if bot_id is not None:
+            scopes.append(UrlFilterRule.bot_id == bot_id)
+        if category_id is not None:
+            scopes.append(UrlFilterRule.category_id == category_id)
+        with Session() as session:
+            rows = session.query(UrlFilterRule.action, UrlFilterRule.rule_type, UrlFilterRule.value)\
+                          .filter(or_(*scopes))\
+                          .all()
+        return UrlFilterEngine([('block', rule_type, value) for rule_type, value in DEFAULT_RULES] + list(rows))
+
+    def engine_for(self, bot_id: Optional[int] = None, category_id: Optional[int] = None) -> UrlFilterEngine:
+        """The engine for a bot's rules, rebuilt when the rule table has changed."""
+        with self._lock:
+            self._refresh()
+            key = (bot_id, category_id)
+            engine = self._engines.get(key)
+            if engine is None:
+                engine = self._engines[key] = self._load(bot_id, category_id)
+            return engine
+
+    def invalidate(self) -> None:
+        """Drop every cached engine (after rules change in this process)."""
+        with self._lock:
+            self._engines.clear()
+            self._checked_at = 0.0
+
+
+url_filters = UrlFilterRegistry()
@@ -1,7 +1,51 @@
 import random
+import calendar
 import feedparser
-from datetime import datetime
-from typing import List, Dict
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timedelta, timezone
+from typing import Any, List, Dict, Optional
+
+
+def parse_published_date(value: Any) -> Optional[datetime]:
+    """
+    Normalize a feed date to a timezone-aware UTC datetime.
+
+    Accepts datetimes (naive ones are taken as UTC), `time.struct_time` values such as
+    feedparser's `published_parsed` (which are always UTC), RFC 822 strings used by RSS
+    ('Tue, 12 Nov 2024 12:01:45 GMT', any zone or offset) and ISO 8601 strings used by Atom.
+
+    Returns:
+        Optional[datetime]: The date in UTC, or None if it cannot be parsed
+    """
+    if value is None or value == '':
+        return None
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+    if not isinstance(value, str):
+        try:
+            return datetime.fromtimestamp(calendar.timegm(value), tz=timezone.utc)
+        except (TypeError, ValueError, OverflowError):
+            return None
+    try:
+        return parse_published_date(parsedate_to_datetime(value))
+    except (TypeError, ValueError, IndexError):
+        pass
+    try:
+        return parse_published_date(datetime.fromisoformat(value.strip().replace('Z', '+00:00')))
+    except ValueError:
+        return None
+
+
+def entry_published_date(entry: Dict[str, Any]) -> Optional[datetime]:
+    """Publication date of an RSS or Atom entry, falling back to its update date."""
+    for key in ('published_parsed', 'updated_parsed', 'created_parsed'):
+        if entry.get(key):
+            return parse_published_date(entry[key])
+    # feedparser leaves *_parsed empty for formats it does not recognize
+    for key in ('published', 'updated', 'created'):
+        if entry.get(key):
+            return parse_published_date(entry[key])
+    return None
 
 
 class WebScraper:
@@ -30,28 +74,42 @@ class WebScraper:
             'Upgrade-Insecure-Requests': '1'
         }
         
-    def scrape_rss(self, url: str) -> List[Dict[str, str]]:
+    def scrape_rss(self, url: str) -> List[Dict[str, Any]]:
+        """
+        Fetch an RSS or Atom feed and return its entries.
+
+        Each item has `link`, `title`, `source` (the publisher's site, when the feed
+        gives one) and `published`, a timezone-aware UTC datetime
+        (None when the entry has no usable date). Use `filter_recent` to drop stale
+        entries for the whole feed in one pass.
+
+        Args:
+            url (str): Feed URL (any `Site.url`)
+
+        Returns:
+            List[Dict[str, Any]]: Entries that have a link
+        """
         try:
             # Log the start of RSS feed scraping
             self.logger(f"Scraping RSS feed: {url}")
 
-            # Validate if URL is RSS feed
-            if 'rss' not in url:
-                raise ValueError("Provided URL is not a valid RSS feed")
-            
-            # Parse the RSS feed using feedparser
-            feed = feedparser.parse(url)
+            # Parse the RSS/Atom feed using feedparser
+            feed = feedparser.parse(url, agent=self.headers['User-Agent'])
+            if feed.bozo and not feed.entries:
+                raise ValueError(f"Provided URL is not a valid RSS or Atom feed: {feed.get('bozo_exception')}")
             
             # Log successful parsing and number of entries
-            self.logger(f"Feed parsed successfully")
+            self.logger(f"Feed parsed successfully ({feed.get('version') or 'unknown format'})")
             self.logger(f"Number of entries: {len(feed.entries)}")
             
-            # Extract links and published dates from entries
+            # Extract links, titles and published dates from entries
             items = []
             for entry in feed.entries:
                 item = {
                     'link': entry.get('link', ''),
-                    'published': entry.get('published', '')
+                    'title': entry.get('title', ''),
+                    'published': entry_published_date(entry),
+                    'source': (entry.get('source') or {}).get('href', '')
                 }
                 if item['link']:  # Only add items with a valid link
                     items.append(item)
@@ -72,6 +130,23 @@ class WebScraper:
         except Exception as e:
             raise Exception(f"Error scraping RSS feed: {e}")
 
+    @staticmethod
+    def filter_recent(items: List[Dict[str, Any]], max_age_hours: int) -> List[Dict[str, Any]]:
+        """
+        Keep the items published within `max_age_hours`, newest first.
+
+        Undated entries are dropped; future dates within the same margin are kept to
+        tolerate clock skew between publishers.
+        """
+        now = datetime.now(timezone.utc)
+        max_age = timedelta(hours=max_age_hours)
+        recent = [
+            item for item in items
+            if item['published'] is not None and abs(now - item['published']) <= max_age
+        ]
+        recent.sort(key=lambda item: item['published'], reverse=True)
+        return recent
+
 
 
 # def main():
@@ -4,12 +4,17 @@ import os
 from werkzeug.utils import secure_filename
 from sqlalchemy import desc, func, literal_column
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import undefer
 from flask import Blueprint, jsonify, request
 from app.routes.articles.utils import download_and_process_image, validate_article_creation, UPLOAD_FOLDER, ALLOWED_EXTENSIONS, allowed_file
 from app.services.slack.actions import send_NEWS_message_to_slack_channel
 from app.services.news_creator.news_creator import NewsCreatorAgent
-from config import Article, Bot, Category, db, UnwantedArticle, UsedKeywords, ArticleTimeframe
-from app.routes.routes_utils import create_response, handle_db_session
+from config import (Article, Bot, Category, db, UnwantedArticle, UsedKeywords, ArticleTimeframe,
+                    KeywordDailyCount, split_keywords)
+from app.routes.routes_utils import (create_response, handle_db_session, full_text_search,
+                                     encode_cursor, decode_cursor, keyset_after, estimate_count,
+                                     resolve_projection, SNIPPET_LENGTH,
+                                     ARTICLE_FIELDS, ARTICLE_SUMMARY_FIELDS)
 from redis_client.redis_client import cache_with_redis, update_cache_with_redis
 
 articles_bp = Blueprint('articles_bp', __name__, 
@@ -17,6 +22,31 @@ articles_bp = Blueprint('articles_bp', __name__,
                         static_folder='static')
 
 
+def _listing_columns(model, fields):
+    """
+    Build the labelled select list for one branch of the /articles UNION.
+
+    Every branch selects the same labels in the same order. Columns that only exist
+    on Article are selected as NULL/FALSE for UnwantedArticle, and `snippet` is
+    truncated in SQL so full bodies are only read when projected.
+    """
+    article_only = {'image', 'analysis', 'used_keywords', 'is_article_efficent'}
+    columns = []
+    for field in fields:
+        if field == 'timeframes':
+            continue
+        if field == 'snippet':
+            expression = func.left(model.content, SNIPPET_LENGTH)
+        elif model is UnwantedArticle and field in article_only:
+            expression = literal_column("NULL")
+        elif model is UnwantedArticle and field == 'is_top_story':
+            expression = literal_column("FALSE")
+        else:
+            expression = getattr(model, field)
+        columns.append(expression.label(field))
+    return columns
+
+
 @articles_bp.route('/articles', methods=['GET'])
 @handle_db_session
 def get_all_articles_all():
@@ -26,13 +56,21 @@ def get_all_articles_all():
     Query Parameters:
     - page: The page number (default: 1)
     - per_page: Number of articles per page (default: 10)
-    - search: Search term to filter articles by content or title
+    - search: Full-text search over title and content, results ranked by relevance.
+              Supports quoted phrases, "or" and "-term" exclusions.
     - bot_name: Filter articles by bot name (case insensitive)
     - category_name: Filter articles by category name (case insensitive)
     - top_stories: If "true", return top stories
     - timeframe: Filter top stories by timeframe ('1D', '1W', '1M')
     - bin: If "true", include unwanted articles
     - valid_articles: If "true", include valid articles
+    - cursor: Opaque cursor for keyset pagination. Pass an empty value for the first page
+              and `next_cursor` from the previous response afterwards. Cursor pages are
+              ordered by (created_at, id) descending and ignore `page`.
+    - include_total: If "true" in cursor mode, include an approximate total_items
+    - view: "summary" (default) returns a truncated `snippet` instead of content/analysis,
+            "full" returns full bodies
+    - fields: Comma-separated list of fields to return (overrides view)
     """
     try:
         # Get query parameters with defaults
@@ -45,6 +83,9 @@ def get_all_articles_all():
         timeframe = request.args.get('timeframe')
         include_bin = request.args.get('bin', '').lower() == 'true'
         include_valid = request.args.get('valid_articles', 'true').lower() == 'true'
+        cursor_token = request.args.get('cursor')
+        use_cursor = cursor_token is not None
+        include_total = request.args.get('include_total', '').lower() == 'true'
 
         # Validate parameters
         if page < 1 or per_page < 1:
@@ -57,26 +98,26 @@ def get_all_articles_all():
                 error=f"Invalid timeframe: {timeframe}. Must be one of: 1D, 1W, 1M"
             )), 400
 
+        try:
+            fields = resolve_projection(request.args, ARTICLE_FIELDS, ARTICLE_SUMMARY_FIELDS)
+        except ValueError as e:
+            return jsonify(create_response(error=str(e))), 400
+        # Columns needed for ordering, cursors and timeframes even when not projected
+        query_fields = list(dict.fromkeys(fields + ['created_at', 'is_top_story']))
+
+        cursor = None
+        if cursor_token:
+            try:
+                cursor = decode_cursor(cursor_token)
+            except ValueError as e:
+                return jsonify(create_response(error=str(e))), 400
+
         # Initialize queries list
         queries = []
 
         # Handle top stories query
         if top_stories:
-            top_stories_query = db.session.query(
-                Article.id,
-                Article.title,
-                Article.content,
-                Article.url,
-                Article.date,
-                Article.bot_id,
-                Article.created_at.label('created_at'),  # Add label for ordering
-                Article.updated_at,
-                Article.image,
-                Article.analysis,
-                Article.used_keywords,
-                Article.is_article_efficent,
-                Article.is_top_story
-            ).filter(Article.is_top_story == True)
+            top_stories_query = db.session.query(*_listing_columns(Article, query_fields)).filter(Article.is_top_story == True)
             
             if bot_name:
                 top_stories_query = top_stories_query.join(Bot).filter(func.lower(Bot.name) == bot_name.lower())
@@ -84,36 +125,20 @@ def get_all_articles_all():
                 top_stories_query = top_stories_query.join(Bot).join(Category, Bot.category_id == Category.id)\
                     .filter(func.lower(Category.name) == category_name.lower())
             if search_term:
-                top_stories_query = top_stories_query.filter(
-                    db.or_(
-                        Article.content.ilike(f'%{search_term}%'),
-                        Article.title.ilike(f'%{search_term}%')
-                    )
-                )
+                search_condition, search_rank = full_text_search(Article, search_term)
+                top_stories_query = top_stories_query.filter(search_condition).add_columns(search_rank.label('rank'))
             if timeframe:
                 top_stories_query = top_stories_query.join(Article.timeframes).filter(
                     ArticleTimeframe.timeframe == timeframe
                 )
+            if cursor:
+                top_stories_query = top_stories_query.filter(keyset_after(Article.created_at, Article.id, cursor))
             
             queries.append(top_stories_query)
 
         # Handle valid articles query (excluding top stories)
         if include_valid and not top_stories:
-            valid_query = db.session.query(
-                Article.id,
-                Article.title,
-                Article.content,
-                Article.url,
-                Article.date,
-                Article.bot_id,
-                Article.created_at.label('created_at'),  # Add label for ordering
-                Article.updated_at,
-                Article.image,
-                Article.analysis,
-                Article.used_keywords,
-                Article.is_article_efficent,
-                Article.is_top_story
-            ).filter(Article.is_top_story == False)
+            valid_query = db.session.query(*_listing_columns(Article, query_fields)).filter(Article.is_top_story == False)
             
             if bot_name:
                 valid_query = valid_query.join(Bot).filter(func.lower(Bot.name) == bot_name.lower())
@@ -121,32 +146,16 @@ def get_all_articles_all():
                 valid_query = valid_query.join(Bot).join(Category, Bot.category_id == Category.id)\
                     .filter(func.lower(Category.name) == category_name.lower())
             if search_term:
-                valid_query = valid_query.filter(
-                    db.or_(
-                        Article.content.ilike(f'%{search_term}%'),
-                        Article.title.ilike(f'%{search_term}%')
-                    )
-                )
+                search_condition, search_rank = full_text_search(Article, search_term)
+                valid_query = valid_query.filter(search_condition).add_columns(search_rank.label('rank'))
+            if cursor:
+                valid_query = valid_query.filter(keyset_after(Article.created_at, Article.id, cursor))
             
             queries.append(valid_query)
 
         # Handle unwanted articles query
         if include_bin:
-            unwanted_query = db.session.query(
-                UnwantedArticle.id,
-                UnwantedArticle.title,
-                UnwantedArticle.content,
-                UnwantedArticle.url,
-                UnwantedArticle.date,
-                UnwantedArticle.bot_id,
-                UnwantedArticle.created_at.label('created_at'),
-                UnwantedArticle.updated_at,
-                literal_column("NULL").label('image'),
-                literal_column("NULL").label('analysis'),
-                literal_column("NULL").label('used_keywords'),
-                literal_column("NULL").label('is_article_efficent'),
-                literal_column("FALSE").label('is_top_story')
-            )
+            unwanted_query = db.session.query(*_listing_columns(UnwantedArticle, query_fields))
             
             if bot_name:
                 unwanted_query = unwanted_query.join(Bot).filter(func.lower(Bot.name) == bot_name.lower())
@@ -154,12 +163,10 @@ def get_all_articles_all():
                 unwanted_query = unwanted_query.join(Bot).join(Category, Bot.category_id == Category.id)\
                     .filter(func.lower(Category.name) == category_name.lower())
             if search_term:
-                unwanted_query = unwanted_query.filter(
-                    db.or_(
-                        UnwantedArticle.content.ilike(f'%{search_term}%'),
-                        UnwantedArticle.title.ilike(f'%{search_term}%')
-                    )
-                )
+                search_condition, search_rank = full_text_search(UnwantedArticle, search_term)
+                unwanted_query = unwanted_query.filter(search_condition).add_columns(search_rank.label('rank'))
+            if cursor:
+                unwanted_query = unwanted_query.filter(keyset_after(UnwantedArticle.created_at, UnwantedArticle.id, cursor))
             
             queries.append(unwanted_query)
 
@@ -169,21 +176,46 @@ def get_all_articles_all():
                 error='At least one article type must be selected'
             )), 400
 
-        # Combine queries and add ordering
+        # Combine queries and add ordering (most relevant first when searching)
         base_query = queries[0].union(*queries[1:]) if len(queries) > 1 else queries[0]
-        base_query = base_query.order_by(desc('created_at'))
+        if use_cursor:
+            base_query = base_query.order_by(desc('created_at'), desc('id'))
+        elif search_term:
+            base_query = base_query.order_by(desc('rank'), desc('created_at'))
+        else:
+            base_query = base_query.order_by(desc('created_at'))
 
-        # Get pagination info
-        total_items = base_query.count()
-        total_pages = ceil(total_items / per_page)
+        if use_cursor:
+            # Keyset pagination: fetch one extra row to know if there is a next page
+            rows = base_query.limit(per_page + 1).all()
+            items = rows[:per_page]
+            has_next = len(rows) > per_page
+            pagination = {
+                'per_page': per_page,
+                'has_next': has_next,
+                'next_cursor': encode_cursor(items[-1].created_at, items[-1].id) if has_next else None
+            }
+            if include_total:
+                pagination['total_items'] = estimate_count(base_query)
+                pagination['total_is_estimate'] = True
+        else:
+            # Get pagination info
+            total_items = base_query.count()
+            total_pages = ceil(total_items / per_page)
 
-        if page > total_pages and total_items > 0:
-            return jsonify(create_response(
-                error=f'Page {page} does not exist. Max page is {total_pages}'
-            )), 404
+            if page > total_pages and total_items > 0:
+                return jsonify(create_response(
+                    error=f'Page {page} does not exist. Max page is {total_pages}'
+                )), 404
 
-        # Get paginated items
-        items = base_query.offset((page - 1) * per_page).limit(per_page).all()
+            # Get paginated items
+            items = base_query.offset((page - 1) * per_page).limit(per_page).all()
+            pagination = {
+                'page': page,
+                'per_page': per_page,
+                'total_pages': total_pages,
+                'total_items': total_items
+            }
 
         if not items:
             return jsonify(create_response(
@@ -192,42 +224,29 @@ def get_all_articles_all():
                 message='No articles found'
             )), 204
 
+        # Fetch timeframes for all top stories in the page with a single IN query
+        top_story_ids = [item.id for item in items if item.is_top_story]
+        timeframes_by_article = {}
+        if top_story_ids and 'timeframes' in fields:
+            timeframes = ArticleTimeframe.query.filter(ArticleTimeframe.article_id.in_(top_story_ids)).all()
+            for tf in timeframes:
+                timeframes_by_article.setdefault(tf.article_id, []).append(tf.as_dict())
+
         # Convert items to dictionaries
         data = []
         for item in items:
-            item_dict = {
-                'id': item[0],
-                'title': item[1],
-                'content': item[2],
-                'url': item[3],
-                'date': item[4],
-                'bot_id': item[5],
-                'created_at': item[6],
-                'updated_at': item[7],
-                'image': item[8],
-                'analysis': item[9],
-                'used_keywords': item[10],
-                'is_article_efficent': item[11],
-                'is_top_story': item[12],
-                'timeframes': []  # Will be populated for top stories
-            }
+            item_dict = {field: getattr(item, field) for field in fields if field != 'timeframes'}
             
             # Add timeframes for top stories
-            if item[12]:  # is_top_story
-                timeframes = ArticleTimeframe.query.filter_by(article_id=item[0]).all()
-                item_dict['timeframes'] = [tf.as_dict() for tf in timeframes]
+            if 'timeframes' in fields:
+                item_dict['timeframes'] = timeframes_by_article.get(item.id, []) if item.is_top_story else []
             
             data.append(item_dict)
 
         return jsonify(create_response(
             success=True,
             data=data,
-            pagination={
-                'page': page,
-                'per_page': per_page,
-                'total_pages': total_pages,
-                'total_items': total_items
-            },
+            pagination=pagination,
             filters={
                 'bot_name': bot_name or None,
                 'category_name': category_name or None,
@@ -243,7 +262,7 @@ def get_all_articles_all():
 
 @articles_bp.route('/article/<int:article_id>', methods=['GET'])
 @handle_db_session
-@cache_with_redis()
+@cache_with_redis(tags=['article'])
 def get_article_by_id(article_id):
     """
     Retrieve a specific article by its ID from either the Article or UnwantedArticle table.
@@ -258,13 +277,17 @@ def get_article_by_id(article_id):
     Returns:
         JSON response with the article data or an error message.
     """
-    article = Article.query.filter_by(id=article_id).first()
+    article = Article.query.options(
+        undefer(Article.content), undefer(Article.analysis)
+    ).filter_by(id=article_id).first()
     
     if article:
         response = create_response(success=True, data=article.as_dict(), source="Article")
         return jsonify(response), 200
     
-    unwanted_article = UnwantedArticle.query.filter_by(id=article_id).first()
+    unwanted_article = UnwantedArticle.query.options(
+        undefer(UnwantedArticle.content)
+    ).filter_by(id=article_id).first()
     
     if unwanted_article:
         response = create_response(success=True, data=unwanted_article.as_dict(), source="UnwantedArticle")
@@ -275,7 +298,7 @@ def get_article_by_id(article_id):
 
 
 @articles_bp.route('/article/<int:article_id>', methods=['DELETE'])
-@update_cache_with_redis(related_get_endpoints=['get_all_articles', 'get_article_by_id', 'get_articles_by_bot'])
+@update_cache_with_redis(related_get_endpoints=['get_all_articles', 'get_article_by_id', 'get_articles_by_bot'], tags=['article'])
 @handle_db_session
 def delete_article(article_id):
     """
@@ -310,7 +333,16 @@ def delete_article(article_id):
         if article.is_top_story:
             ArticleTimeframe.query.filter_by(article_id=article_id).delete()
 
-        # Delete related used keywords
+        # Delete related used keywords and take them out of the daily rollup
+        for used_keywords in UsedKeywords.query.filter_by(article_id=article_id).all():
+            if used_keywords.article_date:
+                KeywordDailyCount.record(
+                    db.session,
+                    bot_id=used_keywords.bot_id,
+                    keywords=split_keywords(used_keywords.keywords),
+                    day=used_keywords.article_date.date(),
+                    delta=-1
+                )
         UsedKeywords.query.filter_by(article_id=article_id).delete()
         print(f"Deleted keywords for article {article_id}")
         
@@ -336,6 +368,7 @@ def delete_article(article_id):
 
 
 @articles_bp.route('/article', methods=['POST'])
+@update_cache_with_redis(tags=['article'])
 def create_article():
     """
     Create a new article with comprehensive validation and error handling.
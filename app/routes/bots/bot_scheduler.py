@@ -2,6 +2,7 @@
 from scheduler_config import scheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from app.news_bot.news_bot_v2 import NewsProcessingPipeline
+from app.news_bot.news_bot_v2.batch_analysis import BatchAnalysisManager
 from datetime import datetime, timedelta
 from flask import current_app
 from config import db
@@ -42,6 +43,16 @@ def cleanup_news_bot_logs():
     except Exception as e:
         print(f"Log cleanup failed: {str(e)}")
 
+def batch_analysis_job():
+    """Poll OpenAI batches, publish finished analyses and submit queued ones (deferred-analysis bots)."""
+    with scheduler.app.app_context():
+        try:
+            result = BatchAnalysisManager().run_cycle()
+            current_app.logger.debug(f"Batch analysis cycle completed: {result}")
+        except Exception as e:
+            current_app.logger.error(f"Batch analysis cycle failed: {str(e)}")
+
+
 def bot_job_function(bot, category):
     with scheduler.app.app_context():
         current_app.logger.debug(f"Starting bot job for bot: {bot.name}")
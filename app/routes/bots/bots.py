@@ -1,4 +1,5 @@
 import re
+import json
 from pathlib import Path
 from datetime import datetime
 from sqlalchemy import func, desc
@@ -7,12 +8,14 @@ from sqlalchemy.exc import SQLAlchemyError
 from flask import Blueprint, jsonify, request
 from app.utils.validate_url import validate_url
 from flask import current_app
-from flask import send_file, Response, stream_with_context
+from flask import Response, stream_with_context
 from scheduler_config import scheduler
-from app.routes.routes_utils import create_response
+from app.routes.routes_utils import create_response, encode_cursor, decode_cursor, keyset_after, estimate_count
 from config import Blacklist, Bot, Keyword, Session, Site, db, Category, Metrics
 from app.routes.bots.bot_scheduler import schedule_bot
 from app.utils.validate_bot import validate_bot_for_activation
+from app.utils import log_reader
+from app.utils.log_reader import LogFilter
 from redis_client.redis_client import cache_with_redis, update_cache_with_redis
 
 bots_bp = Blueprint(
@@ -77,7 +80,7 @@ def get_bot():
 
 
 @bots_bp.route('/bots', methods=['GET'])
-@cache_with_redis()
+@cache_with_redis(local_ttl=30)
 def get_all_bots():
     """
     Get all bots data.
@@ -119,6 +122,7 @@ def create_bot():
         dalle_prompt (str): The DALL-E prompt for the bot (optional)
         background_color (str): The background color for the bot (optional)
         run_frequency (int): The frequency to run the bot in minutes (required for scheduling, minimum 20 minutes)
+        deferred_analysis (bool): Analyze articles through the OpenAI Batch API instead of one request each (optional)
         url (str): The URL for the bot's site (required for scheduling)
         whitelist (str): Comma-separated list of keywords (optional)
         blacklist (str): Comma-separated list of blacklisted words (optional)
@@ -174,6 +178,7 @@ def create_bot():
                 icon=f'https://aialphaicons.s3.us-east-2.amazonaws.com/{icon_normalized}.svg',
                 background_color=data.get('background_color', ''),
                 run_frequency=run_frequency,
+                deferred_analysis=bool(data.get('deferred_analysis', False)),
                 is_active=False,
                 created_at=current_time,
                 updated_at=current_time
@@ -264,6 +269,7 @@ def update_bot(bot_id):
         prompt (str, optional): The general prompt for the bot
         background_color (str, optional): HEX code string for visual representation
         run_frequency (int, optional): The frequency to run the bot in minutes
+        deferred_analysis (bool, optional): Analyze articles through the OpenAI Batch API instead of one request each
         url (str, optional): The URL for the bot's site
         whitelist (str, optional): Comma-separated list of keywords to add to the existing whitelist
         blacklist (str, optional): Comma-separated list of words to add to the existing blacklist
@@ -292,8 +298,11 @@ def update_bot(bot_id):
             if not data:
                 return jsonify(create_response(error='No update data provided')), 400
 
+            if 'deferred_analysis' in data and not isinstance(data['deferred_analysis'], bool):
+                return jsonify(create_response(error='deferred_analysis must be a boolean')), 400
+
             # Update fields if provided
-            updatable_fields = ['name', 'alias', 'category_id', 'dalle_prompt', 'prompt', 'background_color', 'run_frequency']
+            updatable_fields = ['name', 'alias', 'category_id', 'dalle_prompt', 'prompt', 'background_color', 'run_frequency', 'deferred_analysis']
             for field in updatable_fields:
                 if field in data:
                     setattr(bot, field, data[field])
@@ -374,7 +383,7 @@ def update_bot(bot_id):
 
 
 @bots_bp.route('/bot/<int:bot_id>', methods=['DELETE'])
-@update_cache_with_redis(related_get_endpoints=['get_all_bots','get_bot', 'get_categories'])
+@update_cache_with_redis(related_get_endpoints=['get_all_bots','get_bot', 'get_categories'], tags=['article'])
 def delete_bot(bot_id):
     """
     Delete a bot and all its associated data from the news bot server.
@@ -502,7 +511,27 @@ def toggle_activation_bot(bot_id):
 @bots_bp.route('/bot/<int:bot_id>/logs', methods=['GET'])
 def get_bot_logs(bot_id):
     """
-    Stream logs from the log file with optional filtering
+    Serve a bot's log file incrementally with optional filtering.
+
+    The file is never loaded whole: by default the last `tail` records are read
+    backwards from the end of the file.
+
+    Query Parameters:
+    - tail: Number of records to return from the end of the file (default: 200, max: 5000)
+    - before: Byte offset to page further back from (a previous response's start_offset)
+    - offset: Byte offset to read forward from (a previous response's end_offset). Takes
+      precedence over tail/before.
+    - max_bytes: Bytes scanned per forward read (default: 256KB, max: 2MB)
+    - level: Minimum level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
+    - since, until: ISO datetimes bounding the record time
+    - contains: Case-insensitive substring filter
+    - run_id: Only records of one pipeline run (correlation ID in each record)
+    - format: "text" (default) returns plain text with offsets in X-Log-* headers,
+      "json" returns records with offsets in the body
+    - follow: If "true", stream new records as Server-Sent Events starting at `offset`
+      (or the end of the file). Each event id is the resume offset, so reconnecting
+      clients resume via Last-Event-ID.
+    - timeout: Seconds to keep a follow stream open (default: 300, max: 3600)
     """
     try:
         # Get bot name from database
@@ -525,11 +554,81 @@ def get_bot_logs(bot_id):
                 status_code=404
             )
 
-        # Return entire file
-        return send_file(
-            log_path,
+        try:
+            tail_count = min(int(request.args.get('tail', 200)), 5000)
+            max_bytes = min(int(request.args.get('max_bytes', 256 * 1024)), 2 * 1024 * 1024)
+            offset = request.args.get('offset', request.headers.get('Last-Event-ID'))
+            offset = int(offset) if offset not in (None, '') else None
+            before = request.args.get('before')
+            before = int(before) if before not in (None, '') else None
+            timeout = min(int(request.args.get('timeout', 300)), 3600)
+            since = request.args.get('since')
+            until = request.args.get('until')
+            log_filter = LogFilter(
+                level=request.args.get('level') or None,
+                since=datetime.fromisoformat(since) if since else None,
+                until=datetime.fromisoformat(until) if until else None,
+                contains=request.args.get('contains') or None,
+                run_id=request.args.get('run_id') or None
+            )
+        except ValueError as e:
+            return jsonify(create_response(error=f"Invalid parameter: {str(e)}")), 400
+
+        if tail_count < 1 or max_bytes < 1 or timeout < 1:
+            return jsonify(create_response(error="tail, max_bytes and timeout must be positive integers")), 400
+
+        output_format = request.args.get('format', 'text').lower()
+        if output_format not in ('text', 'json'):
+            return jsonify(create_response(error="Invalid format. Must be one of: text, json")), 400
+
+        if request.args.get('follow', '').lower() == 'true':
+            if offset is None:
+                _, _, offset = log_reader.tail(log_path, 0)
+
+            def stream():
+                yield "retry: 2000\n\n"
+                for records, end_offset, generation in log_reader.follow(log_path, offset, log_filter, timeout=timeout):
+                    if not records:
+                        yield ": keep-alive\n\n"
+                        continue
+                    payload = json.dumps({
+                        'records': [_serialize_log_record(r) for r in records],
+                        'end_offset': end_offset,
+                        'file_id': generation
+                    })
+                    yield f"id: {end_offset}\nevent: logs\ndata: {payload}\n\n"
+
+            return Response(
+                stream_with_context(stream()),
+                mimetype='text/event-stream',
+                headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+            )
+
+        if offset is not None:
+            records, end_offset = log_reader.read_from(log_path, offset, max_bytes, log_filter)
+            start_offset = offset
+        else:
+            records, start_offset, end_offset = log_reader.tail(log_path, tail_count, log_filter, before=before)
+        generation = log_reader.file_id(log_path)
+
+        if output_format == 'json':
+            return jsonify(create_response(
+                success=True,
+                data=[_serialize_log_record(r) for r in records],
+                start_offset=start_offset,
+                end_offset=end_offset,
+                file_id=generation
+            )), 200
+
+        body = '\n'.join(record['text'] for record in records)
+        return Response(
+            body + '\n' if body else '',
             mimetype='text/plain',
-            as_attachment=False
+            headers={
+                'X-Log-Start-Offset': str(start_offset),
+                'X-Log-End-Offset': str(end_offset),
+                'X-Log-File-Id': generation
+            }
         )
 
     except Exception as e:
@@ -541,9 +640,28 @@ def get_bot_logs(bot_id):
         )
 
 
+def _serialize_log_record(record):
+    return {
+        'offset': record['offset'],
+        'timestamp': record['timestamp'].isoformat() if record['timestamp'] else None,
+        'level': record['level'],
+        'run_id': record['run_id'],
+        'text': record['text']
+    }
+
+
 @bots_bp.route('/bot/<int:bot_id>/metrics', methods=['GET'])
 def get_bot_metrics(bot_id):
-    """Get metrics for a specific bot with pagination and filtering"""
+    """
+    Get metrics for a specific bot with pagination and filtering.
+
+    Query Parameters:
+    - page, per_page: Offset pagination (default: 1, 10)
+    - start_date, end_date: ISO datetimes bounding the run start time
+    - cursor: Opaque cursor for keyset pagination. Pass an empty value for the first page
+      and `next_cursor` afterwards. Cursor pages are ordered by (start_time, id) descending.
+    - include_total: If "true" in cursor mode, include an approximate total_items
+    """
     try:
         # Validate bot exists
         bot = db.session.query(Bot).filter(Bot.id == bot_id).first()
@@ -619,6 +737,43 @@ def get_bot_metrics(bot_id):
                     status_code=400
                 )
 
+        # Keyset pagination on (start_time, id)
+        cursor_token = request.args.get('cursor')
+        if cursor_token is not None:
+            estimate_query = query
+            if cursor_token:
+                try:
+                    cursor = decode_cursor(cursor_token)
+                except ValueError as e:
+                    return create_response(
+                        success=False,
+                        error=str(e),
+                        status_code=400
+                    )
+                query = query.filter(keyset_after(Metrics.start_time, Metrics.id, cursor))
+
+            rows = query.order_by(desc(Metrics.start_time), desc(Metrics.id))\
+                        .limit(per_page + 1)\
+                        .all()
+            metrics = rows[:per_page]
+            has_next = len(rows) > per_page
+            pagination = {
+                'per_page': per_page,
+                'has_next': has_next,
+                'next_cursor': encode_cursor(metrics[-1].start_time, metrics[-1].id) if has_next else None
+            }
+            if request.args.get('include_total', '').lower() == 'true':
+                pagination['total_items'] = estimate_count(estimate_query)
+                pagination['total_is_estimate'] = True
+
+            return create_response(
+                success=True,
+                data={
+                    'metrics': [metric.as_dict() for metric in metrics],
+                    'pagination': pagination
+                }
+            )
+
         # Get total count
         total_count = query.count()
         total_pages = (total_count + per_page - 1) // per_page
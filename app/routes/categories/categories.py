@@ -92,7 +92,7 @@ def create_category():
 
            
 @categories_bp.route('/category/<int:category_id>', methods=['DELETE'])
-@update_cache_with_redis(related_get_endpoints=['get_categories','get_category','get_articles_by_bot'])
+@update_cache_with_redis(related_get_endpoints=['get_categories','get_category','get_articles_by_bot'], tags=['article'])
 def delete_category(category_id):
     """
     Delete a category and its associated bots by ID.
@@ -134,7 +134,7 @@ def delete_category(category_id):
 
 
 @categories_bp.route('/categories', methods=['GET'])
-@cache_with_redis()
+@cache_with_redis(local_ttl=30)
 def get_categories():
     """
     Get all available categories along with their associated bots (basic info only).
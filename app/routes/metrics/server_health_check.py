@@ -4,6 +4,11 @@ import psutil
 from flask import Blueprint, jsonify
 from flask import current_app, render_template
 from app.routes.routes_utils import create_response
+from redis_client.redis_client import get_cache_stats
+from app.news_bot.news_bot_v2.utils.domain_throttle import domain_throttle
+from app.news_bot.news_bot_v2.utils.domain_circuit import domain_breaker
+from app.news_bot.news_bot_v2.utils.browser_pool import browser_pool
+from app.services.slack.notifier import slack_notifier
 
 health_check_bp = Blueprint('health_check', __name__,
                             template_folder='templates')
@@ -12,6 +17,47 @@ health_check_bp = Blueprint('health_check', __name__,
 def health_check():
     return 'OK', 200
 
+@health_check_bp.route('/health/cache', methods=['GET'])
+def cache_health():
+    """
+    Return the Redis cache invalidation counters of this server process
+    (invalidations, keys unlinked, average and last invalidation time in ms).
+    """
+    return jsonify(create_response(success=True, data=get_cache_stats())), 200
+
+@health_check_bp.route('/health/domains', methods=['GET'])
+def domain_health():
+    """
+    Return the per-publisher fetch limits of this server process (current rate and
+    concurrency, latency, 429/503 and failure counts, average wait in ms).
+    """
+    return jsonify(create_response(success=True, data=domain_throttle.stats())), 200
+
+@health_check_bp.route('/health/domains/circuits', methods=['GET'])
+def domain_circuits():
+    """
+    Return the extraction circuit of each publisher that has failed in this server
+    process (state, consecutive failures, cooldown left, articles skipped, last failure).
+    """
+    return jsonify(create_response(success=True, data=domain_breaker.stats())), 200
+
+@health_check_bp.route('/health/browser-pool', methods=['GET'])
+def browser_pool_health():
+    """
+    Return the state of this server process's shared headless browser (whether it is
+    running, pages in use out of the maximum, pages opened, launches, average page time).
+    """
+    return jsonify(create_response(success=True, data=browser_pool.stats())), 200
+
+@health_check_bp.route('/health/slack-outbox', methods=['GET'])
+def slack_outbox_health():
+    """
+    Return the Slack outbox rows by status and kind (post or delete), whether this
+    server process's notifier thread is running, and its sent, retried, rate-limited
+    and failed counters.
+    """
+    return jsonify(create_response(success=True, data=slack_notifier.stats())), 200
+
 @health_check_bp.route('/', methods=['GET'])
 def welcome():
     """
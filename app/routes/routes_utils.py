@@ -1,7 +1,32 @@
+import json
+import base64
+from datetime import datetime
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import func, tuple_, and_, or_
+from sqlalchemy.orm import undefer, with_expression
 from functools import wraps
 from flask import jsonify
-from config import db
+from config import db, SEARCH_CONFIG
+
+
+# Length of the content snippet returned by summary views
+SNIPPET_LENGTH = 280
+
+# Serializable fields per listing. Summary views swap full bodies for a snippet.
+ARTICLE_FIELDS = [
+    'id', 'title', 'content', 'analysis', 'image', 'url', 'date', 'used_keywords',
+    'is_article_efficent', 'is_top_story', 'bot_id', 'created_at', 'updated_at', 'timeframes'
+]
+ARTICLE_SUMMARY_FIELDS = [
+    'id', 'title', 'snippet', 'image', 'url', 'date', 'used_keywords',
+    'is_article_efficent', 'is_top_story', 'bot_id', 'created_at', 'updated_at', 'timeframes'
+]
+UNWANTED_ARTICLE_FIELDS = [
+    'id', 'title', 'content', 'reason', 'url', 'date', 'bot_id', 'created_at', 'updated_at'
+]
+UNWANTED_ARTICLE_SUMMARY_FIELDS = [
+    'id', 'title', 'snippet', 'reason', 'url', 'date', 'bot_id', 'created_at', 'updated_at'
+]
 
 
 def create_response(success=False, data=None, error=None, **kwargs):
@@ -32,3 +57,157 @@ def handle_db_session(func):
             db.session.close()
     return wrapper
 
+
+def full_text_search(model, search_term):
+    """
+    Build the full-text search condition and relevance rank for a searchable model.
+
+    The search term is parsed with `websearch_to_tsquery`, so clients can use quoted
+    phrases, `or` and `-term` exclusions. Matching runs against the model's generated
+    `search_vector` column, which is backed by a GIN index.
+
+    Args:
+        model: A model exposing a `search_vector` column (Article, UnwantedArticle)
+        search_term (str): Raw search term from the request
+
+    Returns:
+        tuple: (condition, rank) where condition is the boolean filter expression and
+               rank is a `ts_rank_cd` expression suitable for ordering (higher is better)
+    """
+    ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, search_term)
+    condition = model.search_vector.op('@@')(ts_query)
+    rank = func.ts_rank_cd(model.search_vector, ts_query)
+    return condition, rank
+
+
+def encode_cursor(sort_value, row_id):
+    """
+    Encode a keyset position into an opaque, URL-safe cursor token.
+
+    Args:
+        sort_value (datetime): Value of the sort column of the last row in the page,
+            None if it is NULL
+        row_id (int): ID of the last row in the page (tie-breaker)
+
+    Returns:
+        str: Opaque cursor token
+    """
+    payload = json.dumps([sort_value.isoformat() if sort_value is not None else None, row_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """
+    Decode a cursor token produced by `encode_cursor`.
+
+    Args:
+        token (str): Opaque cursor token from the request
+
+    Returns:
+        tuple: (sort_value, row_id) of the last row of the previous page; sort_value
+               is None if that row's sort column is NULL
+
+    Raises:
+        ValueError: If the token is malformed
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        return (datetime.fromisoformat(sort_value) if sort_value is not None else None), int(row_id)
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+
+def keyset_after(sort_column, id_column, cursor):
+    """
+    Build the keyset condition selecting rows that come after `cursor` in
+    (sort_column DESC, id_column DESC) order. Backed by composite (sort, id) indexes.
+
+    PostgreSQL sorts NULLs first in descending order, so after a NULL sort value come
+    the remaining NULL rows by id, then every non-NULL row. After a non-NULL value the
+    row comparison already leaves out NULL rows.
+    """
+    sort_value, row_id = cursor
+    if sort_value is None:
+        return or_(and_(sort_column.is_(None), id_column < row_id), sort_column.isnot(None))
+    return tuple_(sort_column, id_column) < tuple_(sort_value, row_id)
+
+
+def estimate_count(query):
+    """
+    Return the planner's row estimate for a query instead of running COUNT(*).
+
+    The estimate comes from `EXPLAIN`, so it costs a planning round trip rather than
+    a full scan. It is approximate and should be labelled as such in responses.
+
+    Args:
+        query: SQLAlchemy ORM query (without LIMIT/OFFSET)
+
+    Returns:
+        int: Estimated number of rows the query would return
+    """
+    connection = db.session.connection()
+    compiled = query.statement.compile(dialect=connection.dialect)
+    plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params).scalar()
+    plan = plan if isinstance(plan, list) else json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def resolve_projection(args, full_fields, summary_fields):
+    """
+    Resolve which fields a list endpoint should return from the request arguments.
+
+    Query Parameters handled:
+    - view: "summary" (default) returns a truncated `snippet` instead of full bodies,
+            "full" returns every field
+    - fields: Comma-separated list of fields to return. Overrides `view`.
+              `snippet` is accepted in addition to the full field list.
+
+    Args:
+        args: Request arguments (request.args)
+        full_fields (list): Every field the endpoint can serialize
+        summary_fields (list): Fields of the default summary view
+
+    Returns:
+        list: Ordered list of fields to serialize, always starting with 'id'
+
+    Raises:
+        ValueError: If the view is unknown or fields contains unknown names
+    """
+    view = args.get('view', 'summary').lower()
+    if view not in ('summary', 'full'):
+        raise ValueError(f"Invalid view: {view}. Must be one of: summary, full")
+
+    fields_param = args.get('fields', '').strip()
+    if not fields_param:
+        return list(full_fields if view == 'full' else summary_fields)
+
+    fields = [field.strip() for field in fields_param.split(',') if field.strip()]
+    unknown = [field for field in fields if field not in full_fields and field != 'snippet']
+    if unknown:
+        raise ValueError(f"Invalid fields: {', '.join(unknown)}. Must be any of: {', '.join(full_fields + ['snippet'])}")
+
+    return ['id'] + [field for field in dict.fromkeys(fields) if field != 'id']
+
+
+def projection_options(model, fields):
+    """
+    Build loader options so an ORM query loads deferred bodies only when projected.
+
+    Deferred columns in `fields` are undeferred (loaded in the main query) and a
+    requested `snippet` is computed in SQL, so the full body never leaves the database.
+
+    Args:
+        model: Model with deferred body columns and a `snippet` query expression
+        fields (list): Fields resolved by `resolve_projection`
+
+    Returns:
+        list: Loader options to pass to `query.options(*options)`
+    """
+    options = []
+    for field in ('content', 'analysis'):
+        if field in fields and hasattr(model, field):
+            options.append(undefer(getattr(model, field)))
+    if 'snippet' in fields:
+        options.append(with_expression(model.snippet, func.left(model.content, SNIPPET_LENGTH)))
+    return options
@@ -1,6 +1,8 @@
-from app.routes.routes_utils import create_response
+from app.routes.routes_utils import (create_response, resolve_projection, projection_options,
+                                     ARTICLE_FIELDS, ARTICLE_SUMMARY_FIELDS)
 from flask import request, Blueprint, jsonify
 from sqlalchemy.orm.exc import NoResultFound
+from sqlalchemy.orm import selectinload, undefer
 from config import db, Article, ArticleTimeframe
 from http import HTTPStatus
 from sqlalchemy import desc
@@ -11,6 +13,7 @@ from config import Article, db
 from sqlalchemy.exc import SQLAlchemyError
 from app.routes.routes_utils import create_response, handle_db_session
 from app.services.slack.actions import send_WARNING_message_to_slack_channel
+from redis_client.redis_client import cache_with_redis, update_cache_with_redis
 import json
 import re
 
@@ -23,6 +26,7 @@ top_stories_bp = Blueprint(
 
 
 @top_stories_bp.route('/top-stories/<int:article_id>', methods=['POST'])
+@update_cache_with_redis(tags=['article'])
 @handle_db_session
 def set_top_story(article_id):
     """
@@ -97,6 +101,7 @@ def set_top_story(article_id):
     
     
 @top_stories_bp.route('/top-stories', methods=['GET'])
+@cache_with_redis(tags=['article'], local_ttl=30)
 def get_top_stories():
     """
     Retrieve top stories from the article database with optional pagination, timeframe filtering,
@@ -109,6 +114,9 @@ def get_top_stories():
         bot_id (str, optional): Comma-separated bot IDs to filter by
                               Example: /top-stories?bot_id=1,2,3
                               If not provided, returns stories from all bots
+        view (str, optional): 'summary' (default) returns a truncated `snippet` instead of
+                              content/analysis, 'full' returns full bodies
+        fields (str, optional): Comma-separated list of fields to return (overrides view)
 
     Returns:
         JSON: A JSON object containing:
@@ -157,8 +165,15 @@ def get_top_stories():
                 )), HTTPStatus.BAD_REQUEST
             timeframe = normalized_timeframe
         
-        # Build query
-        query = Article.query.filter_by(is_top_story=True)
+        try:
+            fields = resolve_projection(request.args, ARTICLE_FIELDS, ARTICLE_SUMMARY_FIELDS)
+        except ValueError as ve:
+            return jsonify(create_response(error=str(ve))), HTTPStatus.BAD_REQUEST
+
+        # Build query (timeframes are batch-loaded for the whole page, bodies only when projected)
+        query = Article.query.options(
+            selectinload(Article.timeframes), *projection_options(Article, fields)
+        ).filter_by(is_top_story=True)
         
         if bot_ids:
             query = query.filter(Article.bot_id.in_(bot_ids))
@@ -173,7 +188,7 @@ def get_top_stories():
         articles = pagination.items
 
         # Convert articles to array of dictionaries
-        articles_array = [article.as_dict() for article in articles]
+        articles_array = [article.as_dict(fields) for article in articles]
         
         return jsonify(create_response(
             success=True,
@@ -218,7 +233,9 @@ def get_top_story_by_id(article_id):
     """
     try:
         # Query the database for the top story with the given ID
-        article = Article.query.filter_by(id=article_id, is_top_story=True).one()
+        article = Article.query.options(
+            undefer(Article.content), undefer(Article.analysis)
+        ).filter_by(id=article_id, is_top_story=True).one()
         
         return jsonify(create_response(
             success=True,
@@ -242,6 +259,7 @@ def get_top_story_by_id(article_id):
 
 
 @top_stories_bp.route('/top-story/<int:article_id>', methods=['PATCH'])
+@update_cache_with_redis(tags=['article'])
 @handle_db_session
 def remove_top_story(article_id):
     """
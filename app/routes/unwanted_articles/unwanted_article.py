@@ -1,9 +1,12 @@
 from math import ceil
-from sqlalchemy import desc, or_
+from sqlalchemy import desc
 from config import UnwantedArticle, db
 from sqlalchemy.exc import SQLAlchemyError
 from flask import Blueprint, jsonify, request
-from app.routes.routes_utils import create_response, handle_db_session
+from app.routes.routes_utils import (create_response, handle_db_session, full_text_search,
+                                     encode_cursor, decode_cursor, keyset_after, estimate_count,
+                                     resolve_projection, projection_options,
+                                     UNWANTED_ARTICLE_FIELDS, UNWANTED_ARTICLE_SUMMARY_FIELDS)
 from redis_client.redis_client import cache_with_redis
 
 unwanted_articles_bp = Blueprint(
@@ -14,7 +17,7 @@ unwanted_articles_bp = Blueprint(
 
 
 @unwanted_articles_bp.route('/articles/unwanted', methods=['GET'])
-@cache_with_redis()
+@cache_with_redis(tags=['article'])
 @handle_db_session
 def get_unwanted_articles():
     """
@@ -24,7 +27,14 @@ def get_unwanted_articles():
     - bot_id (int): Bot ID to filter unwanted articles (optional).
     - page (int): Page number (optional).
     - per_page (int): Number of items per page (optional, max: 100).
-    - search (str): Search term to filter unwanted articles by title or content (optional).
+    - search (str): Full-text search over title and content, ranked by relevance (optional).
+    - cursor (str): Opaque cursor for keyset pagination (optional). Pass an empty value for the
+      first page and `next_cursor` afterwards. Cursor pages are ordered by (created_at, id)
+      descending, require per_page and ignore page.
+    - include_total (bool): If "true" in cursor mode, include an approximate total_items (optional).
+    - view (str): "summary" (default) returns a truncated `snippet` instead of content,
+      "full" returns the full content (optional).
+    - fields (str): Comma-separated list of fields to return, overrides view (optional).
     
     Returns:
         JSON: Response with unwanted article data, pagination info (if applicable), or error message.
@@ -34,17 +44,61 @@ def get_unwanted_articles():
         page = request.args.get('page', type=int)
         per_page = request.args.get('per_page', type=int)
         search_term = request.args.get('search', '')
+        cursor_token = request.args.get('cursor')
+        include_total = request.args.get('include_total', '').lower() == 'true'
         
-        query = UnwantedArticle.query
+        try:
+            fields = resolve_projection(request.args, UNWANTED_ARTICLE_FIELDS, UNWANTED_ARTICLE_SUMMARY_FIELDS)
+        except ValueError as e:
+            return jsonify(create_response(error=str(e))), 400
+        
+        query = UnwantedArticle.query.options(*projection_options(UnwantedArticle, fields))
         
         if bot_id:
             query = query.filter_by(bot_id=bot_id)
         
         if search_term:
-            query = query.filter(or_(
-                UnwantedArticle.title.ilike(f'%{search_term}%'),
-                UnwantedArticle.content.ilike(f'%{search_term}%')
-            ))
+            search_condition, search_rank = full_text_search(UnwantedArticle, search_term)
+            query = query.filter(search_condition)
+            if cursor_token is None:
+                query = query.order_by(desc(search_rank))
+        
+        if cursor_token is not None:
+            per_page = min(per_page or 10, 100)
+            if per_page < 1:
+                return jsonify(create_response(error='per_page must be a positive integer')), 400
+
+            estimate_query = query
+            if cursor_token:
+                try:
+                    cursor = decode_cursor(cursor_token)
+                except ValueError as e:
+                    return jsonify(create_response(error=str(e))), 400
+                query = query.filter(keyset_after(UnwantedArticle.created_at, UnwantedArticle.id, cursor))
+
+            rows = query.order_by(desc(UnwantedArticle.created_at), desc(UnwantedArticle.id))\
+                        .limit(per_page + 1).all()
+            unwanted_articles = rows[:per_page]
+            has_next = len(rows) > per_page
+            pagination_info = {
+                'per_page': per_page,
+                'has_next': has_next,
+                'next_cursor': encode_cursor(unwanted_articles[-1].created_at, unwanted_articles[-1].id) if has_next else None
+            }
+            if include_total:
+                pagination_info['total_items'] = estimate_count(estimate_query)
+                pagination_info['total_is_estimate'] = True
+
+            if not unwanted_articles:
+                message = 'No unwanted articles found for the specified criteria'
+                return jsonify(create_response(success=True, data=[], message=message)), 204
+
+            return jsonify(create_response(
+                success=True,
+                data=[article.as_dict(fields) for article in unwanted_articles],
+                message='Unwanted articles retrieved successfully',
+                pagination=pagination_info
+            )), 200
         
         query = query.order_by(desc(UnwantedArticle.created_at))
         
@@ -74,7 +128,7 @@ def get_unwanted_articles():
             message = 'No unwanted articles found for the specified criteria'
             return jsonify(create_response(success=True, data=[], message=message)), 204
         
-        unwanted_article_data = [article.as_dict() for article in unwanted_articles]
+        unwanted_article_data = [article.as_dict(fields) for article in unwanted_articles]
         
         response = create_response(
             success=True,
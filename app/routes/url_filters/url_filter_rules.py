@@ -0,0 +1,157 @@
+from flask import Blueprint, request, jsonify
+from sqlalchemy.exc import SQLAlchemyError
+from app.routes.routes_utils import create_response, handle_db_session
+from app.news_bot.news_bot_v2.utils.url_filter import RULE_ACTIONS, RULE_TYPES, url_filters
+from config import db, Bot, Category, UrlFilterRule
+
+url_filter_rules_bp = Blueprint('url_filter_rules_bp', __name__)
+
+
+@url_filter_rules_bp.route('/url-filter-rules', methods=['GET'])
+@handle_db_session
+def get_url_filter_rules():
+    """
+    List URL filter rules, optionally only those of a bot or a category.
+
+    Query Parameters:
+        bot_id (int, optional): Only rules of this bot.
+        category_id (int, optional): Only rules of this category.
+
+    Response:
+        200: List of rules.
+        500: Internal server error or database error.
+    """
+    try:
+        query = UrlFilterRule.query
+        bot_id = request.args.get('bot_id', type=int)
+        category_id = request.args.get('category_id', type=int)
+        if bot_id is not None:
+            query = query.filter(UrlFilterRule.bot_id == bot_id)
+        if category_id is not None:
+            query = query.filter(UrlFilterRule.category_id == category_id)
+
+        rules = query.order_by(UrlFilterRule.id).all()
+        return jsonify(create_response(success=True, data=[rule.as_dict() for rule in rules])), 200
+
+    except SQLAlchemyError as e:
+        return jsonify(create_response(error=f'Database error: {str(e)}')), 500
+    except Exception as e:
+        return jsonify(create_response(error=f'Internal server error: {str(e)}')), 500
+
+
+@url_filter_rules_bp.route('/url-filter-rules', methods=['POST'])
+@handle_db_session
+def add_url_filter_rule():
+    """
+    Add a URL filter rule. Without bot_id and category_id the rule applies to every bot.
+
+    Request Body:
+        JSON data with 'rule_type' ('host' or 'path'), 'value', and optionally
+        'action' ('block' by default, or 'allow'), 'bot_id' and 'category_id'.
+
+    Response:
+        201: Rule added.
+        400: Invalid request data.
+        404: Bot or category not found.
+        500: Internal server error or database error.
+    """
+    try:
+        data = request.json or {}
+        rule_type = data.get('rule_type')
+        value = (data.get('value') or '').strip().lower()
+        action = data.get('action', 'block')
+        bot_id = data.get('bot_id')
+        category_id = data.get('category_id')
+
+        if rule_type not in RULE_TYPES:
+            return jsonify(create_response(error=f"Invalid rule_type. Use one of: {', '.join(RULE_TYPES)}")), 400
+        if action not in RULE_ACTIONS:
+            return jsonify(create_response(error=f"Invalid action. Use one of: {', '.join(RULE_ACTIONS)}")), 400
+        if not value.strip('./'):
+            return jsonify(create_response(error='A non-empty value is required')), 400
+
+        if bot_id is not None and not Bot.query.get(bot_id):
+            return jsonify(create_response(error=f'Bot with ID {bot_id} not found')), 404
+        if category_id is not None and not Category.query.get(category_id):
+            return jsonify(create_response(error=f'Category with ID {category_id} not found')), 404
+
+        rule = UrlFilterRule(
+            rule_type=rule_type,
+            value=value,
+            action=action,
+            bot_id=bot_id,
+            category_id=category_id
+        )
+        db.session.add(rule)
+        db.session.commit()
+        url_filters.invalidate()
+
+        return jsonify(create_response(success=True, message='URL filter rule added', data=rule.as_dict())), 201
+
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        return jsonify(create_response(error=f'Database error: {str(e)}')), 500
+    except Exception as e:
+        return jsonify(create_response(error=f'Internal server error: {str(e)}')), 500
+
+
+@url_filter_rules_bp.route('/url-filter-rules/<int:rule_id>', methods=['DELETE'])
+@handle_db_session
+def delete_url_filter_rule(rule_id):
+    """
+    Delete a URL filter rule.
+
+    Args:
+        rule_id (int): ID of the rule to delete.
+
+    Response:
+        200: Rule deleted.
+        404: Rule not found.
+        500: Internal server error or database error.
+    """
+    try:
+        rule = UrlFilterRule.query.get(rule_id)
+        if not rule:
+            return jsonify(create_response(error=f'URL filter rule with ID {rule_id} not found')), 404
+
+        db.session.delete(rule)
+        db.session.commit()
+        url_filters.invalidate()
+
+        return jsonify(create_response(success=True, message=f'URL filter rule {rule_id} deleted')), 200
+
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        return jsonify(create_response(error=f'Database error: {str(e)}')), 500
+    except Exception as e:
+        return jsonify(create_response(error=f'Internal server error: {str(e)}')), 500
+
+
+@url_filter_rules_bp.route('/url-filter-rules/test', methods=['POST'])
+def test_url_filter_rules():
+    """
+    Check a URL against the rules that apply to a bot, without fetching it.
+
+    Request Body:
+        JSON data with 'url' and optionally 'bot_id' and 'category_id'.
+
+    Response:
+        200: Whether the URL is blocked and the rule that decided it.
+        400: Invalid request data.
+        500: Internal server error.
+    """
+    try:
+        data = request.json or {}
+        url = data.get('url')
+        if not isinstance(url, str) or not url.strip():
+            return jsonify(create_response(error='A non-empty url is required')), 400
+
+        match = url_filters.engine_for(data.get('bot_id'), data.get('category_id')).check(url)
+        return jsonify(create_response(success=True, data={
+            'url': url,
+            'blocked': match is not None and match.action == 'block',
+            'rule': {'action': match.action, 'rule_type': match.rule_type, 'value': match.value} if match else None
+        })), 200
+
+    except Exception as e:
+        return jsonify(create_response(error=f'Internal server error: {str(e)}')), 500
@@ -1,7 +1,7 @@
 from flask import Blueprint, jsonify, request
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from app.routes.routes_utils import create_response, handle_db_session
-from config import Article, UsedKeywords, db
+from config import KeywordDailyCount, db
 from sqlalchemy import func, desc
 from sqlalchemy.exc import SQLAlchemyError
 
@@ -12,16 +12,30 @@ news_bots_features_bp = Blueprint(
     static_folder='static'
 )
 
+TIME_PERIODS = {
+    '1w': timedelta(weeks=1),
+    '1m': timedelta(days=30),
+    '3m': timedelta(days=90),
+}
+
+
 @news_bots_features_bp.route('/keywords/trending', methods=['GET'])
 @handle_db_session
 def get_used_keywords():
     """
-    Retrieves used keywords with optional filtering by bot_id and time period.
+    Retrieves used keywords with optional filtering by bot_id and time window.
     Also provides a count of keyword usage.
 
+    Counts come from the per-day KeywordDailyCount rollup, so a query sums
+    pre-aggregated rows over an indexed day range instead of re-splitting every
+    UsedKeywords row.
+
     Query Parameters:
     - bot_id (int, optional): Bot ID to filter keywords.
     - time_period (str, optional): Time period for filtering ("1w", "1m", "3m", "all"). Default is "all".
+    - start_date, end_date (str, optional): ISO dates (YYYY-MM-DD) bounding the window, inclusive.
+      Override time_period. Either bound may be given alone.
+    - top_n (int, optional): Only return the N most used keywords.
 
     Returns:
         JSON: Response with used keywords, their usage count, and optional filtering information.
@@ -29,60 +43,67 @@ def get_used_keywords():
     try:
         bot_id = request.args.get('bot_id', type=int)
         time_period = request.args.get('time_period', default='all')
+        start_param = request.args.get('start_date')
+        end_param = request.args.get('end_date')
+        top_n = request.args.get('top_n', type=int)
 
-        query = db.session.query(UsedKeywords.keywords, func.count(UsedKeywords.id).label('count'))
+        if top_n is not None and top_n < 1:
+            return jsonify(create_response(error='top_n must be a positive integer')), 400
 
-        if bot_id:
-            query = query.filter(UsedKeywords.bot_id == bot_id)
-
-        if time_period != 'all':
-            end_date = datetime.now()
-            if time_period == "1w":
-                start_date = end_date - timedelta(weeks=1)
-            elif time_period == "1m":
-                start_date = end_date - timedelta(days=30)
-            elif time_period == "3m":
-                start_date = end_date - timedelta(days=90)
-            else:
+        start_date, end_date = None, None
+        if start_param or end_param:
+            try:
+                start_date = date.fromisoformat(start_param) if start_param else None
+                end_date = date.fromisoformat(end_param) if end_param else None
+            except ValueError:
+                return jsonify(create_response(error='Invalid date format. Use ISO format (YYYY-MM-DD)')), 400
+            if start_date and end_date and start_date > end_date:
+                return jsonify(create_response(error='start_date must be before end_date')), 400
+        elif time_period != 'all':
+            if time_period not in TIME_PERIODS:
                 return jsonify(create_response(error=f'Invalid time period: {time_period}')), 400
-            
-            query = query.filter(UsedKeywords.article_date.between(start_date, end_date))
+            end_date = datetime.now().date()
+            start_date = (datetime.now() - TIME_PERIODS[time_period]).date()
+
+        total = func.sum(KeywordDailyCount.count)
+        query = db.session.query(
+            KeywordDailyCount.keyword,
+            total.label('count'),
+            func.count().over().label('total_unique_keywords')
+        )
+
+        if bot_id:
+            query = query.filter(KeywordDailyCount.bot_id == bot_id)
+        if start_date:
+            query = query.filter(KeywordDailyCount.day >= start_date)
+        if end_date:
+            query = query.filter(KeywordDailyCount.day <= end_date)
+
+        query = query.group_by(KeywordDailyCount.keyword)\
+                     .having(total > 0)\
+                     .order_by(total.desc(), KeywordDailyCount.keyword)
+        if top_n:
+            query = query.limit(top_n)
 
-        results = query.group_by(UsedKeywords.keywords).order_by(func.count(UsedKeywords.id).desc()).all()
+        results = query.all()
 
         if not results:
             return jsonify(create_response(message='No keywords found', data={'used_keywords': []})), 200
 
-        used_keywords_list = []
-        for keywords, count in results:
-            # Split the keywords string into individual keywords
-            keyword_list = [kw.strip() for kw in keywords.split(',') if kw.strip()]
-            for keyword in keyword_list:
-                used_keywords_list.append({'keyword': keyword, 'count': count})
-
-        # Aggregate counts for duplicate keywords
-        keyword_counts = {}
-        for item in used_keywords_list:
-            keyword = item['keyword']
-            count = item['count']
-            if keyword in keyword_counts:
-                keyword_counts[keyword] += count
-            else:
-                keyword_counts[keyword] = count
-
-        # Create the final list of unique keywords with their total counts
-        final_keyword_list = [{'keyword': k, 'count': v} for k, v in keyword_counts.items()]
-        final_keyword_list.sort(key=lambda x: x['count'], reverse=True)
+        final_keyword_list = [{'keyword': keyword, 'count': int(count)} for keyword, count, _ in results]
 
         response = create_response(
             success=True,
             message='Used keywords retrieved successfully',
             data={
                 'used_keywords': final_keyword_list,
-                'total_unique_keywords': len(final_keyword_list),
+                'total_unique_keywords': results[0].total_unique_keywords,
                 'filter_applied': {
                     'bot_id': bot_id,
-                    'time_period': time_period
+                    'time_period': time_period if not (start_param or end_param) else None,
+                    'start_date': start_date.isoformat() if start_date else None,
+                    'end_date': end_date.isoformat() if end_date else None,
+                    'top_n': top_n
                 }
             }
         )
@@ -93,4 +114,4 @@ def get_used_keywords():
         return jsonify(create_response(error=f'Database error: {str(e)}')), 500
     
     except Exception as e:
-        return jsonify(create_response(error=f'Internal server error: {str(e)}')), 500
\ No newline at end of file
+        return jsonify(create_response(error=f'Internal server error: {str(e)}')), 500
@@ -1,7 +1,8 @@
 from app.services.slack.index import client
 from slack_sdk.errors import SlackApiError
 from flask import current_app 
-from typing import List
+from typing import Any, Dict, List
+from app.services.slack.notifier import slack_notifier
 
 
 
@@ -148,21 +149,20 @@ from typing import List
 #         current_app.logger.error(f'---General Error Details---: {str(e)}')
 #         return {'error': f'Error while sending message to slack: {str(e)}', 'success': False}
 
-def send_NEWS_message_to_slack_channel(channel_id: str, title: str,
-                                     article_url: str, content: str,
-                                     image: str, used_keywords: List[str] = None,
-                                     audio_file: str = None):
+def build_news_blocks(title: str, article_url: str, content: str,
+                      image: str, used_keywords: List[str] = None) -> List[Dict[str, Any]]:
     """
-    Send a formatted news message to a Slack channel.
+    Build the Block Kit blocks of a news message.
     
     Args:
-        channel_id (str): The Slack channel ID
         title (str): Article title
         article_url (str): URL of the article
         content (str): Article content
         image (str): URL of the article image
         used_keywords (List[str], optional): List of keywords used. Defaults to None
-        audio_file (str, optional): Path to audio file. Defaults to None
+
+    Returns:
+        List[Dict[str, Any]]: The message blocks
     """
     # Base blocks without keywords section
     blocks = [
@@ -261,6 +261,53 @@ def send_NEWS_message_to_slack_channel(channel_id: str, title: str,
         }
     ])
 
+    return blocks
+
+
+def queue_NEWS_message_to_slack_channel(channel_id: str, title: str,
+                                       article_url: str, content: str,
+                                       image: str, used_keywords: List[str] = None):
+    """
+    Queue a formatted news message for the background Slack notifier.
+
+    The message is stored in the outbox and sent without blocking the caller, within
+    Slack's per-channel rate limit and with retries (see `slack_notifier`).
+
+    Args:
+        channel_id (str): The Slack channel ID
+        title (str): Article title
+        article_url (str): URL of the article
+        content (str): Article content
+        image (str): URL of the article image
+        used_keywords (List[str], optional): List of keywords used. Defaults to None
+    """
+    try:
+        blocks = build_news_blocks(title, article_url, content, image, used_keywords)
+        outbox_id = slack_notifier.enqueue(channel_id, title[:150], blocks)
+        return {'response': f'Message queued for Slack channel {channel_id}', 'outbox_id': outbox_id, 'success': True}
+    except Exception as e:
+        current_app.logger.error(f'---Error queueing Slack message---: {str(e)}')
+        return {'error': f'Error while queueing message to slack: {str(e)}', 'success': False}
+
+
+def send_NEWS_message_to_slack_channel(channel_id: str, title: str,
+                                     article_url: str, content: str,
+                                     image: str, used_keywords: List[str] = None,
+                                     audio_file: str = None):
+    """
+    Send a formatted news message to a Slack channel.
+    
+    Args:
+        channel_id (str): The Slack channel ID
+        title (str): Article title
+        article_url (str): URL of the article
+        content (str): Article content
+        image (str): URL of the article image
+        used_keywords (List[str], optional): List of keywords used. Defaults to None
+        audio_file (str, optional): Path to audio file. Defaults to None
+    """
+    blocks = build_news_blocks(title, article_url, content, image, used_keywords)
+
     try:
         result = client.chat_postMessage(
             channel=channel_id,
@@ -295,20 +342,12 @@ def send_NEWS_message_to_slack_channel(channel_id: str, title: str,
         return {'error': f'Error while sending message to slack: {str(e)}', 'success': False}
 
 
-# Deletes a message in Slack
+# Deletes messages in Slack, queued for the background notifier at chat.delete's rate limit
 def delete_messages_in_channel(ts_messages_list, channel_id="C05UB8G8B0F"):
     try:
-        for message in ts_messages_list:
-            response = client.chat_delete(
-                channel=channel_id,
-                ts=message
-            )
-            if not response["ok"]:
-                print(f"---Failed to delete message with timestamp {message}. Error: {response['error']}---")
-            else:
-                print(f"---Deleted message with timestamp {message}---")
-
-        return 'All messages deleted in Slack'
+        queued = slack_notifier.enqueue_deletes(channel_id, list(ts_messages_list))
+        print(f"---Queued {queued} messages for deletion in channel {channel_id}---")
+        return f'{queued} messages queued for deletion in Slack'
     except Exception as e:
         print(f'---Error while deleting messages in Slack: {str(e)}---')
         return f'Error while deleting messages in Slack: {str(e)}'
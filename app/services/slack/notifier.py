@@ -0,0 +1,229 @@
+"""
+Background Slack notifier backed by the `slack_outbox` table.
+
+Bots used to post to Slack inline at the end of each item, so Slack latency and its
+rate limits (about one message per second per channel) stalled the run, and a failed
+post was lost. Messages are now written to `slack_outbox` and sent by one daemon thread
+per process:
+
+- posts are spaced POST_INTERVAL_SECONDS apart per channel, deletions
+  DELETE_INTERVAL_SECONDS apart for the workspace (chat.delete allows ~50 per minute);
+- a 429 pauses the channel for its Retry-After without counting as an attempt;
+- other errors are retried with exponential backoff, up to MAX_ATTEMPTS; errors that
+  cannot succeed on retry (unknown channel, invalid blocks...) fail the row at once;
+- rows are claimed ('pending' -> 'sending') before sending, so several processes can
+  share the outbox, and rows left 'sending' by a crashed process are released.
+
+Queued rows survive restarts: the thread drains them when the app starts.
+"""
+import time
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from slack_sdk.errors import SlackApiError
+from sqlalchemy import func
+from config import Session, SlackOutbox
+from app.services.slack.index import client
+
+logger = logging.getLogger(__name__)
+
+POST_INTERVAL_SECONDS = 1.1
+DELETE_INTERVAL_SECONDS = 1.2
+MAX_ATTEMPTS = 5
+BASE_BACKOFF_SECONDS = 5
+MAX_BACKOFF_SECONDS = 600
+BATCH_SIZE = 50
+# Longest the thread sleeps when nothing is due
+POLL_SECONDS = 5
+# Rows 'sending' for longer than this were abandoned by a crashed process
+SENDING_TIMEOUT_SECONDS = 300
+MAINTENANCE_INTERVAL_SECONDS = 60
+SENT_RETENTION_DAYS = 7
+
+PERMANENT_ERRORS = {
+    'channel_not_found', 'not_in_channel', 'is_archived', 'invalid_blocks', 'invalid_auth',
+    'account_inactive', 'msg_too_long', 'no_text', 'cant_delete_message', 'restricted_action',
+}
+
+
+class SlackNotifier:
+    """Drains `slack_outbox` from a daemon thread with per-channel rate limits and retries."""
+
+    def __init__(self):
+        self._ready_at: Dict[str, float] = {}
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._maintained_at = 0.0
+        self.counters = {'sent': 0, 'deleted': 0, 'retried': 0, 'rate_limited': 0, 'failed': 0}
+
+    def start(self) -> None:
+        """Start the sender thread (once per process)."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name='slack-notifier', daemon=True)
+                self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+    def enqueue(self, channel_id: str, text: str, blocks: List[Dict[str, Any]]) -> int:
+        """
+        Queue a message to post.
+
+        Returns:
+            int: ID of the outbox row
+        """
+        with Session() as session:
+            row = SlackOutbox(kind='post', channel_id=channel_id, text=text, blocks=blocks)
+            session.add(row)
+            session.commit()
+            row_id = row.id
+        self.start()
+        self._wake.set()
+        return row_id
+
+    def enqueue_deletes(self, channel_id: str, ts_list: List[str]) -> int:
+        """Queue the deletion of messages by timestamp; returns the number queued."""
+        with Session() as session:
+            session.add_all([SlackOutbox(kind='delete', channel_id=channel_id, ts=ts) for ts in ts_list])
+            session.commit()
+        self.start()
+        self._wake.set()
+        return len(ts_list)
+
+    @staticmethod
+    def _limit_key(row: SlackOutbox) -> str:
+        return 'delete' if row.kind == 'delete' else f"post:{row.channel_id}"
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                if time.monotonic() - self._maintained_at >= MAINTENANCE_INTERVAL_SECONDS:
+                    self._maintain()
+                delay = self._drain()
+            except Exception as e:
+                logger.error("Slack notifier cycle failed: %s", e)
+                delay = POLL_SECONDS
+            self._wake.wait(delay)
+            self._wake.clear()
+
+    def _maintain(self) -> None:
+        """Release rows abandoned mid-send and delete old sent rows."""
+        now = datetime.now()
+        with Session() as session:
+            session.query(SlackOutbox)\
+                   .filter(SlackOutbox.status == 'sending',
+                           SlackOutbox.updated_at < now - timedelta(seconds=SENDING_TIMEOUT_SECONDS))\
+                   .update({'status': 'pending'}, synchronize_session=False)
+            session.query(SlackOutbox)\
+                   .filter(SlackOutbox.status == 'sent',
+                           SlackOutbox.updated_at < now - timedelta(days=SENT_RETENTION_DAYS))\
+                   .delete(synchronize_session=False)
+            session.commit()
+        self._maintained_at = time.monotonic()
+
+    def _drain(self) -> float:
+        """Send the due rows whose channel is ready; returns seconds until the next check."""
+        with Session() as session:
+            rows = session.query(SlackOutbox)\
+                          .filter(SlackOutbox.status == 'pending',
+                                  SlackOutbox.next_attempt_at <= datetime.now())\
+                          .order_by(SlackOutbox.id)\
+                          .limit(BATCH_SIZE)\
+                          .all()
+
+        delay = POLL_SECONDS
+        for row in rows:
+            key = self._limit_key(row)
+            wait = self._ready_at.get(key, 0.0) - time.monotonic()
+            if wait > 0:
+                # Later rows of the same channel wait too, keeping per-channel order
+                delay = min(delay, wait)
+                continue
+            if not self._claim(row.id):
+                continue
+            self._send(row, key)
+            delay = min(delay, POST_INTERVAL_SECONDS if row.kind == 'post' else DELETE_INTERVAL_SECONDS)
+        return delay
+
+    def _claim(self, row_id: int) -> bool:
+        with Session() as session:
+            claimed = session.query(SlackOutbox)\
+                             .filter_by(id=row_id, status='pending')\
+                             .update({'status': 'sending', 'updated_at': datetime.now()})
+            session.commit()
+        return claimed == 1
+
+    def _send(self, row: SlackOutbox, key: str) -> None:
+        interval = DELETE_INTERVAL_SECONDS if row.kind == 'delete' else POST_INTERVAL_SECONDS
+        self._ready_at[key] = time.monotonic() + interval
+        try:
+            if row.kind == 'delete':
+                client.chat_delete(channel=row.channel_id, ts=row.ts)
+                fields = {'status': 'sent', 'error': None}
+                self.counters['deleted'] += 1
+            else:
+                result = client.chat_postMessage(channel=row.channel_id, text=row.text, blocks=row.blocks)
+                fields = {'status': 'sent', 'ts': result['ts'], 'error': None}
+                self.counters['sent'] += 1
+
+        except SlackApiError as e:
+            error = e.response.get('error') if e.response is not None else None
+            if e.response is not None and e.response.status_code == 429:
+                retry_after = float(e.response.headers.get('Retry-After', 1))
+                self._ready_at[key] = time.monotonic() + retry_after
+                self.counters['rate_limited'] += 1
+                fields = {'status': 'pending'}
+            elif row.kind == 'delete' and error == 'message_not_found':
+                fields = {'status': 'sent', 'error': error}
+                self.counters['deleted'] += 1
+            elif error in PERMANENT_ERRORS:
+                logger.error("Slack %s to %s failed permanently: %s", row.kind, row.channel_id, error)
+                fields = {'status': 'failed', 'attempts': row.attempts + 1, 'error': error}
+                self.counters['failed'] += 1
+            else:
+                fields = self._retry_fields(row, f"Slack API error: {str(e)}")
+        except Exception as e:
+            fields = self._retry_fields(row, str(e))
+
+        with Session() as session:
+            session.query(SlackOutbox).filter_by(id=row.id).update(fields)
+            session.commit()
+
+    def _retry_fields(self, row: SlackOutbox, error: str) -> Dict[str, Any]:
+        attempts = row.attempts + 1
+        if attempts >= MAX_ATTEMPTS:
+            logger.error("Giving up on Slack %s to %s after %s attempts: %s", row.kind, row.channel_id, attempts, error)
+            self.counters['failed'] += 1
+            return {'status': 'failed', 'attempts': attempts, 'error': error[:1000]}
+        backoff = min(BASE_BACKOFF_SECONDS * 2 ** (attempts - 1), MAX_BACKOFF_SECONDS)
+        self.counters['retried'] += 1
+        return {
+            'status': 'pending',
+            'attempts': attempts,
+            'error': error[:1000],
+            'next_attempt_at': datetime.now() + timedelta(seconds=backoff)
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Rows by status and kind, and this process's send counters."""
+        with Session() as session:
+            rows = session.query(SlackOutbox.status, SlackOutbox.kind, func.count(SlackOutbox.id))\
+                          .group_by(SlackOutbox.status, SlackOutbox.kind)\
+                          .all()
+        outbox = {}
+        for status, kind, count in rows:
+            outbox.setdefault(status, {})[kind] = count
+        return {
+            'running': self._thread is not None and self._thread.is_alive(),
+            'outbox': outbox,
+            'process': dict(self.counters),
+        }
+
+
+slack_notifier = SlackNotifier()
@@ -0,0 +1,274 @@
+"""
+Incremental readers for the bot log files written by the news bot pipeline.
+
+Log files are rotated at 5MB, so the API never loads a whole file. `tail` walks the
+file backwards through an mmap until it has enough records, `read_from` reads forward
+from a byte offset (for resuming and paging), and `follow` polls the file for new
+records, surviving rotation. Offsets are byte positions of record starts in the current
+file, so a client can resume exactly where the previous response ended.
+
+A record is either one JSON line written by the pipeline's log sink, or (for files
+written before the sink) one formatted text line plus any continuation lines such as
+tracebacks.
+"""
+import os
+import re
+import json
+import mmap
+import time
+from datetime import datetime
+
+LOG_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Legacy text format: "<time> - <logger> - <LEVEL> - <message>"
+RECORD_HEADER = re.compile(rb'^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) - (.*?) - ([A-Z]+) - ')
+# JSON lines written by app.news_bot.news_bot_v2.utils.log_sink
+JSON_RECORD_PREFIX = b'{"time": '
+
+LEVELS = {'DEBUG': 10, 'INFO': 20, 'WARNING': 30, 'ERROR': 40, 'CRITICAL': 50}
+
+
+class LogFilter:
+    """
+    Record filter applied while scanning a log file.
+
+    Args:
+        level (str, optional): Minimum level name (e.g. 'WARNING')
+        since (datetime, optional): Only records at or after this time
+        until (datetime, optional): Only records at or before this time
+        contains (str, optional): Case-insensitive substring the record must contain
+        run_id (str, optional): Only records of this pipeline run
+    """
+
+    def __init__(self, level=None, since=None, until=None, contains=None, run_id=None):
+        if level is not None and level.upper() not in LEVELS:
+            raise ValueError(f"Invalid level: {level}. Must be one of: {', '.join(LEVELS)}")
+        self.min_level = LEVELS[level.upper()] if level else None
+        self.since = since
+        self.until = until
+        self.contains = contains.lower() if contains else None
+        self.run_id = run_id
+
+    def matches(self, record):
+        if self.min_level is not None and LEVELS.get(record['level'], 0) < self.min_level:
+            return False
+        if (self.since or self.until) and record['timestamp'] is None:
+            return False
+        if self.since and record['timestamp'] < self.since:
+            return False
+        if self.until and record['timestamp'] > self.until:
+            return False
+        if self.run_id and record['run_id'] != self.run_id:
+            return False
+        if self.contains and self.contains not in record['text'].lower():
+            return False
+        return True
+
+
+def _is_header(line):
+    """Whether a line starts a new record."""
+    return line.startswith(JSON_RECORD_PREFIX) or RECORD_HEADER.match(line) is not None
+
+
+def _make_record(offset, lines):
+    """Build a record dict from its raw lines (header first)."""
+    timestamp, level, run_id = None, None, None
+    if lines[0].startswith(JSON_RECORD_PREFIX):
+        try:
+            entry = json.loads(lines[0])
+            timestamp = datetime.strptime(entry['time'], LOG_DATE_FORMAT)
+            level = entry.get('level')
+            run_id = entry.get('run_id')
+        except (ValueError, KeyError):
+            pass
+    else:
+        header = RECORD_HEADER.match(lines[0])
+        if header:
+            timestamp = datetime.strptime(header.group(1).decode(), LOG_DATE_FORMAT)
+            level = header.group(3).decode()
+    return {
+        'offset': offset,
+        'timestamp': timestamp,
+        'level': level,
+        'run_id': run_id,
+        'text': b'\n'.join(lines).decode('utf-8', errors='replace'),
+    }
+
+
+def _open_map(path):
+    """Return (file, mmap) for a non-empty file, or (None, None) when it is empty."""
+    f = open(path, 'rb')
+    if os.fstat(f.fileno()).st_size == 0:
+        f.close()
+        return None, None
+    return f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def file_id(path):
+    """
+    Identifier of the current file generation; it changes when the log is rotated.
+
+    Only the device and inode are used: timestamps change on every write, while
+    rotation replaces the file. Truncation in place keeps the inode and is detected
+    by the size dropping below the read offset.
+    """
+    stat = os.stat(path)
+    return f"{stat.st_dev:x}-{stat.st_ino:x}"
+
+
+def tail(path, count, log_filter=None, before=None):
+    """
+    Return the last `count` matching records, reading the file backwards.
+
+    Args:
+        path (str): Log file path
+        count (int): Maximum number of records to return
+        log_filter (LogFilter, optional): Records that do not match are skipped
+        before (int, optional): Only consider records starting before this byte offset,
+            used to page further back from a previous response's start_offset
+
+    Returns:
+        tuple: (records in chronological order, start_offset, end_offset). start_offset
+            is the offset of the earliest record scanned and can be passed back as
+            `before`; end_offset is where a forward read or follow should resume.
+    """
+    log_filter = log_filter or LogFilter()
+    f, mm = _open_map(path)
+    if mm is None:
+        return [], 0, 0
+
+    try:
+        size = len(mm)
+        # Ignore a trailing partial line that the writer has not finished yet
+        end = mm.rfind(b'\n', 0, size) + 1
+        if before is not None:
+            end = min(end, max(before, 0))
+
+        records = []
+        pending = []  # continuation lines (in reverse) waiting for their header
+        position = end
+        start_offset = end
+        while position > 0 and len(records) < count:
+            line_start = mm.rfind(b'\n', 0, position - 1) + 1
+            line = mm[line_start:position].rstrip(b'\r\n')
+            position = line_start
+
+            if not _is_header(line) and line_start > 0:
+                pending.append(line)
+                continue
+
+            record = _make_record(line_start, [line] + pending[::-1])
+            pending = []
+            start_offset = line_start
+            # Records are chronological, so nothing earlier can satisfy `since`
+            if log_filter.since and record['timestamp'] and record['timestamp'] < log_filter.since:
+                break
+            if log_filter.matches(record):
+                records.append(record)
+
+        records.reverse()
+        return records, start_offset, end
+    finally:
+        mm.close()
+        f.close()
+
+
+def read_from(path, offset, max_bytes, log_filter=None):
+    """
+    Read matching records forward from a byte offset.
+
+    Only complete lines are returned, and a record is never split across responses:
+    reading stops at the first record boundary after `max_bytes`.
+
+    Args:
+        path (str): Log file path
+        offset (int): Byte offset to start from (a previous response's end_offset)
+        max_bytes (int): Approximate number of bytes to scan
+        log_filter (LogFilter, optional): Records that do not match are skipped
+
+    Returns:
+        tuple: (records, end_offset). end_offset is where the next read should resume.
+    """
+    log_filter = log_filter or LogFilter()
+    f, mm = _open_map(path)
+    if mm is None:
+        return [], 0
+
+    try:
+        size = len(mm)
+        offset = min(max(offset, 0), size)
+        limit = offset + max_bytes
+
+        records = []
+        current_start, current_lines = None, []
+        position = offset
+        end_offset = offset
+        while position < size:
+            newline = mm.find(b'\n', position)
+            if newline == -1:
+                # Partial line still being written; a new header means the previous record is complete
+                if current_lines and _is_header(mm[position:size]):
+                    record = _make_record(current_start, current_lines)
+                    if log_filter.matches(record):
+                        records.append(record)
+                    end_offset = position
+                    current_lines = []
+                break
+            line = mm[position:newline].rstrip(b'\r')
+            if _is_header(line):
+                if current_lines:
+                    record = _make_record(current_start, current_lines)
+                    if log_filter.until and record['timestamp'] and record['timestamp'] > log_filter.until:
+                        current_lines = []
+                        break
+                    if log_filter.matches(record):
+                        records.append(record)
+                    end_offset = position
+                    if position >= limit:
+                        current_lines = []
+                        break
+                current_start, current_lines = position, [line]
+            elif current_lines:
+                current_lines.append(line)
+            else:
+                # Continuation lines of a record that started before `offset`
+                current_start, current_lines = position, [line]
+            position = newline + 1
+
+        # The last record is only complete once the next header (or EOF) is reached
+        if current_lines and position >= size:
+            record = _make_record(current_start, current_lines)
+            if log_filter.matches(record):
+                records.append(record)
+            end_offset = position
+        return records, end_offset
+    finally:
+        mm.close()
+        f.close()
+
+
+def follow(path, offset, log_filter=None, poll_interval=1.0, timeout=300):
+    """
+    Yield batches of new records appended after `offset` until `timeout` seconds pass.
+
+    An empty batch is yielded on every idle poll so callers can send keep-alives.
+    When the file is rotated (its identity changes or it shrinks) reading restarts at
+    the beginning of the new file.
+
+    Yields:
+        tuple: (records, end_offset, file_id)
+    """
+    deadline = time.monotonic() + timeout
+    current_id = file_id(path)
+    while time.monotonic() < deadline:
+        try:
+            latest_id = file_id(path)
+            if latest_id != current_id or os.path.getsize(path) < offset:
+                current_id, offset = latest_id, 0
+            records, offset = read_from(path, offset, 256 * 1024, log_filter)
+        except FileNotFoundError:
+            # Between the rename and the creation of the new file during rotation
+            records = []
+        yield records, offset, current_id
+        if not records:
+            time.sleep(poll_interval)
@@ -0,0 +1,284 @@
+"""
+Time-windowed, in-process ANN indexes of article embeddings for cross-bot deduplication.
+
+`is_content_similar` used to compare a candidate only against the last few articles of
+the same bot, so a story syndicated across many outlets slipped through once that window
+rolled, and every bot in a category paid for analysis and images on the same event.
+`SemanticIndex` keeps the embeddings of recently saved articles in an HNSW graph
+(hnswlib) so a candidate is checked against thousands of them in milliseconds.
+`SemanticDedupIndexes` holds one index per category plus a global one.
+
+Entries older than the window are marked deleted and their slots reused, and each index
+is persisted to disk (SEMANTIC_INDEX_DIR) so a restart does not lose the window. When
+hnswlib is not installed, an exact NumPy scan is used instead, which is still only a few
+milliseconds for the few thousand vectors a window holds.
+"""
+import os
+import json
+import time
+import threading
+import numpy as np
+
+try:
+    import hnswlib
+except ImportError:  # pragma: no cover - optional dependency
+    hnswlib = None
+
+EMBEDDING_DIMENSIONS = 1536  # text-embedding-3-small
+SEMANTIC_WINDOW_HOURS = int(os.getenv('SEMANTIC_WINDOW_HOURS', 72))
+SEMANTIC_INDEX_DIR = os.getenv(
+    'SEMANTIC_INDEX_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                 'news_bot', 'news_bot_v2', 'semantic_index')
+)
+INITIAL_CAPACITY = 2048
+HNSW_M = 16
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 64
+SAVE_INTERVAL_SECONDS = 60
+
+
+def _normalize(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class SemanticIndex:
+    """
+    Cosine-similarity index over article embeddings within a sliding time window.
+
+    Args:
+        name (str): File name stem used when persisting the index
+        dim (int): Embedding dimensions
+        window_hours (int): Entries older than this are evicted
+        directory (str, optional): Where the index is persisted; None keeps it in memory only
+    """
+
+    def __init__(self, name, dim=EMBEDDING_DIMENSIONS, window_hours=SEMANTIC_WINDOW_HOURS,
+                 directory=SEMANTIC_INDEX_DIR):
+        self.name = name
+        self.dim = dim
+        self.window_seconds = window_hours * 3600
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._added_at = {}  # article id -> unix timestamp
+        self._dirty = False
+        self._last_saved = time.monotonic()
+        if not self._load():
+            self._reset()
+
+    # -- storage backends -----------------------------------------------------------
+
+    def _reset(self):
+        self._added_at = {}
+        if hnswlib is not None:
+            self._graph = hnswlib.Index(space='cosine', dim=self.dim)
+            self._graph.init_index(max_elements=INITIAL_CAPACITY, ef_construction=HNSW_EF_CONSTRUCTION,
+                                   M=HNSW_M, allow_replace_deleted=True)
+            self._graph.set_ef(HNSW_EF_SEARCH)
+        else:
+            self._ids = np.empty(0, dtype=np.int64)
+            self._vectors = np.empty((0, self.dim), dtype=np.float32)
+
+    def _paths(self):
+        stem = os.path.join(self.directory, self.name)
+        return stem + ('.hnsw' if hnswlib is not None else '.npz'), stem + '.meta.json'
+
+    def _load(self):
+        if not self.directory:
+            return False
+        data_path, meta_path = self._paths()
+        if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+            return False
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if meta.get('dim') != self.dim:
+                return False
+            if hnswlib is not None:
+                self._graph = hnswlib.Index(space='cosine', dim=self.dim)
+                self._graph.load_index(data_path, max_elements=meta['capacity'], allow_replace_deleted=True)
+                self._graph.set_ef(HNSW_EF_SEARCH)
+            else:
+                with np.load(data_path) as arrays:
+                    self._ids, self._vectors = arrays['ids'], arrays['vectors']
+            self._added_at = {int(k): v for k, v in meta['added_at'].items()}
+            return True
+        except Exception:
+            # A corrupt or partially written index is rebuilt from new articles
+            return False
+
+    def save(self):
+        """Persist the index atomically (write to a temporary file, then rename)."""
+        if not self.directory:
+            return
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            data_path, meta_path = self._paths()
+            if hnswlib is not None:
+                self._graph.save_index(data_path + '.tmp')
+                capacity = self._graph.get_max_elements()
+            else:
+                with open(data_path + '.tmp', 'wb') as f:
+                    np.savez(f, ids=self._ids, vectors=self._vectors)
+                capacity = len(self._ids)
+            with open(meta_path + '.tmp', 'w') as f:
+                json.dump({'dim': self.dim, 'capacity': capacity, 'added_at': self._added_at}, f)
+            os.replace(data_path + '.tmp', data_path)
+            os.replace(meta_path + '.tmp', meta_path)
+            self._dirty = False
+            self._last_saved = time.monotonic()
+
+    def _maybe_save(self):
+        if self._dirty and time.monotonic() - self._last_saved >= SAVE_INTERVAL_SECONDS:
+            try:
+                self.save()
+            except OSError:
+                pass
+
+    # -- window maintenance ---------------------------------------------------------
+
+    def _evict_expired(self, now):
+        cutoff = now - self.window_seconds
+        expired = [article_id for article_id, added in self._added_at.items() if added < cutoff]
+        if not expired:
+            return
+        if hnswlib is not None:
+            for article_id in expired:
+                self._graph.mark_deleted(article_id)
+        else:
+            keep = ~np.isin(self._ids, expired)
+            self._ids, self._vectors = self._ids[keep], self._vectors[keep]
+        for article_id in expired:
+            del self._added_at[article_id]
+        self._dirty = True
+
+    def _undelete(self, article_id):
+        """Restore an evicted label whose slot has not been reused yet; False if it is gone."""
+        try:
+            self._graph.unmark_deleted(article_id)
+            return True
+        except RuntimeError:
+            return False
+
+    # -- public API -----------------------------------------------------------------
+
+    def add(self, article_id, embedding, timestamp=None):
+        """
+        Add (or replace) an article's embedding.
+
+        Args:
+            article_id (int): Article ID, used as the index label
+            embedding (Sequence[float]): Embedding vector of the article's source content
+            timestamp (float, optional): Unix time the article was saved. Defaults to now
+        """
+        now = time.time()
+        vector = _normalize(embedding)
+        with self._lock:
+            self._evict_expired(now)
+            if hnswlib is not None:
+                if article_id in self._added_at or self._undelete(article_id):
+                    # The label keeps its slot: update the vector in place. Replacing it
+                    # could move the label to another deleted slot while its old slot
+                    # still carries it, and reusing that slot later would drop the label.
+                    self._graph.add_items(vector[np.newaxis, :], [article_id])
+                else:
+                    # Slots of evicted entries are reused before the graph grows
+                    if self._graph.get_current_count() >= self._graph.get_max_elements() \
+                            and len(self._added_at) >= self._graph.get_max_elements():
+                        self._graph.resize_index(self._graph.get_max_elements() * 2)
+                    self._graph.add_items(vector[np.newaxis, :], [article_id], replace_deleted=True)
+            else:
+                keep = self._ids != article_id
+                self._ids = np.append(self._ids[keep], article_id)
+                self._vectors = np.vstack([self._vectors[keep], vector[np.newaxis, :]])
+            self._added_at[article_id] = timestamp or now
+            self._dirty = True
+        self._maybe_save()
+
+    def query(self, embedding, k=5):
+        """
+        Return the `k` most similar articles still inside the window.
+
+        Returns:
+            List[Tuple[int, float]]: (article_id, cosine similarity), most similar first
+        """
+        vector = _normalize(embedding)
+        with self._lock:
+            self._evict_expired(time.time())
+            live = len(self._added_at)
+            if not live:
+                return []
+            k = min(k, live)
+            if hnswlib is not None:
+                labels, distances = self._graph.knn_query(vector[np.newaxis, :], k=k)
+                return [(int(label), float(1 - distance)) for label, distance in zip(labels[0], distances[0])]
+            scores = self._vectors @ vector
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(int(self._ids[i]), float(scores[i])) for i in top]
+
+    def __contains__(self, article_id):
+        return article_id in self._added_at
+
+    def __len__(self):
+        return len(self._added_at)
+
+
+class SemanticDedupIndexes:
+    """One `SemanticIndex` per category plus a global index across all categories."""
+
+    def __init__(self, directory=SEMANTIC_INDEX_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._indexes = {}
+
+    def _get(self, name):
+        with self._lock:
+            index = self._indexes.get(name)
+            if index is None:
+                index = self._indexes[name] = SemanticIndex(name, directory=self.directory)
+            return index
+
+    def category(self, category_id):
+        return self._get(f'category_{category_id}')
+
+    @property
+    def global_index(self):
+        return self._get('global')
+
+    def add(self, article_id, category_id, embedding):
+        """Index a saved article in its category's index and in the global index."""
+        if category_id is not None:
+            self.category(category_id).add(article_id, embedding)
+        self.global_index.add(article_id, embedding)
+
+    def find_duplicate(self, embedding, category_id, category_threshold, global_threshold):
+        """
+        Return the closest indexed article above the threshold for its scope.
+
+        Articles in the same category only need to clear `category_threshold`; articles
+        from other categories must clear the stricter `global_threshold`, since the same
+        event can legitimately be covered from different angles.
+
+        Returns:
+            Optional[Tuple[int, float]]: (article_id, similarity) or None
+        """
+        if category_id is not None:
+            matches = self.category(category_id).query(embedding, k=1)
+            if matches and matches[0][1] >= category_threshold:
+                return matches[0]
+        matches = self.global_index.query(embedding, k=1)
+        if matches and matches[0][1] >= global_threshold:
+            return matches[0]
+        return None
+
+    def save(self):
+        with self._lock:
+            indexes = list(self._indexes.values())
+        for index in indexes:
+            index.save()
+
+
+semantic_indexes = SemanticDedupIndexes()
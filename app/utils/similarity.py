@@ -1,4 +1,8 @@
 import os
+import re
+import hashlib
+from typing import List
+from collections import defaultdict
 from openai import OpenAI
 from dotenv import load_dotenv
 from sklearn.feature_extraction.text import TfidfVectorizer
@@ -9,6 +13,14 @@ load_dotenv()
 OPENAI_API_KEY = os.getenv('NEWS_BOT_OPENAI_API_KEY')
 api_key = OPENAI_API_KEY
 
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+SIMHASH_BITS = 64
+SIMHASH_BANDS = 4  # 16-bit bands: fingerprints within 3 bits share at least one band
+SHINGLE_SIZE = 3
+_MASK_64 = (1 << SIMHASH_BITS) - 1
+_TOKEN_PATTERN = re.compile(r"\w+")
+
 def cosine_similarity_modified(content_1, content_2):
     try:
         vectorizer = TfidfVectorizer()
@@ -56,7 +68,7 @@ def cosine_similarity_with_openai_classification(content_1: str, content_2: str)
         # Generate embeddings for both contents
         embeddings = client.embeddings.create(
             input=[content_1, content_2],
-            model="text-embedding-3-small"
+            model=EMBEDDING_MODEL
         )
         
         # Extract embedding vectors
@@ -70,4 +82,110 @@ def cosine_similarity_with_openai_classification(content_1: str, content_2: str)
 
     except Exception as e:
         raise Exception(f"Error in cosine similarity calculation: {str(e)}") from e
-    
+
+
+def get_embeddings(contents: List[str]) -> List[List[float]]:
+    """
+    Generate OpenAI text embeddings for several contents in a single API call.
+
+    Args:
+        contents (List[str]): Non-empty text contents to embed.
+
+    Returns:
+        List[List[float]]: One embedding vector per content, in input order.
+
+    Raises:
+        ValueError: If a content is empty or the API key is not available.
+        Exception: If the embedding request fails.
+    """
+    if not contents or not all(contents):
+        raise ValueError("All contents must be non-empty strings.")
+    if not OPENAI_API_KEY:
+        raise ValueError("OpenAI API key is not available in the environment.")
+
+    try:
+        client = OpenAI(api_key=OPENAI_API_KEY)
+        response = client.embeddings.create(input=contents, model=EMBEDDING_MODEL)
+        return [item.embedding for item in response.data]
+    except Exception as e:
+        raise Exception(f"Error generating embeddings: {str(e)}") from e
+
+
+def simhash(text: str) -> int:
+    """
+    Compute a 64-bit SimHash fingerprint of a text from its word 3-gram shingles.
+
+    Near-identical texts get fingerprints that differ in only a few bits, so
+    duplicates can be detected by Hamming distance without any API call. The value
+    is returned as a signed 64-bit integer so it fits a Postgres BIGINT column.
+
+    Args:
+        text (str): Text to fingerprint.
+
+    Returns:
+        int: Signed 64-bit fingerprint (0 for texts without words).
+    """
+    tokens = _TOKEN_PATTERN.findall((text or '').lower())
+    if not tokens:
+        return 0
+    shingles = [' '.join(tokens[i:i + SHINGLE_SIZE]) for i in range(max(len(tokens) - SHINGLE_SIZE + 1, 1))]
+
+    weights = [0] * SIMHASH_BITS
+    for shingle in shingles:
+        digest = int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), 'big')
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if digest >> bit & 1 else -1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint - (1 << SIMHASH_BITS) if fingerprint >> (SIMHASH_BITS - 1) else fingerprint
+
+
+def hamming_distance(hash_1: int, hash_2: int) -> int:
+    """Number of differing bits between two 64-bit fingerprints (signed or unsigned)."""
+    return bin((hash_1 ^ hash_2) & _MASK_64).count('1')
+
+
+class SimHashIndex:
+    """
+    In-memory LSH index of SimHash fingerprints.
+
+    Each fingerprint is split into SIMHASH_BANDS bands and stored under every
+    (band, value) bucket. Two fingerprints within SIMHASH_BANDS - 1 bits of each other
+    share at least one bucket, so a query only compares against bucket members
+    instead of every indexed fingerprint.
+    """
+
+    def __init__(self):
+        self._buckets = defaultdict(set)
+        self._hashes = {}
+        self.last_id = 0
+
+    def __len__(self):
+        return len(self._hashes)
+
+    @staticmethod
+    def _bands(fingerprint: int):
+        width = SIMHASH_BITS // SIMHASH_BANDS
+        unsigned = fingerprint & _MASK_64
+        return [(band, unsigned >> (band * width) & ((1 << width) - 1)) for band in range(SIMHASH_BANDS)]
+
+    def add(self, item_id: int, fingerprint: int) -> None:
+        self._hashes[item_id] = fingerprint
+        for bucket in self._bands(fingerprint):
+            self._buckets[bucket].add(item_id)
+        self.last_id = max(self.last_id, item_id)
+
+    def query(self, fingerprint: int, max_distance: int = SIMHASH_BANDS - 1):
+        """
+        Return (item_id, distance) pairs within `max_distance` bits, closest first.
+
+        Only exact for max_distance < SIMHASH_BANDS; larger distances may miss items.
+        """
+        candidates = set()
+        for bucket in self._bands(fingerprint):
+            candidates |= self._buckets.get(bucket, set())
+        matches = [(item_id, hamming_distance(fingerprint, self._hashes[item_id])) for item_id in candidates]
+        return sorted([match for match in matches if match[1] <= max_distance], key=lambda match: match[1])
@@ -0,0 +1,133 @@
+"""
+Benchmark: ILIKE scan vs. tsvector/GIN full-text search for the /articles search parameter.
+
+Seeds a scratch copy of the article table with synthetic rows (1M by default), builds the
+same generated `search_vector` column and GIN index used in production, then compares
+the execution time of the legacy `ILIKE '%term%'` filter against the full-text query.
+
+Usage:
+    DB_URI=postgresql://... python benchmarks/article_search_benchmark.py --rows 1000000
+
+The scratch table is dropped at the end of the run unless --keep is given.
+"""
+import os
+import json
+import argparse
+from time import perf_counter
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, text
+
+load_dotenv()
+
+TABLE = 'bench_article_search'
+
+VOCABULARY = [
+    'bitcoin', 'ethereum', 'solana', 'etf', 'regulation', 'exchange', 'hack', 'stablecoin',
+    'inflation', 'federal', 'reserve', 'gold', 'market', 'rally', 'liquidity', 'defi',
+    'layer', 'token', 'wallet', 'mining', 'halving', 'custody', 'lawsuit', 'sec', 'approval',
+    'treasury', 'yield', 'bond', 'dollar', 'price', 'volume', 'investor', 'fund', 'launch',
+]
+
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(content, '')), 'B')"
+)
+
+QUERIES = {
+    'ilike': (
+        f"SELECT id, title, created_at FROM {TABLE} "
+        "WHERE content ILIKE :pattern OR title ILIKE :pattern "
+        "ORDER BY created_at DESC LIMIT 10"
+    ),
+    'full_text': (
+        f"SELECT id, title, created_at, ts_rank_cd(search_vector, q) AS rank "
+        f"FROM {TABLE}, websearch_to_tsquery('english', :term) AS q "
+        "WHERE search_vector @@ q "
+        "ORDER BY rank DESC, created_at DESC LIMIT 10"
+    ),
+}
+
+
+def seed(conn, rows: int) -> None:
+    """Create the scratch table and fill it with synthetic article bodies."""
+    conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+    conn.execute(text(f"""
+        CREATE TABLE {TABLE} (
+            id SERIAL PRIMARY KEY,
+            title VARCHAR,
+            content VARCHAR,
+            created_at TIMESTAMP,
+            search_vector TSVECTOR GENERATED ALWAYS AS ({SEARCH_VECTOR_EXPRESSION}) STORED
+        )
+    """))
+    conn.execute(text(f"""
+        INSERT INTO {TABLE} (title, content, created_at)
+        SELECT
+            (SELECT string_agg(w, ' ') FROM (
+                SELECT (:vocab)[1 + floor(random() * array_length(:vocab, 1))::int] AS w
+                FROM generate_series(1, 8 + (g % 3))
+            ) t),
+            (SELECT string_agg(w, ' ') FROM (
+                SELECT (:vocab)[1 + floor(random() * array_length(:vocab, 1))::int] AS w
+                FROM generate_series(1, 300 + (g % 50))
+            ) c),
+            now() - (g || ' minutes')::interval
+        FROM generate_series(1, :rows) AS g
+    """), {'rows': rows, 'vocab': VOCABULARY})
+    conn.execute(text(f"CREATE INDEX ix_{TABLE}_search_vector ON {TABLE} USING gin (search_vector)"))
+    conn.execute(text(f"ANALYZE {TABLE}"))
+
+
+def explain(conn, name: str, params: dict, repeats: int) -> dict:
+    """Run EXPLAIN ANALYZE for a query several times and return timing stats in ms."""
+    timings = []
+    plan_node = None
+    for _ in range(repeats):
+        result = conn.execute(text(f"EXPLAIN (ANALYZE, FORMAT JSON) {QUERIES[name]}"), params).scalar()
+        plan = result if isinstance(result, list) else json.loads(result)
+        timings.append(plan[0]['Execution Time'])
+        plan_node = plan[0]['Plan']
+    timings.sort()
+    return {
+        'min_ms': round(timings[0], 2),
+        'median_ms': round(timings[len(timings) // 2], 2),
+        'max_ms': round(timings[-1], 2),
+        'top_node': plan_node['Node Type'] if plan_node else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000, help='Number of synthetic rows to seed')
+    parser.add_argument('--term', default='halving custody', help='Search term to benchmark')
+    parser.add_argument('--repeats', type=int, default=5, help='Runs per query')
+    parser.add_argument('--keep', action='store_true', help='Keep the scratch table after the run')
+    args = parser.parse_args()
+
+    engine = create_engine(os.getenv('DB_URI'))
+    with engine.begin() as conn:
+        started = perf_counter()
+        print(f"Seeding {args.rows:,} rows into {TABLE}...")
+        seed(conn, args.rows)
+        print(f"Seeded in {perf_counter() - started:.1f}s")
+
+    first_word = args.term.split()[0]
+    with engine.connect() as conn:
+        results = {
+            'ilike': explain(conn, 'ilike', {'pattern': f'%{first_word}%'}, args.repeats),
+            'full_text': explain(conn, 'full_text', {'term': args.term}, args.repeats),
+        }
+
+    for name, stats in results.items():
+        print(f"{name:>10}: median {stats['median_ms']} ms "
+              f"(min {stats['min_ms']} / max {stats['max_ms']}) top node: {stats['top_node']}")
+    speedup = results['ilike']['median_ms'] / max(results['full_text']['median_ms'], 0.01)
+    print(f"Full-text search is {speedup:.1f}x faster on the median run")
+
+    if not args.keep:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+
+
+if __name__ == '__main__':
+    main()
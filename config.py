@@ -2,6 +2,7 @@ from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
 from dotenv import load_dotenv
 from sqlalchemy import Enum
+from sqlalchemy.dialects.postgresql import TSVECTOR, insert as postgresql_insert
 import os
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import create_engine, func
@@ -21,6 +22,18 @@ engine = create_engine(
 print(f"Connected to {DB_URI}")
 Session = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
 
+# Full-text search document shared by Article and UnwantedArticle. Postgres keeps the
+# generated column in sync on every insert/update, titles rank above body matches.
+SEARCH_CONFIG = 'english'
+SEARCH_VECTOR_EXPRESSION = (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, coalesce(content, '')), 'B')"
+)
+# Internal search columns that are never serialized
+SEARCH_COLUMNS = {'search_vector'}
+# Columns used for matching only, never serialized by as_dict()
+INTERNAL_COLUMNS = SEARCH_COLUMNS | {'content_simhash'}
+
 class Category(db.Model):
     """Represents a category in the database.
 
@@ -78,6 +91,8 @@ class Bot(db.Model):
         last_run_time (datetime): The timestamp of the bot's last run.
         last_run_status (str): The status of the bot's last run, can be 'SUCCESS' or 'FAILURE'.
         run_count (int): The total number of times the bot has run.
+        deferred_analysis (bool): Whether accepted articles are analyzed through the OpenAI
+            Batch API (cheaper, completed within hours) instead of one request per article.
     """
     __tablename__ = 'bot'
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
@@ -94,6 +109,7 @@ class Bot(db.Model):
     last_run_time = db.Column(db.DateTime)
     last_run_status = db.Column(Enum('SUCCESS', 'FAILURE', name='run_status'))
     run_count = db.Column(db.Integer, default=0)
+    deferred_analysis = db.Column(db.Boolean, nullable=False, default=False, server_default='false')
     
     # relationships
     category_id = db.Column(db.Integer, db.ForeignKey('category.id'))
@@ -184,6 +200,43 @@ class Blacklist(db.Model):
         return {column.name: getattr(self, column.name) for column in self.__table__.columns}
 
 
+class UrlFilterRule(db.Model):
+    """A URL filter rule applied to resolved article links before they are fetched.
+
+    Rules without bot_id and category_id apply to every bot; otherwise they apply to one
+    bot or to every bot of a category. They add to the built-in defaults of the URL
+    filter engine, and 'allow' rules override 'block' rules.
+
+    Attributes:
+        id (int): The unique identifier for the rule.
+        rule_type (str): 'host' (domain and its subdomains) or 'path' (whole path segments, e.g. 'tag' or 'news/sponsored').
+        value (str): Domain or path segments to match.
+        action (str): 'block' or 'allow'.
+        bot_id (int): Foreign key referencing the bot the rule applies to, if any.
+        category_id (int): Foreign key referencing the category the rule applies to, if any.
+        created_at (datetime): The timestamp when the rule was created.
+        updated_at (datetime): The timestamp when the rule was last updated.
+    """
+    __tablename__ = 'url_filter_rule'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    rule_type = db.Column(db.String(16), nullable=False)
+    value = db.Column(db.String, nullable=False)
+    action = db.Column(db.String(16), nullable=False, default='block')
+    bot_id = db.Column(db.Integer, db.ForeignKey('bot.id', ondelete='CASCADE'))
+    category_id = db.Column(db.Integer, db.ForeignKey('category.id', ondelete='CASCADE'))
+    created_at = db.Column(db.TIMESTAMP, default=datetime.now)
+    updated_at = db.Column(db.TIMESTAMP, default=datetime.now, onupdate=datetime.now)
+
+    __table_args__ = (
+        db.Index('ix_url_filter_rule_bot_id', 'bot_id'),
+        db.Index('ix_url_filter_rule_category_id', 'category_id'),
+    )
+
+    def as_dict(self):
+        return {column.name: getattr(self, column.name) for column in self.__table__.columns}
+
+
 class Article(db.Model):
     """Represents an article in the database.
 
@@ -201,13 +254,19 @@ class Article(db.Model):
         bot_id (int): Foreign key referencing the bot that created the article.
         created_at (datetime): Timestamp when the article was created.
         updated_at (datetime): Timestamp when the article was last updated.
+        search_vector (tsvector): Full-text search document generated by Postgres from
+            the title (weight A) and content (weight B). Backed by a GIN index.
+        content_simhash (int): 64-bit SimHash fingerprint of the source article the content
+            was written from, used to detect near-duplicate incoming articles without
+            embedding calls. NULL for articles without a source text (e.g. created manually).
     """
     __tablename__ = 'article'
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     title = db.Column(db.String)
-    content = db.Column(db.String)
+    # Large bodies are deferred: list endpoints load them only when explicitly requested
+    content = db.deferred(db.Column(db.String))
     image = db.Column(db.String)
-    analysis = db.Column(db.String)
+    analysis = db.deferred(db.Column(db.String))
     url = db.Column(db.String)
     date = db.Column(db.TIMESTAMP)
     used_keywords = db.Column(db.String)
@@ -216,15 +275,39 @@ class Article(db.Model):
     
     # relationships
     bot_id = db.Column(db.Integer, db.ForeignKey('bot.id'))
-    timeframes = db.relationship('ArticleTimeframe', back_populates='article', cascade="all, delete-orphan")
+    # Eager-loaded with one batched IN query per result set, so as_dict() never triggers N+1 queries
+    timeframes = db.relationship('ArticleTimeframe', back_populates='article', cascade="all, delete-orphan",
+                                 lazy='selectin')
 
     created_at = db.Column(db.TIMESTAMP)
     updated_at = db.Column(db.TIMESTAMP)
 
+    search_vector = db.deferred(db.Column(TSVECTOR, db.Computed(SEARCH_VECTOR_EXPRESSION, persisted=True)))
+    content_simhash = db.Column(db.BigInteger)
 
-    def as_dict(self):
-        article_dict = {column.name: getattr(self, column.name) for column in self.__table__.columns}
-        article_dict['timeframes'] = [tf.as_dict() for tf in self.timeframes]
+    __table_args__ = (
+        db.Index('ix_article_search_vector', 'search_vector', postgresql_using='gin'),
+        db.Index('ix_article_created_at_id', 'created_at', 'id'),
+        db.Index('ix_article_bot_id_id', 'bot_id', 'id'),
+    )
+
+    # Truncated content, populated only when a query loads it with `with_expression`
+    snippet = db.query_expression()
+
+    def as_dict(self, fields=None):
+        """
+        Returns a dictionary representation of the article.
+
+        Args:
+            fields (list, optional): Subset of fields to include. Defaults to every column
+                plus 'timeframes'. May include 'snippet' when the query loaded it.
+        """
+        if fields is None:
+            fields = [column.name for column in self.__table__.columns
+                      if column.name not in INTERNAL_COLUMNS] + ['timeframes']
+        article_dict = {field: getattr(self, field) for field in fields if field != 'timeframes'}
+        if 'timeframes' in fields:
+            article_dict['timeframes'] = [tf.as_dict() for tf in self.timeframes]
         return article_dict
 
 
@@ -260,11 +343,13 @@ class UnwantedArticle(db.Model):
         bot_id (int): Foreign key referencing the bot that flagged the article.
         created_at (datetime): Timestamp when the unwanted article was created.
         updated_at (datetime): Timestamp when the unwanted article was last updated.
+        search_vector (tsvector): Full-text search document generated by Postgres from
+            the title (weight A) and content (weight B). Backed by a GIN index.
     """
     __tablename__ = 'unwanted_article'
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     title = db.Column(db.String)
-    content = db.Column(db.String)
+    content = db.deferred(db.Column(db.String))
     reason = db.Column(db.String)
     url = db.Column(db.String)
     date = db.Column(db.TIMESTAMP)
@@ -273,8 +358,27 @@ class UnwantedArticle(db.Model):
     created_at = db.Column(db.TIMESTAMP)
     updated_at = db.Column(db.TIMESTAMP)
 
-    def as_dict(self):
-        return {column.name: getattr(self, column.name) for column in self.__table__.columns}
+    search_vector = db.deferred(db.Column(TSVECTOR, db.Computed(SEARCH_VECTOR_EXPRESSION, persisted=True)))
+
+    __table_args__ = (
+        db.Index('ix_unwanted_article_search_vector', 'search_vector', postgresql_using='gin'),
+        db.Index('ix_unwanted_article_created_at_id', 'created_at', 'id'),
+    )
+
+    # Truncated content, populated only when a query loads it with `with_expression`
+    snippet = db.query_expression()
+
+    def as_dict(self, fields=None):
+        """
+        Returns a dictionary representation of the unwanted article.
+
+        Args:
+            fields (list, optional): Subset of fields to include. Defaults to every column.
+                May include 'snippet' when the query loaded it.
+        """
+        if fields is None:
+            fields = [column.name for column in self.__table__.columns if column.name not in INTERNAL_COLUMNS]
+        return {field: getattr(self, field) for field in fields}
     
 
 class UsedKeywords(db.Model):
@@ -307,6 +411,227 @@ class UsedKeywords(db.Model):
         return {column.name: getattr(self, column.name) for column in self.__table__.columns}
 
 
+def split_keywords(keywords):
+    """Split a comma-joined UsedKeywords.keywords string into trimmed, non-empty keywords."""
+    return [keyword.strip() for keyword in (keywords or '').split(',') if keyword.strip()]
+
+
+class KeywordDailyCount(db.Model):
+    """Per-day rollup of keyword usage, maintained whenever UsedKeywords rows are added or removed.
+
+    Trending queries sum these pre-aggregated counts over a day range instead of
+    splitting every UsedKeywords row.
+
+    Attributes:
+        day (date): Day of the article date the keywords were used on.
+        bot_id (int): Foreign key referencing the bot that used the keywords.
+        keyword (str): A single keyword.
+        count (int): Number of articles that used the keyword that day.
+    """
+    __tablename__ = 'keyword_daily_count'
+
+    day = db.Column(db.Date, primary_key=True)
+    bot_id = db.Column(db.Integer, db.ForeignKey('bot.id', ondelete='CASCADE'), primary_key=True)
+    keyword = db.Column(db.String, primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.Index('ix_keyword_daily_count_bot_id_day', 'bot_id', 'day'),
+    )
+
+    @classmethod
+    def record(cls, session, bot_id, keywords, day, delta=1):
+        """
+        Add `delta` to the count of each keyword for a bot and day with a single upsert.
+
+        Args:
+            session: Session the caller commits
+            bot_id (int): Bot that used the keywords
+            keywords (list): Keywords to count
+            day (date): Day to count them on
+            delta (int): 1 when keywords are recorded, -1 when their article is deleted
+        """
+        keywords = list(dict.fromkeys(keywords))
+        if not keywords or bot_id is None:
+            return
+        statement = postgresql_insert(cls).values([
+            {'day': day, 'bot_id': bot_id, 'keyword': keyword, 'count': delta}
+            for keyword in keywords
+        ])
+        statement = statement.on_conflict_do_update(
+            index_elements=[cls.day, cls.bot_id, cls.keyword],
+            set_={'count': cls.count + statement.excluded.count}
+        )
+        session.execute(statement)
+
+    def as_dict(self):
+        return {column.name: getattr(self, column.name) for column in self.__table__.columns}
+
+
+class PendingAnalysis(db.Model):
+    """An accepted article waiting for its analysis from an OpenAI batch (bots with deferred_analysis).
+
+    Rows move from 'queued' to 'submitted' (with the batch_id) to 'completed' once the
+    batch output is downloaded, and to 'published' when the article has been saved.
+    Failed requests are retried until they reach the attempt limit and become 'failed'.
+    A completed row whose publishing fails (image, upload or save) stays 'completed' and
+    is published again on later cycles until it reaches the publish attempt limit.
+
+    Attributes:
+        id (int): The unique identifier; also the batch request's custom_id.
+        bot_id (int): Foreign key referencing the bot that accepted the article.
+        title (str): Original article title.
+        content (str): Original article content sent for analysis.
+        url (str): Resolved article URL.
+        date (datetime): Publication date of the article.
+        used_keywords (str): Comma-joined keywords that matched.
+        status (str): 'queued', 'submitted', 'completed', 'published' or 'failed'.
+        batch_id (str): OpenAI batch the request was submitted in.
+        attempts (int): Number of batches the request was submitted in.
+        publish_attempts (int): Number of failed attempts to publish the completed analysis.
+        new_title (str): Generated title, once completed.
+        new_content (str): Generated content, once completed.
+        error (str): Last error for the request.
+        token_usage (JSON): Token counts reported for the completed request.
+        article_id (int): Foreign key referencing the saved article, once published.
+        created_at (datetime): Timestamp when the article was queued.
+        updated_at (datetime): Timestamp of the last status change.
+    """
+    __tablename__ = 'pending_analysis'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    bot_id = db.Column(db.Integer, db.ForeignKey('bot.id', ondelete='CASCADE'), nullable=False)
+    title = db.Column(db.String)
+    content = db.Column(db.Text, nullable=False)
+    url = db.Column(db.String, nullable=False)
+    date = db.Column(db.TIMESTAMP)
+    used_keywords = db.Column(db.String)
+    status = db.Column(db.String(16), nullable=False, default='queued')
+    batch_id = db.Column(db.String)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    publish_attempts = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    new_title = db.Column(db.String)
+    new_content = db.Column(db.Text)
+    error = db.Column(db.String)
+    token_usage = db.Column(db.JSON)
+    article_id = db.Column(db.Integer, db.ForeignKey('article.id', ondelete='SET NULL'))
+    created_at = db.Column(db.TIMESTAMP, default=datetime.now)
+    updated_at = db.Column(db.TIMESTAMP, default=datetime.now, onupdate=datetime.now)
+
+    __table_args__ = (
+        db.Index('ix_pending_analysis_status_batch_id', 'status', 'batch_id'),
+        db.Index('ix_pending_analysis_bot_id_url', 'bot_id', 'url'),
+    )
+
+    def as_dict(self):
+        return {column.name: getattr(self, column.name) for column in self.__table__.columns}
+
+
+class PipelineCheckpoint(db.Model):
+    """Progress of one feed item through the news pipeline, so a later run can resume it.
+
+    Stages are recorded in order: 'resolved', 'extracted', 'analyzed', 'imaged',
+    'uploaded', 'saved', 'notified'. Each stage stores what the following ones need, so
+    a run that resumes the item skips every completed stage (and its LLM, DALL-E or S3
+    calls). Status is 'active' while the item can be resumed, then 'done', 'rejected'
+    (filtered out after resolution), 'deferred' (queued for batch analysis) or
+    'abandoned' (failed too many times).
+
+    Attributes:
+        id (int): The unique identifier for the checkpoint.
+        bot_id (int): Foreign key referencing the bot processing the item.
+        item_key (str): Feed link of the item.
+        stage (str): Last completed stage.
+        status (str): 'active', 'done', 'rejected', 'deferred' or 'abandoned'.
+        url (str): Resolved article URL.
+        title (str): Original article title.
+        content (str): Extracted article content.
+        date (datetime): Publication date of the article.
+        used_keywords (str): Comma-joined keywords that matched.
+        new_title (str): Generated title.
+        new_content (str): Generated content.
+        image_url (str): Generated or uploaded image URL.
+        article_id (int): Foreign key referencing the saved article.
+        attempts (int): Number of failed attempts.
+        error (str): Last error for the item.
+        created_at (datetime): Timestamp when the item was resolved.
+        updated_at (datetime): Timestamp of the last stage or failure.
+    """
+    __tablename__ = 'pipeline_checkpoint'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    bot_id = db.Column(db.Integer, db.ForeignKey('bot.id', ondelete='CASCADE'), nullable=False)
+    item_key = db.Column(db.String, nullable=False)
+    stage = db.Column(db.String(16), nullable=False)
+    status = db.Column(db.String(16), nullable=False, default='active')
+    url = db.Column(db.String)
+    title = db.Column(db.String)
+    content = db.Column(db.Text)
+    date = db.Column(db.TIMESTAMP)
+    used_keywords = db.Column(db.String)
+    new_title = db.Column(db.String)
+    new_content = db.Column(db.Text)
+    image_url = db.Column(db.String)
+    article_id = db.Column(db.Integer, db.ForeignKey('article.id', ondelete='SET NULL'))
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.String)
+    created_at = db.Column(db.TIMESTAMP, default=datetime.now)
+    updated_at = db.Column(db.TIMESTAMP, default=datetime.now, onupdate=datetime.now)
+
+    __table_args__ = (
+        db.UniqueConstraint('bot_id', 'item_key', name='uq_pipeline_checkpoint_bot_id_item_key'),
+        db.Index('ix_pipeline_checkpoint_bot_id_status_updated_at', 'bot_id', 'status', 'updated_at'),
+    )
+
+    def as_dict(self):
+        return {column.name: getattr(self, column.name) for column in self.__table__.columns}
+
+
+class SlackOutbox(db.Model):
+    """A Slack message to post, or a message to delete, waiting for the background notifier.
+
+    Rows are written before anything is sent, so a restart does not lose queued
+    notifications; the notifier drains them per channel at Slack's rate limits and retries
+    failures with backoff. Status is 'pending' until picked up, 'sending' while in flight,
+    then 'sent' or 'failed' (permanent error or too many attempts).
+
+    Attributes:
+        id (int): The unique identifier for the row.
+        kind (str): 'post' or 'delete'.
+        channel_id (str): Slack channel ID.
+        text (str): Fallback text of a posted message.
+        blocks (list): Block Kit blocks of a posted message.
+        ts (str): Timestamp of the message, once posted, or of the message to delete.
+        status (str): 'pending', 'sending', 'sent' or 'failed'.
+        attempts (int): Number of failed attempts.
+        next_attempt_at (datetime): Earliest time of the next attempt.
+        error (str): Last error.
+        created_at (datetime): Timestamp when the row was queued.
+        updated_at (datetime): Timestamp of the last attempt.
+    """
+    __tablename__ = 'slack_outbox'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    kind = db.Column(db.String(16), nullable=False, default='post')
+    channel_id = db.Column(db.String, nullable=False)
+    text = db.Column(db.Text)
+    blocks = db.Column(db.JSON)
+    ts = db.Column(db.String)
+    status = db.Column(db.String(16), nullable=False, default='pending')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.TIMESTAMP, default=datetime.now)
+    error = db.Column(db.String)
+    created_at = db.Column(db.TIMESTAMP, default=datetime.now)
+    updated_at = db.Column(db.TIMESTAMP, default=datetime.now, onupdate=datetime.now)
+
+    __table_args__ = (
+        db.Index('ix_slack_outbox_status_next_attempt_at', 'status', 'next_attempt_at'),
+    )
+
+    def as_dict(self):
+        return {column.name: getattr(self, column.name) for column in self.__table__.columns}
+
+
 class Metrics(db.Model):
     """
     Represents metrics for a bot's performance and activity.
@@ -326,6 +651,8 @@ class Metrics(db.Model):
         error_reasons (JSON): JSON object containing reasons for errors encountered.
         total_filtered (int): Total number of articles filtered out during processing.
         filter_reasons (JSON): JSON object containing reasons for articles being filtered out.
+        token_usage (JSON): OpenAI token totals of the run's analysis calls (calls, prompt_tokens,
+            completion_tokens, cached_tokens, truncated_inputs).
 
     Methods:
         as_dict(): Converts the metrics object into a dictionary for easy serialization.
@@ -346,10 +673,15 @@ class Metrics(db.Model):
     error_reasons = db.Column(db.JSON)
     total_filtered = db.Column(db.Integer, default=0)
     filter_reasons = db.Column(db.JSON)
+    token_usage = db.Column(db.JSON)
 
     # Define the relationship with the Bot model
     bot = db.relationship('Bot', back_populates='metrics')
 
+    __table_args__ = (
+        db.Index('ix_metrics_bot_id_start_time_id', 'bot_id', 'start_time', 'id'),
+    )
+
     def as_dict(self):
         """
         Converts the metrics object into a dictionary for easy serialization.
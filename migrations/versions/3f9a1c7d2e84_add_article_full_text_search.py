@@ -0,0 +1,70 @@
+"""Add full-text search vectors and GIN indexes to article and unwanted_article
+
+Revision ID: 3f9a1c7d2e84
+Revises: b7cad0349b4c
+Create Date: 2026-10-19 10:12:31.418220
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+# revision identifiers, used by Alembic.
+revision = '3f9a1c7d2e84'
+down_revision = 'b7cad0349b4c'
+branch_labels = None
+depends_on = None
+
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(content, '')), 'B')"
+)
+
+SEARCHABLE_TABLES = {
+    'article': 'ix_article_search_vector',
+    'unwanted_article': 'ix_unwanted_article_search_vector',
+}
+
+
+def column_exists(table, column):
+    inspector = sa.inspect(op.get_bind())
+    return any(c["name"] == column for c in inspector.get_columns(table))
+
+
+def upgrade():
+    # Stored generated column: Postgres maintains it on every insert/update.
+    # Adding it rewrites the table once, so run this in a maintenance window on large tables.
+    for table in SEARCHABLE_TABLES:
+        if not column_exists(table, 'search_vector'):
+            op.add_column(table, sa.Column(
+                'search_vector',
+                TSVECTOR(),
+                sa.Computed(SEARCH_VECTOR_EXPRESSION, persisted=True)
+            ))
+
+    # Build the GIN indexes without locking writes on the tables
+    with op.get_context().autocommit_block():
+        for table, index_name in SEARCHABLE_TABLES.items():
+            op.create_index(
+                index_name,
+                table,
+                ['search_vector'],
+                postgresql_using='gin',
+                postgresql_concurrently=True,
+                if_not_exists=True
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for table, index_name in SEARCHABLE_TABLES.items():
+            op.drop_index(
+                index_name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True
+            )
+
+    for table in SEARCHABLE_TABLES:
+        if column_exists(table, 'search_vector'):
+            op.drop_column(table, 'search_vector')
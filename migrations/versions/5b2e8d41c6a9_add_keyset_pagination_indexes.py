@@ -0,0 +1,44 @@
+"""Add composite indexes backing keyset pagination
+
+Revision ID: 5b2e8d41c6a9
+Revises: 3f9a1c7d2e84
+Create Date: 2026-10-19 11:02:47.905316
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '5b2e8d41c6a9'
+down_revision = '3f9a1c7d2e84'
+branch_labels = None
+depends_on = None
+
+KEYSET_INDEXES = [
+    ('ix_article_created_at_id', 'article', ['created_at', 'id']),
+    ('ix_unwanted_article_created_at_id', 'unwanted_article', ['created_at', 'id']),
+    ('ix_metrics_bot_id_start_time_id', 'metrics', ['bot_id', 'start_time', 'id']),
+]
+
+
+def upgrade():
+    # Build the indexes without blocking writes from running bots
+    with op.get_context().autocommit_block():
+        for index_name, table, columns in KEYSET_INDEXES:
+            op.create_index(
+                index_name,
+                table,
+                columns,
+                postgresql_concurrently=True,
+                if_not_exists=True
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for index_name, table, _ in KEYSET_INDEXES:
+            op.drop_index(
+                index_name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True
+            )
@@ -0,0 +1,45 @@
+"""Add keyword_daily_count rollup for trending keywords and backfill it from used_keywords
+
+Revision ID: 9d4e7a2b1c63
+Revises: 5b2e8d41c6a9
+Create Date: 2026-10-19 12:20:14.530871
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '9d4e7a2b1c63'
+down_revision = '5b2e8d41c6a9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'keyword_daily_count',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('bot_id', sa.Integer(), nullable=False),
+        sa.Column('keyword', sa.String(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False, server_default='0'),
+        sa.ForeignKeyConstraint(['bot_id'], ['bot.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('day', 'bot_id', 'keyword')
+    )
+    op.create_index('ix_keyword_daily_count_bot_id_day', 'keyword_daily_count', ['bot_id', 'day'])
+
+    # One row per (day, bot, keyword), counting each article once per keyword
+    op.execute("""
+        INSERT INTO keyword_daily_count (day, bot_id, keyword, count)
+        SELECT uk.article_date::date, uk.bot_id, trim(k.keyword), count(DISTINCT uk.id)
+        FROM used_keywords uk
+        CROSS JOIN LATERAL unnest(string_to_array(uk.keywords, ',')) AS k(keyword)
+        WHERE uk.bot_id IS NOT NULL
+          AND uk.article_date IS NOT NULL
+          AND trim(k.keyword) <> ''
+        GROUP BY 1, 2, 3
+    """)
+
+
+def downgrade():
+    op.drop_index('ix_keyword_daily_count_bot_id_day', table_name='keyword_daily_count')
+    op.drop_table('keyword_daily_count')
@@ -0,0 +1,25 @@
+"""Add token_usage to metrics and pending_analysis
+
+Revision ID: a6d3f1e8b027
+Revises: c83f5a0d7e12
+Create Date: 2026-10-19 15:02:41.118305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'a6d3f1e8b027'
+down_revision = 'c83f5a0d7e12'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('metrics', sa.Column('token_usage', sa.JSON(), nullable=True))
+    op.add_column('pending_analysis', sa.Column('token_usage', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('pending_analysis', 'token_usage')
+    op.drop_column('metrics', 'token_usage')
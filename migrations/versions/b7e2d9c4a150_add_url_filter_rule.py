@@ -0,0 +1,40 @@
+"""Add the url_filter_rule table for configurable URL filter rules
+
+Revision ID: b7e2d9c4a150
+Revises: d5a8c2e6f419
+Create Date: 2026-10-19 17:05:12.318406
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'b7e2d9c4a150'
+down_revision = 'd5a8c2e6f419'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'url_filter_rule',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('rule_type', sa.String(length=16), nullable=False),
+        sa.Column('value', sa.String(), nullable=False),
+        sa.Column('action', sa.String(length=16), nullable=False),
+        sa.Column('bot_id', sa.Integer(), nullable=True),
+        sa.Column('category_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.TIMESTAMP(), nullable=True),
+        sa.Column('updated_at', sa.TIMESTAMP(), nullable=True),
+        sa.ForeignKeyConstraint(['bot_id'], ['bot.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['category_id'], ['category.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_url_filter_rule_bot_id', 'url_filter_rule', ['bot_id'])
+    op.create_index('ix_url_filter_rule_category_id', 'url_filter_rule', ['category_id'])
+
+
+def downgrade():
+    op.drop_index('ix_url_filter_rule_category_id', table_name='url_filter_rule')
+    op.drop_index('ix_url_filter_rule_bot_id', table_name='url_filter_rule')
+    op.drop_table('url_filter_rule')
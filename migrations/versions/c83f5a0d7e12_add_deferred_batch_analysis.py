@@ -0,0 +1,51 @@
+"""Add bot.deferred_analysis and the pending_analysis queue for OpenAI batch analysis
+
+Revision ID: c83f5a0d7e12
+Revises: e41b7c9a3d25
+Create Date: 2026-10-19 14:10:05.402917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'c83f5a0d7e12'
+down_revision = 'e41b7c9a3d25'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('bot', sa.Column('deferred_analysis', sa.Boolean(), nullable=False, server_default='false'))
+
+    op.create_table(
+        'pending_analysis',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('bot_id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(), nullable=True),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('url', sa.String(), nullable=False),
+        sa.Column('date', sa.TIMESTAMP(), nullable=True),
+        sa.Column('used_keywords', sa.String(), nullable=True),
+        sa.Column('status', sa.String(length=16), nullable=False),
+        sa.Column('batch_id', sa.String(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('new_title', sa.String(), nullable=True),
+        sa.Column('new_content', sa.Text(), nullable=True),
+        sa.Column('error', sa.String(), nullable=True),
+        sa.Column('article_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.TIMESTAMP(), nullable=True),
+        sa.Column('updated_at', sa.TIMESTAMP(), nullable=True),
+        sa.ForeignKeyConstraint(['bot_id'], ['bot.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['article_id'], ['article.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_pending_analysis_status_batch_id', 'pending_analysis', ['status', 'batch_id'])
+    op.create_index('ix_pending_analysis_bot_id_url', 'pending_analysis', ['bot_id', 'url'])
+
+
+def downgrade():
+    op.drop_index('ix_pending_analysis_bot_id_url', table_name='pending_analysis')
+    op.drop_index('ix_pending_analysis_status_batch_id', table_name='pending_analysis')
+    op.drop_table('pending_analysis')
+    op.drop_column('bot', 'deferred_analysis')
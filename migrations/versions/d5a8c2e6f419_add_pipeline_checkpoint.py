@@ -0,0 +1,50 @@
+"""Add the pipeline_checkpoint table for resumable per-item pipeline stages
+
+Revision ID: d5a8c2e6f419
+Revises: a6d3f1e8b027
+Create Date: 2026-10-19 16:20:37.540112
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'd5a8c2e6f419'
+down_revision = 'a6d3f1e8b027'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'pipeline_checkpoint',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('bot_id', sa.Integer(), nullable=False),
+        sa.Column('item_key', sa.String(), nullable=False),
+        sa.Column('stage', sa.String(length=16), nullable=False),
+        sa.Column('status', sa.String(length=16), nullable=False),
+        sa.Column('url', sa.String(), nullable=True),
+        sa.Column('title', sa.String(), nullable=True),
+        sa.Column('content', sa.Text(), nullable=True),
+        sa.Column('date', sa.TIMESTAMP(), nullable=True),
+        sa.Column('used_keywords', sa.String(), nullable=True),
+        sa.Column('new_title', sa.String(), nullable=True),
+        sa.Column('new_content', sa.Text(), nullable=True),
+        sa.Column('image_url', sa.String(), nullable=True),
+        sa.Column('article_id', sa.Integer(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('error', sa.String(), nullable=True),
+        sa.Column('created_at', sa.TIMESTAMP(), nullable=True),
+        sa.Column('updated_at', sa.TIMESTAMP(), nullable=True),
+        sa.ForeignKeyConstraint(['bot_id'], ['bot.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['article_id'], ['article.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('bot_id', 'item_key', name='uq_pipeline_checkpoint_bot_id_item_key')
+    )
+    op.create_index('ix_pipeline_checkpoint_bot_id_status_updated_at', 'pipeline_checkpoint',
+                    ['bot_id', 'status', 'updated_at'])
+
+
+def downgrade():
+    op.drop_index('ix_pipeline_checkpoint_bot_id_status_updated_at', table_name='pipeline_checkpoint')
+    op.drop_table('pipeline_checkpoint')
@@ -0,0 +1,50 @@
+"""Add content_simhash fingerprint to article for the near-duplicate pre-filter
+
+Revision ID: e41b7c9a3d25
+Revises: 9d4e7a2b1c63
+Create Date: 2026-10-19 13:05:42.118306
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'e41b7c9a3d25'
+down_revision = '9d4e7a2b1c63'
+branch_labels = None
+depends_on = None
+
+
+def column_exists(table, column):
+    inspector = sa.inspect(op.get_bind())
+    return any(c["name"] == column for c in inspector.get_columns(table))
+
+
+def upgrade():
+    # Nullable, no default: a metadata-only change. Existing rows keep NULL and are
+    # compared with embeddings until they age out of the similarity window.
+    if not column_exists('article', 'content_simhash'):
+        op.add_column('article', sa.Column('content_simhash', sa.BigInteger(), nullable=True))
+
+    # Serves the incremental "new articles for this bot since id N" index refresh
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_article_bot_id_id',
+            'article',
+            ['bot_id', 'id'],
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_article_bot_id_id',
+            table_name='article',
+            postgresql_concurrently=True,
+            if_exists=True
+        )
+
+    if column_exists('article', 'content_simhash'):
+        op.drop_column('article', 'content_simhash')
@@ -0,0 +1,40 @@
+"""Add the slack_outbox table for queued Slack notifications
+
+Revision ID: e9c4f1a2b386
+Revises: b7e2d9c4a150
+Create Date: 2026-10-19 18:02:44.901573
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'e9c4f1a2b386'
+down_revision = 'b7e2d9c4a150'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'slack_outbox',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('kind', sa.String(length=16), nullable=False),
+        sa.Column('channel_id', sa.String(), nullable=False),
+        sa.Column('text', sa.Text(), nullable=True),
+        sa.Column('blocks', sa.JSON(), nullable=True),
+        sa.Column('ts', sa.String(), nullable=True),
+        sa.Column('status', sa.String(length=16), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('next_attempt_at', sa.TIMESTAMP(), nullable=True),
+        sa.Column('error', sa.String(), nullable=True),
+        sa.Column('created_at', sa.TIMESTAMP(), nullable=True),
+        sa.Column('updated_at', sa.TIMESTAMP(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_slack_outbox_status_next_attempt_at', 'slack_outbox', ['status', 'next_attempt_at'])
+
+
+def downgrade():
+    op.drop_index('ix_slack_outbox_status_next_attempt_at', table_name='slack_outbox')
+    op.drop_table('slack_outbox')
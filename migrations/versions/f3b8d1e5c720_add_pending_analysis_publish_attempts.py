@@ -0,0 +1,23 @@
+"""Add publish_attempts to pending_analysis so failed publishing is retried
+
+Revision ID: f3b8d1e5c720
+Revises: e9c4f1a2b386
+Create Date: 2026-10-19 19:10:27.604218
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'f3b8d1e5c720'
+down_revision = 'e9c4f1a2b386'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('pending_analysis', sa.Column('publish_attempts', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    op.drop_column('pending_analysis', 'publish_attempts')
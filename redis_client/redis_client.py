@@ -1,41 +1,469 @@
+from collections import OrderedDict
 from functools import wraps
+from threading import Lock
+import math
+import time
+import uuid
+import zlib
 import json
-from flask import Response, jsonify, request
+import random
+from flask import Response, jsonify, request, make_response
 import redis
 import os
 
+try:
+    import zstandard
+except ImportError:  # zlib is used when zstandard is not installed
+    zstandard = None
+
 REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
 REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
 REDIS_DB = int(os.getenv("REDIS_DB", 0))
 REDIS_PASSWORD = os.getenv("REDIS_PASSWORD")  # Elimine el valor predeterminado
 
+# Pool size per process and the longest a request may wait for a free connection
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", 50))
+REDIS_POOL_TIMEOUT = float(os.getenv("REDIS_POOL_TIMEOUT", 0.5))
+# Fail fast instead of letting a slow Redis slow down every cached endpoint
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", 0.5))
+REDIS_CONNECT_TIMEOUT = float(os.getenv("REDIS_CONNECT_TIMEOUT", 1.0))
+# Consecutive failures that open the circuit, and seconds before Redis is tried again
+REDIS_BREAKER_THRESHOLD = int(os.getenv("REDIS_BREAKER_THRESHOLD", 5))
+REDIS_BREAKER_RESET_SECONDS = float(os.getenv("REDIS_BREAKER_RESET_SECONDS", 30))
+
 # Cree un diccionario de configuración
 redis_config = {
     "host": REDIS_HOST,
     "port": REDIS_PORT,
     "db": REDIS_DB,
-    "decode_responses": True
+    "socket_timeout": REDIS_SOCKET_TIMEOUT,
+    "socket_connect_timeout": REDIS_CONNECT_TIMEOUT,
+    "health_check_interval": 30
 }
 
 # Añada la contraseña solo si está configurada
 if REDIS_PASSWORD:
     redis_config["password"] = REDIS_PASSWORD
 
-redis_client = redis.Redis(**redis_config)
+_clients = {}
+_clients_lock = Lock()
+_stats_lock = Lock()
 
-try:
-    if redis_client.ping():
-        print("Successfully connected to Redis")
-    else:
-        print("Failed to connect to Redis")
-except redis.exceptions.AuthenticationError:
-    print("Redis authentication failed. Make sure the password is correct or not required.")
-except Exception as e:
-    print(f"Error connecting to redis client: {str(e)}")
-    
-    
-
-def cache_with_redis(expiration=300):
+
+def get_redis_client(decode_responses=True):
+    """
+    Return the shared pooled Redis client, creating it on first use.
+
+    Nothing connects at import time; connections are opened on demand from a
+    bounded pool. Cached responses are stored as pre-encoded bytes, so the cache
+    uses the client that does not decode replies (`decode_responses=False`).
+    """
+    client = _clients.get(decode_responses)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(decode_responses)
+            if client is None:
+                pool = redis.BlockingConnectionPool(
+                    max_connections=REDIS_MAX_CONNECTIONS,
+                    timeout=REDIS_POOL_TIMEOUT,
+                    decode_responses=decode_responses,
+                    **redis_config
+                )
+                client = redis.Redis(connection_pool=pool)
+                _clients[decode_responses] = client
+    return client
+
+
+def get_cache_client():
+    return get_redis_client(decode_responses=False)
+
+
+class CircuitBreaker:
+    """
+    Stops calling Redis after repeated failures.
+
+    After `failure_threshold` consecutive failures the circuit opens and callers skip
+    Redis for `reset_timeout` seconds. Then it is half-open: the next call is let
+    through, closing the circuit on success or reopening it on failure.
+    """
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = None
+        self.times_opened = 0
+        self._lock = Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+            return self.state != 'open'
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                if self.state != 'open':
+                    self.times_opened += 1
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self.failures,
+                'times_opened': self.times_opened
+            }
+
+
+redis_breaker = CircuitBreaker(REDIS_BREAKER_THRESHOLD, REDIS_BREAKER_RESET_SECONDS)
+
+_latency_stats = {
+    'calls': 0,
+    'errors': 0,
+    'total_ms': 0.0,
+    'max_ms': 0.0
+}
+
+
+def _redis(command, *args, **kwargs):
+    """Run one Redis call (or pipeline execute), recording its latency and outcome."""
+    started = time.perf_counter()
+    try:
+        result = command(*args, **kwargs)
+    except redis.exceptions.RedisError:
+        redis_breaker.record_failure()
+        with _stats_lock:
+            _latency_stats['errors'] += 1
+        raise
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    redis_breaker.record_success()
+    with _stats_lock:
+        _latency_stats['calls'] += 1
+        _latency_stats['total_ms'] += elapsed_ms
+        _latency_stats['max_ms'] = max(_latency_stats['max_ms'], elapsed_ms)
+    return result
+
+
+def _pool_stats(client):
+    pool = client.connection_pool
+    created = len(pool._connections)
+    idle = sum(1 for connection in list(pool.pool.queue) if connection is not None)
+    return {
+        'max_connections': pool.max_connections,
+        'created': created,
+        'in_use': created - idle
+    }
+
+
+# Tags are sorted sets of cache keys scored by the entry's expiry time
+TAG_PREFIX = "cache:ztag:"
+LOCK_PREFIX = "cache:lock:"
+INVALIDATION_CHANNEL = "cache:invalidate"
+TAG_TTL = 3600
+UNLINK_CHUNK_SIZE = 1000
+
+# Cached bodies at least this large are stored compressed in Redis
+COMPRESS_MIN_BYTES = int(os.getenv("CACHE_COMPRESS_MIN_BYTES", 1024))
+LOCAL_CACHE_MAX_ENTRIES = int(os.getenv("CACHE_LOCAL_MAX_ENTRIES", 512))
+
+_read_stats = {
+    'local': {
+        'hits': 0,
+        'misses': 0
+    },
+    'redis': {
+        'hits': 0,
+        'stale_hits': 0,
+        'misses': 0,
+        'early_recomputes': 0,
+        'lock_waits': 0,
+        'bypassed': 0,
+        'errors': 0
+    }
+}
+_invalidation_stats = {
+    'invalidations': 0,
+    'keys_unlinked': 0,
+    'total_ms': 0.0,
+    'last_ms': None,
+    'errors': 0
+}
+
+
+def _tag_key(tag):
+    return f"{TAG_PREFIX}{tag}"
+
+
+def get_cache_stats():
+    """Return a snapshot of the read, invalidation and connection counters for this process."""
+    with _stats_lock:
+        stats = dict(_invalidation_stats)
+        reads = {tier: dict(counters) for tier, counters in _read_stats.items()}
+    stats['avg_ms'] = round(stats['total_ms'] / stats['invalidations'], 3) if stats['invalidations'] else None
+    for counters in reads.values():
+        served = counters['hits'] + counters.get('stale_hits', 0)
+        lookups = served + counters['misses'] + counters.get('early_recomputes', 0)
+        counters['hit_ratio'] = round(served / lookups, 4) if lookups else None
+    reads['local']['entries'] = len(local_cache)
+
+    with _stats_lock:
+        latency = dict(_latency_stats)
+    total_ms = latency.pop('total_ms')
+    latency['avg_ms'] = round(total_ms / latency['calls'], 3) if latency['calls'] else None
+    latency['max_ms'] = round(latency['max_ms'], 3)
+    connection = {
+        'circuit': redis_breaker.as_dict(),
+        'latency': latency,
+        'pools': {
+            'cache' if not decode else 'default': _pool_stats(client)
+            for decode, client in list(_clients.items())
+        }
+    }
+    return {'reads': reads, 'invalidation': stats, 'connection': connection}
+
+
+def _count(tier, stat):
+    with _stats_lock:
+        _read_stats[tier][stat] += 1
+
+
+class LocalCache:
+    """
+    Thread-safe in-process LRU cache of encoded responses with per-entry expiry.
+
+    Entries keep the tags they were cached under so invalidation messages can evict
+    them without knowing their keys.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1], entry[2]
+
+    def set(self, key, status, body, tags, expires_at):
+        with self._lock:
+            self._entries[key] = (expires_at, status, body, frozenset(tags))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, tags):
+        tags = set(tags)
+        with self._lock:
+            for key in [k for k, entry in self._entries.items() if entry[3] & tags]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+local_cache = LocalCache(LOCAL_CACHE_MAX_ENTRIES)
+
+_subscriber = None
+_subscriber_lock = Lock()
+
+
+def _on_invalidation_message(message):
+    try:
+        local_cache.invalidate(json.loads(message['data']))
+    except (ValueError, TypeError):
+        local_cache.clear()
+
+
+def _on_subscriber_error(error, pubsub, thread):
+    """Invalidations may have been missed: drop the local tier and resubscribe on the next request."""
+    global _subscriber
+    print(f"Cache invalidation subscriber failed: {str(error)}")
+    local_cache.clear()
+    thread.stop()
+    with _subscriber_lock:
+        _subscriber = None
+
+
+def _ensure_subscriber():
+    """
+    Start this process' invalidation listener on first use.
+
+    Started lazily (not at import) so each worker process forked by gunicorn gets its
+    own thread. Returns False when Redis is unreachable, in which case the local tier
+    must not be used because it would miss invalidations.
+    """
+    global _subscriber
+    if _subscriber is not None:
+        return True
+    if not redis_breaker.allow():
+        return False
+    with _subscriber_lock:
+        if _subscriber is None:
+            try:
+                pubsub = get_cache_client().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(**{INVALIDATION_CHANNEL: _on_invalidation_message})
+                _subscriber = pubsub.run_in_thread(
+                    sleep_time=1.0, daemon=True, exception_handler=_on_subscriber_error
+                )
+            except redis.exceptions.RedisError as e:
+                print(f"Could not subscribe to cache invalidations: {str(e)}")
+                return False
+    return True
+
+
+def invalidate_cache_tags(tags):
+    """
+    Delete every cache entry registered under any of the given tags.
+
+    Tag sets are read (skipping members that already expired) and removed in one MULTI/EXEC round trip, so entries cached
+    after this point register in a fresh set. The collected keys are then removed
+    with pipelined UNLINK calls, which free memory in the background on the Redis side.
+
+    Args:
+        tags (list): Tag names (endpoint function names or domain tags such as 'article')
+
+    Returns:
+        int: Number of cache entries unlinked
+    """
+    if not tags:
+        return 0
+    local_cache.invalidate(tags)
+    started = time.perf_counter()
+    try:
+        if not redis_breaker.allow():
+            raise redis.exceptions.ConnectionError("Circuit open, Redis calls are suspended")
+        client = get_cache_client()
+        pipe = client.pipeline(transaction=True)
+        now = time.time()
+        for tag in tags:
+            pipe.zrangebyscore(_tag_key(tag), now, '+inf')
+            pipe.unlink(_tag_key(tag))
+        results = _redis(pipe.execute)
+
+        keys = set()
+        for members in results[::2]:
+            keys.update(members)
+        keys = list(keys)
+
+        pipe = client.pipeline(transaction=False)
+        for i in range(0, len(keys), UNLINK_CHUNK_SIZE):
+            pipe.unlink(*keys[i:i + UNLINK_CHUNK_SIZE])
+        # Evict the in-process tier of every worker, including this one
+        pipe.publish(INVALIDATION_CHANNEL, json.dumps(list(tags)))
+        _redis(pipe.execute)
+    except redis.exceptions.RedisError as e:
+        with _stats_lock:
+            _invalidation_stats['errors'] += 1
+        print(f"Error invalidating cache tags {tags}: {str(e)}")
+        return 0
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    with _stats_lock:
+        _invalidation_stats['invalidations'] += 1
+        _invalidation_stats['keys_unlinked'] += len(keys)
+        _invalidation_stats['total_ms'] += elapsed_ms
+        _invalidation_stats['last_ms'] = round(elapsed_ms, 3)
+    return len(keys)
+
+
+# Compare-and-delete, so a lock that expired and was taken by another worker is not released
+RELEASE_LOCK_SCRIPT = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+_release_lock_script = None
+
+
+def _release_lock(lock_key, token):
+    global _release_lock_script
+    if _release_lock_script is None:
+        _release_lock_script = get_cache_client().register_script(RELEASE_LOCK_SCRIPT)
+    try:
+        _redis(_release_lock_script, keys=[lock_key], args=[token])
+    except redis.exceptions.RedisError:
+        pass  # the lock expires on its own after lock_timeout
+
+
+def _compress(body):
+    """Return (encoding, data) for a body, compressing it when it is large enough."""
+    if len(body) < COMPRESS_MIN_BYTES:
+        return 'raw', body
+    if zstandard is not None:
+        return 'zstd', zstandard.compress(body, 3)
+    return 'zlib', zlib.compress(body, 6)
+
+
+def _decompress(encoding, data):
+    if encoding == 'zstd':
+        return zstandard.decompress(data)
+    if encoding == 'zlib':
+        return zlib.decompress(data)
+    return data
+
+
+def _encode_entry(status, body, compute_seconds, fresh_until):
+    """Pack a cached response as `<status> <compute time> <fresh until> <encoding>\\n<body bytes>`."""
+    encoding, data = _compress(body)
+    return f"{status} {compute_seconds:.4f} {fresh_until:.3f} {encoding}\n".encode() + data
+
+
+def _decode_entry(raw):
+    header, data = raw.split(b"\n", 1)
+    status, compute_seconds, fresh_until, *encoding = header.decode().split()
+    body = _decompress(encoding[0] if encoding else 'raw', data)
+    return int(status), float(compute_seconds), float(fresh_until), body
+
+
+def _read_entry(client, cache_key):
+    """
+    Fetch and decode a cached entry; None when there is none.
+
+    Entries that cannot be decoded (written in an older format, or corrupted) are
+    deleted and treated as a miss, so the view recomputes them instead of failing.
+    """
+    raw = _redis(client.get, cache_key)
+    if not raw:
+        return None
+    try:
+        return _decode_entry(raw)
+    except Exception as e:
+        print(f"Discarding undecodable cache entry {cache_key}: {str(e)}")
+        _redis(client.unlink, cache_key)
+        return None
+
+
+def _cached_response(body, status):
+    return Response(body, status=status, mimetype='application/json')
+
+
+def _should_recompute_early(compute_seconds, fresh_until, beta):
+    """
+    Probabilistic early expiration (XFetch): the closer an entry is to expiry, and the
+    more expensive it was to compute, the likelier a single reader refreshes it early,
+    so popular keys are rebuilt before they expire for everyone at once.
+    """
+    return time.time() - compute_seconds * beta * math.log(random.random() or 1e-12) >= fresh_until
+
+
+def cache_with_redis(expiration=300, tags=None, stale_ttl=60, lock_timeout=10, beta=1.0, local_ttl=0):
     """
     A decorator that caches the result of a function using Redis.
 
@@ -45,86 +473,190 @@ def cache_with_redis(expiration=300):
     of calling the function. Otherwise, the function is called, and its result is
     cached before being returned.
 
+    Responses are cached as the encoded JSON body and returned as is on a hit. To avoid
+    cache stampedes, only the request holding a short Redis lock recomputes an entry:
+    entries may be refreshed early (probabilistically, before they expire), and for
+    `stale_ttl` seconds after expiring they are served stale to every other request
+    while the lock holder recomputes. Requests that find no entry at all wait briefly
+    for the lock holder instead of all querying the database.
+
+    Every cached entry is registered in the tag set of the function name and of each
+    tag in `tags`, so `update_cache_with_redis` can invalidate it without scanning
+    the keyspace. Bodies of COMPRESS_MIN_BYTES or more are stored compressed.
+
+    With `local_ttl`, fresh responses are also kept in an in-process LRU tier for up
+    to that many seconds, skipping the Redis round trip. Invalidations reach every
+    process through Redis pub/sub; use it for hot endpoints whose data rarely changes.
+
+    When Redis is slow or down, calls time out quickly and, after repeated failures,
+    the circuit breaker skips Redis entirely: the view is called and served uncached.
+
     Args:
         expiration (int): The number of seconds the cached data should remain valid.
                           Defaults to 300 seconds (5 minutes).
+        tags (list): Extra domain tags for the cached entries, e.g. ['article'].
+        stale_ttl (int): Seconds an expired entry may still be served while it is recomputed.
+        lock_timeout (int): Seconds after which a recompute lock is considered abandoned.
+        beta (float): Early expiration aggressiveness; higher values refresh earlier.
+        local_ttl (int): Seconds to keep responses in the in-process tier (0 disables it).
 
     Returns:
         function: A decorated function that implements caching behavior.
 
     Usage:
         @app.route('/api/data')
-        @cache_with_redis(expiration=600)
+        @cache_with_redis(expiration=600, tags=['data'])
         def get_data():
             # Your data retrieval logic here
             return {'data': 'Some data'}
     """
     def decorator(func):
+        entry_tags = [func.__name__] + list(tags or [])
+
+        def call_view(*args, **kwargs):
+            try:
+                return make_response(func(*args, **kwargs))
+            except Exception as e:
+                # Handle the exception and return an error response
+                return make_response(jsonify({'error': str(e)}), 500)
+
+        def compute_and_store(client, cache_key, *args, **kwargs):
+            started = time.perf_counter()
+            response = call_view(*args, **kwargs)
+            compute_seconds = time.perf_counter() - started
+
+            # Server errors are not cached, so the next request retries
+            if response.status_code >= 500:
+                return response
+
+            body = response.get_data()
+            fresh_until = time.time() + expiration
+            entry = _encode_entry(response.status_code, body, compute_seconds, fresh_until)
+
+            # Cache the result and register it under its tags in one round trip.
+            # Members whose entry has expired are trimmed on every write, so a tag set
+            # holds only live keys however long its TTL keeps being extended.
+            now = time.time()
+            pipe = client.pipeline(transaction=False)
+            pipe.setex(cache_key, expiration + stale_ttl, entry)
+            for tag in entry_tags:
+                pipe.zremrangebyscore(_tag_key(tag), '-inf', now)
+                pipe.zadd(_tag_key(tag), {cache_key: now + expiration + stale_ttl})
+                pipe.expire(_tag_key(tag), max(expiration + stale_ttl, TAG_TTL))
+            try:
+                _redis(pipe.execute)
+            except redis.exceptions.RedisError as e:
+                print(f"Error caching {cache_key}: {str(e)}")
+                return _cached_response(body, response.status_code)
+
+            store_local(cache_key, response.status_code, body, fresh_until)
+            return _cached_response(body, response.status_code)
+
+        def store_local(cache_key, status, body, fresh_until):
+            if local_ttl and _ensure_subscriber():
+                local_cache.set(cache_key, status, body, entry_tags, min(time.time() + local_ttl, fresh_until))
+
+        def cached_call(cache_key, *args, **kwargs):
+            client = get_cache_client()
+            lock_key = f"{LOCK_PREFIX}{cache_key}"
+
+            # Try to get data from cache
+            cached = _read_entry(client, cache_key)
+            if cached:
+                status, compute_seconds, fresh_until, body = cached
+                is_stale = time.time() >= fresh_until
+                if not is_stale and not _should_recompute_early(compute_seconds, fresh_until, beta):
+                    _count('redis', 'hits')
+                    store_local(cache_key, status, body, fresh_until)
+                    return _cached_response(body, status)
+
+                token = uuid.uuid4().hex
+                if not _redis(client.set, lock_key, token, nx=True, ex=lock_timeout):
+                    # Another request is already recomputing this entry
+                    _count('redis', 'stale_hits')
+                    return _cached_response(body, status)
+
+                _count('redis', 'early_recomputes' if not is_stale else 'misses')
+                try:
+                    return compute_and_store(client, cache_key, *args, **kwargs)
+                finally:
+                    _release_lock(lock_key, token)
+
+            # No usable entry: let one request compute it while the others wait for it
+            token = uuid.uuid4().hex
+            if not _redis(client.set, lock_key, token, nx=True, ex=lock_timeout):
+                _count('redis', 'lock_waits')
+                deadline = time.monotonic() + lock_timeout
+                while time.monotonic() < deadline:
+                    time.sleep(0.05)
+                    cached = _read_entry(client, cache_key)
+                    if cached:
+                        status, _, _, body = cached
+                        return _cached_response(body, status)
+                    if not _redis(client.exists, lock_key):
+                        break
+                # The lock holder failed or timed out: compute without the lock
+                return compute_and_store(client, cache_key, *args, **kwargs)
+
+            _count('redis', 'misses')
+            try:
+                return compute_and_store(client, cache_key, *args, **kwargs)
+            finally:
+                _release_lock(lock_key, token)
+
         @wraps(func)
         def wrapper(*args, **kwargs):
             cache_key = f"{func.__name__}:{request.path}:{request.query_string.decode()}"
-            
-            # Try to get data from cache
-            cached_data = redis_client.get(cache_key)
-            if cached_data:
-                cached_response = json.loads(cached_data)
-                return jsonify(cached_response['data']), cached_response['status']
-            
-            # If not in cache, call the original function
+
+            if local_ttl:
+                local = local_cache.get(cache_key)
+                if local is not None:
+                    _count('local', 'hits')
+                    return _cached_response(local[1], local[0])
+                _count('local', 'misses')
+
+            # While Redis is failing, serve straight from the database
+            if not redis_breaker.allow():
+                _count('redis', 'bypassed')
+                return call_view(*args, **kwargs)
             try:
-                result = func(*args, **kwargs)
-            except Exception as e:
-                # Handle the exception and return an error response
-                return jsonify({'error': str(e)}), 500
-            
-            
-            # Prepare the result for caching
-            if isinstance(result, tuple) and len(result) == 2:
-                response_data, status_code = result
-                if isinstance(response_data, Response):
-                    response_data = json.loads(response_data.get_data(as_text=True))
-            elif isinstance(result, Response):
-                response_data = json.loads(result.get_data(as_text=True))
-                status_code = result.status_code
-            else:
-                response_data = result
-                status_code = 200
-            
-            cache_data = json.dumps({
-                'data': response_data,
-                'status': status_code
-            })
-            
-            # Cache the result
-            redis_client.setex(cache_key, expiration, cache_data)
-            
-            return jsonify(response_data), status_code
+                return cached_call(cache_key, *args, **kwargs)
+            except redis.exceptions.RedisError as e:
+                # Raised before the view ran (reads and lock calls); storing failures are handled above
+                print(f"Redis unavailable for {cache_key}, serving uncached: {str(e)}")
+                _count('redis', 'errors')
+                return call_view(*args, **kwargs)
         return wrapper
     return decorator
 
 
 
-def update_cache_with_redis(related_get_endpoints=[]):
+def update_cache_with_redis(related_get_endpoints=[], tags=None):
     """
     A decorator that clears the cache for related GET endpoints after a successful request.
 
     This decorator is designed to be used with functions that modify data that is cached using Redis.
     It clears the cache for all related GET endpoints after a successful request (2xx status code).
+    Invalidation goes through the tag sets maintained by `cache_with_redis`, so its cost
+    depends on the number of affected entries rather than on the size of the keyspace.
 
     Args:
-        related_get_endpoints (list): A list of related GET endpoints to clear the cache for.
-                                     For example: ['/api/data', '/api/users'].
+        related_get_endpoints (list): A list of related GET endpoint function names to clear the cache for.
+                                     For example: ['get_data', 'get_users'].
+        tags (list): Domain tags to clear, e.g. ['article'].
 
     Returns:
         function: A decorated function that implements cache clearing behavior.
 
     Usage:
         @app.route('/api/update_data', methods=['POST'])
-        @update_cache_with_redis(related_get_endpoints=['/api/data'])
+        @update_cache_with_redis(related_get_endpoints=['get_data'])
         def update_data():
             # Your data update logic here
             return {'message': 'Data updated successfully'}, 200
     """
+    invalidated_tags = list(related_get_endpoints) + list(tags or [])
+
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
@@ -141,10 +673,7 @@ def update_cache_with_redis(related_get_endpoints=[]):
                 
                 # Only clear cache if the request was successful (2xx status codes)
                 if 200 <= status_code < 300:
-                    for endpoint in related_get_endpoints:
-                        cache_pattern = f"{endpoint}:*"
-                        for key in redis_client.scan_iter(match=cache_pattern):
-                            redis_client.delete(key)
+                    invalidate_cache_tags(invalidated_tags)
                 
                 return result
             
@@ -154,4 +683,4 @@ def update_cache_with_redis(related_get_endpoints=[]):
                 return jsonify({'error': str(e)}), 500
         
         return wrapper
-    return decorator
\ No newline at end of file
+    return decorator